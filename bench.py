@@ -0,0 +1,282 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from core import VaultCore
+from metrics import percentile
+
+try:
+    import resource
+except ImportError:
+    # Windows'ta yok; tepe bellek ölçülmez
+    resource = None
+
+PIN = "1234"
+WORDS = [
+    "elma", "armut", "kiraz", "şifre", "banka", "hesap", "kart", "adres", "telefon", "ılık",
+    "İstanbul", "ankara", "ağaç", "göl", "dağ", "deniz", "kitap", "kalem", "defter", "masa",
+    "sandalye", "pencere", "kapı", "anahtar", "kasa", "belge", "fatura", "sözleşme", "not", "liste"
+]
+TAGS = ["iş", "kişisel", "banka", "sağlık", "seyahat", "okul", "ev", "araba"]
+OPS = ("import", "startup", "load", "list", "get", "save", "search", "filter", "attach", "snapshot", "secret_backup")
+# Gecikme ölçümlerinde en fazla bu kadar örnek alınır
+MAX_SAMPLES = 1000
+
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS bayt, Linux KB döndürür
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def summarize(latencies: list, work: float = None, unit: str = "ops") -> dict:
+    """Turn per-sample latencies (seconds) into percentiles and a throughput."""
+    values = sorted(latencies)
+    total = sum(values)
+    result = {
+        "samples": len(values),
+        "mean_ms": total / len(values) * 1000 if values else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p90_ms": percentile(values, 90) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": values[-1] * 1000 if values else 0.0,
+    }
+    work = len(values) if work is None else work
+    result[f"{unit}_per_s"] = work / total if total > 0 else 0.0
+    return result
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    value = fn(*args)
+    return time.perf_counter() - started, value
+
+
+def synthetic_entries(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(count):
+        content = " ".join(rng.choice(WORDS) for _ in range(30))
+        tags = rng.sample(TAGS, rng.randint(0, 2))
+        yield f"kayıt {i:07d}", {'content': content, 'file_name': None, 'tags': tags}
+
+
+def open_core(vault_dir: str, backend: str) -> VaultCore:
+    core = VaultCore(vault_dir, backend=backend)
+    core.open()
+    core.load_pin()
+    if not core.check_pin(PIN) or not core.unlock(PIN):
+        raise RuntimeError("Kasa açılamadı")
+    return core
+
+
+def run_op(op: str, vault_dir: str, entries: int, backend: str, attachment_mb: int, work_dir: str) -> dict:
+    """Run one measurement in this process and return its summary."""
+    rng = random.Random(1)
+
+    if op == "import":
+        core = open_core(vault_dir, backend)
+        elapsed, _ = timed(core.import_records, synthetic_entries(entries))
+        core.close()
+        return summarize([elapsed], work=entries, unit="entries")
+
+    if op == "startup":
+        # Giriş ekranından önceki iş: modüllerin yüklenmesi ve PIN dosyasının okunması.
+        # Her ölçüm temiz bir yorumlayıcıda, böylece önbelleğe alınmış modül yoktur
+        script = (
+            "import main, core; "
+            f"core.VaultCore({vault_dir!r}, backend={backend!r}).load_pin()"
+        )
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        latencies = []
+        for _ in range(5):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, "-c", script], cwd=package_dir, check=True)
+            latencies.append(time.perf_counter() - started)
+        return summarize(latencies)
+
+    if op == "load":
+        latencies = []
+        for _ in range(5):
+            elapsed, core = timed(open_core, vault_dir, backend)
+            core.close()
+            latencies.append(elapsed)
+        return summarize(latencies)
+
+    core = open_core(vault_dir, backend)
+    try:
+        titles = core.titles()
+        sample = [rng.choice(titles) for _ in range(min(MAX_SAMPLES, len(titles)))]
+
+        if op == "list":
+            def list_page(offset):
+                # Liste ekranının yaptığı iş: kayıt sayısı ve görünen sayfa
+                len(core)
+                core.titles(offset, 500)
+            offsets = [0] + [rng.randrange(len(titles)) for _ in range(19)] if titles else [0] * 20
+            return summarize([timed(list_page, offset)[0] for offset in offsets])
+
+        if op == "get":
+            return summarize([timed(core.get, title)[0] for title in sample])
+
+        if op == "save":
+            return summarize([
+                timed(core.put, title, {'content': f"güncellendi {i}", 'file_name': None})[0]
+                for i, title in enumerate(sample)
+            ])
+
+        if op == "search":
+            queries = [f"{rng.choice(WORDS)[:3]} {rng.choice(WORDS)}" for _ in range(200)]
+            return summarize([timed(core.search, query)[0] for query in queries])
+
+        if op == "filter":
+            # Etikete göre ve son değişiklik sırasıyla listeleme (apply_search ile aynı çağrılar)
+            cases = [(tag, order) for tag in TAGS + [None] for order in ("title", "modified")]
+            return summarize([timed(core.list_titles, tag, order)[0] for tag, order in cases * 5])
+
+        if op == "attach":
+            latencies = []
+            for i in range(3):
+                path = os.path.join(work_dir, f"attachment_{i}.bin")
+                with open(path, 'wb') as f:
+                    for _ in range(attachment_mb):
+                        f.write(os.urandom(1024 * 1024))
+                latencies.append(timed(core.add_file, path)[0])
+                os.remove(path)
+            return summarize(latencies, work=3 * attachment_mb, unit="mb")
+
+        if op == "snapshot":
+            full, manifest = timed(core.backup)
+            incremental, _ = timed(core.backup)
+            result = summarize([full, incremental])
+            result["full_ms"] = full * 1000
+            result["incremental_ms"] = incremental * 1000
+            result["new_bytes"] = manifest["new_bytes"]
+            return result
+
+        if op == "secret_backup":
+            # Gizli konuma değil geçici dizine yazılır; arşivleme yolu aynı
+            from archiver import ParallelArchiver
+            from security import SecurityManager
+            files = []
+            total = 0
+            for dirpath, dirnames, filenames in os.walk(vault_dir):
+                dirnames[:] = [name for name in dirnames if name != "backups"]
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    files.append((path, os.path.relpath(path, vault_dir)))
+                    total += os.path.getsize(path)
+            archiver = ParallelArchiver(SecurityManager.ARCHIVE_PASSWORD, level=SecurityManager.COMPRESSION_LEVEL)
+            target = os.path.join(work_dir, "secret_backup")
+            elapsed, stats = timed(archiver.archive, files, target, "bench")
+            shutil.rmtree(target, ignore_errors=True)
+            result = summarize([elapsed], work=total / (1024 * 1024), unit="mb")
+            result["volumes"] = len(stats["volumes"])
+            return result
+    finally:
+        core.close()
+    raise ValueError(f"Bilinmeyen işlem: {op}")
+
+
+def run_child(spec: dict) -> dict:
+    """Run one operation in a fresh interpreter, so peak RSS belongs to that operation alone."""
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", json.dumps(spec)],
+        capture_output=True, text=True, encoding='utf-8'
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        return {"error": (proc.stderr.strip().splitlines() or ["bilinmeyen hata"])[-1]}
+    return json.loads(lines[-1])
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Return (op, entries, metric, old, new) for every p50/p99 that got slower than tolerance allows."""
+    old = {(r["op"], r["entries"]): r for r in baseline.get("results", []) if "error" not in r}
+    regressions = []
+    for result in current["results"]:
+        previous = old.get((result["op"], result["entries"]))
+        if previous is None or "error" in result:
+            continue
+        for metric in ("p50_ms", "p99_ms"):
+            if previous[metric] > 0 and result[metric] > previous[metric] * (1 + tolerance):
+                regressions.append((result["op"], result["entries"], metric, previous[metric], result[metric]))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Dijital Kasa performans ölçümü")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="kayıt sayıları, virgülle")
+    parser.add_argument("--ops", default=",".join(OPS), help="ölçülecek işlemler, virgülle")
+    parser.add_argument("--attachment-mb", type=int, default=64, help="ek dosya boyutu (MB)")
+    parser.add_argument("--backend", choices=("journal", "sqlite"), default=VaultCore.STORAGE_BACKEND)
+    parser.add_argument("--work-dir", help="sentetik kasaların oluşturulacağı dizin (varsayılan: geçici)")
+    parser.add_argument("--out", default="bench_results.json", help="sonuç JSON dosyası")
+    parser.add_argument("--compare", help="karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="izin verilen yavaşlama oranı")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        spec = json.loads(args.child)
+        result = run_op(**spec)
+        result["peak_rss_kb"] = peak_rss_kb()
+        print(json.dumps(result))
+        return 0
+
+    ops = [op for op in args.ops.split(",") if op]
+    unknown = set(ops) - set(OPS)
+    if unknown:
+        parser.error(f"bilinmeyen işlem: {', '.join(sorted(unknown))}")
+    work_root = args.work_dir or tempfile.mkdtemp(prefix="vault_bench_")
+
+    report = {
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "attachment_mb": args.attachment_mb,
+        "results": []
+    }
+    try:
+        for entries in (int(size) for size in args.sizes.split(",")):
+            vault_dir = os.path.join(work_root, f"vault_{entries}")
+            shutil.rmtree(vault_dir, ignore_errors=True)
+            os.makedirs(vault_dir)
+            # Kasa her durumda import ile oluşturulur; ölçülmesi istenmediyse sonucu yazılmaz
+            for op in ["import"] + [op for op in ops if op != "import"]:
+                spec = {
+                    "op": op, "vault_dir": vault_dir, "entries": entries, "backend": args.backend,
+                    "attachment_mb": args.attachment_mb, "work_dir": work_root
+                }
+                result = dict(op=op, entries=entries, **run_child(spec))
+                if op in ops:
+                    report["results"].append(result)
+                    print(json.dumps(result, ensure_ascii=False), file=sys.stderr)
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_root, ignore_errors=True)
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for op, entries, metric, old, new in regressions:
+            print(f"YAVAŞLAMA: {op} @ {entries}: {metric} {old:.2f} -> {new:.2f} ms", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
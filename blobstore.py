@@ -0,0 +1,171 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import uuid
+
+import metrics
+from durable import replace_file
+
+
+class IngestCancelled(Exception):
+    """Raised when a file copy into the store is cancelled part-way."""
+
+
+class BlobStore:
+    """Content-addressed, reference-counted attachment store.
+
+    Files are hashed with SHA-256 while they are copied and kept once under
+    their digest, fanned out over two directory levels (ab/cd/abcd...). A
+    small SQLite table tracks how many entries point at each blob, so a blob
+    is only removed once nothing references it.
+
+    When crypto (a VaultCrypto) is set, blobs are encrypted as they are
+    written; the digest is always that of the plaintext.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, root: str):
+        self.root = root
+        self.tmp_dir = os.path.join(root, "tmp")
+        self.refs_path = os.path.join(root, "refs.db")
+        self.crypto = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        """Create the directory layout and open the reference table."""
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.refs_path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS refs (digest TEXT PRIMARY KEY, count INTEGER NOT NULL)")
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def path(self, digest: str) -> str:
+        """Return where the blob with the given digest is stored."""
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+    def add_file(self, src_path: str, progress=None, cancelled=None) -> str:
+        """Store a file (unless an identical one is already stored) and take a reference to it.
+
+        progress is called with the number of bytes copied after every chunk;
+        if cancelled() returns True the copy stops and IngestCancelled is raised.
+        """
+        with metrics.span("blob.copy"), open(src_path, 'rb') as src:
+            return self.add_chunks(iter(lambda: src.read(self.CHUNK_SIZE), b''), progress, cancelled)
+
+    def add_chunks(self, chunks, progress=None, cancelled=None) -> str:
+        """Like add_file, for plaintext that arrives as an iterable of byte strings."""
+        digest = hashlib.sha256()
+        tmp_path = os.path.join(self.tmp_dir, uuid.uuid4().hex)
+        try:
+            with open(tmp_path, 'wb') as dst:
+                writer = self.crypto.writer(dst) if self.crypto is not None else dst
+                copied = 0
+                for chunk in chunks:
+                    if cancelled is not None and cancelled():
+                        raise IngestCancelled()
+                    digest.update(chunk)
+                    writer.write(chunk)
+                    copied += len(chunk)
+                    if progress is not None:
+                        progress(copied)
+                if writer is not dst:
+                    writer.finish()
+                dst.flush()
+                os.fsync(dst.fileno())
+
+            digest = digest.hexdigest()
+            return self.commit_file(tmp_path, digest)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def commit_file(self, tmp_path: str, digest: str) -> str:
+        """Move an already hashed temp file into place and take a reference to it."""
+        blob_path = self.path(digest)
+        # Aynı blob başka bir iş parçacığında silinirken yarışmamak için kilit altında
+        with self._lock:
+            if not os.path.exists(blob_path):
+                metrics.count("blob.dedup.miss")
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                replace_file(tmp_path, blob_path)
+            else:
+                metrics.count("blob.dedup.hit")
+            self._retain(digest)
+        return digest
+
+    def retain(self, digest: str) -> None:
+        """Take one more reference to a blob."""
+        with self._lock:
+            self._retain(digest)
+
+    def release(self, digest: str) -> None:
+        """Drop one reference to a blob, deleting it once nothing references it."""
+        with self._lock:
+            self._conn.execute("UPDATE refs SET count = count - 1 WHERE digest = ?", (digest,))
+            row = self._conn.execute("SELECT count FROM refs WHERE digest = ?", (digest,)).fetchone()
+            if row is None or row[0] > 0:
+                return
+            self._conn.execute("DELETE FROM refs WHERE digest = ?", (digest,))
+
+            blob_path = self.path(digest)
+            if os.path.exists(blob_path):
+                os.remove(blob_path)
+
+    def remove_orphan(self, digest: str) -> bool:
+        """Delete a stored blob if nothing references it; returns whether it was deleted."""
+        with self._lock:
+            row = self._conn.execute("SELECT count FROM refs WHERE digest = ?", (digest,)).fetchone()
+            if row is not None and row[0] > 0:
+                return False
+            self._conn.execute("DELETE FROM refs WHERE digest = ?", (digest,))
+            blob_path = self.path(digest)
+            if not os.path.exists(blob_path):
+                return False
+            os.remove(blob_path)
+        return True
+
+    def encrypt_existing(self) -> int:
+        """Encrypt every stored file that is still plaintext; returns how many were converted."""
+        converted = 0
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            if dirpath == self.root:
+                dirnames[:] = [name for name in dirnames if name != "tmp"]
+            for name in filenames:
+                if name.startswith("refs.db"):
+                    continue
+                path = os.path.join(dirpath, name)
+                if self.crypto.is_encrypted_file(path):
+                    continue
+                tmp_path = os.path.join(self.tmp_dir, uuid.uuid4().hex)
+                self.crypto.encrypt_file(path, tmp_path)
+                replace_file(tmp_path, path)
+                converted += 1
+        return converted
+
+    def reset_refs(self, digests) -> None:
+        """Recount references from scratch, e.g. after a whole vault was replaced."""
+        counts = {}
+        for digest in digests:
+            counts[digest] = counts.get(digest, 0) + 1
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM refs")
+            self._conn.executemany("INSERT INTO refs (digest, count) VALUES (?, ?)", counts.items())
+            self._conn.execute("COMMIT")
+
+    def _retain(self, digest: str) -> None:
+        self._conn.execute(
+            "INSERT INTO refs (digest, count) VALUES (?, 1) "
+            "ON CONFLICT(digest) DO UPDATE SET count = count + 1",
+            (digest,)
+        )
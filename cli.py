@@ -0,0 +1,317 @@
+import argparse
+import getpass
+import json
+import os
+import sys
+from datetime import datetime
+
+import metrics
+from core import VaultCore, VaultWipedError
+from pinstore import PinLockedError
+from vaults import VaultPool
+
+
+def cmd_list(core: VaultCore, args) -> int:
+    if args.tag is None and not args.recent:
+        titles = core.titles(args.offset, args.limit)
+    else:
+        titles = core.list_titles(args.tag, 'modified' if args.recent else 'title')
+        end = None if args.limit is None else args.offset + args.limit
+        titles = titles[args.offset:end]
+    for title in titles:
+        print(title)
+    return 0
+
+
+def cmd_tags(core: VaultCore, args) -> int:
+    for tag, count in sorted(core.tags().items()):
+        print(f"{tag}\t{count}")
+    return 0
+
+
+def cmd_get(core: VaultCore, args) -> int:
+    entry = core.get(args.title)
+    if entry is None:
+        print(f"Kayıt bulunamadı: {args.title}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(dict(entry, title=args.title), ensure_ascii=False))
+    else:
+        print(entry.get('content', ''))
+    return 0
+
+
+def cmd_put(core: VaultCore, args) -> int:
+    content = args.content if args.content is not None else sys.stdin.read()
+    entry = {'content': content, 'file_name': None, 'tags': args.tag or []}
+    if args.file:
+        entry['file_hash'] = core.add_file(args.file)
+        entry['file_name'] = os.path.basename(args.file)
+        entry.update(core.file_meta(entry['file_name'], os.path.getsize(args.file)))
+    else:
+        # Sadece içerik ya da etiket değişiyorsa kayıttaki dosya korunur
+        entry = core.keep_attachment(entry, core.get(args.title))
+    core.put(args.title, entry)
+    return 0
+
+
+def cmd_delete(core: VaultCore, args) -> int:
+    if not core.delete(args.title):
+        print(f"Kayıt bulunamadı: {args.title}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_search(core: VaultCore, args) -> int:
+    for title in sorted(core.search(args.query) or ()):
+        print(title)
+    return 0
+
+
+def cmd_import(core: VaultCore, args) -> int:
+    stats = core.import_file(args.path, mode=args.mode, batch_size=args.batch_size)
+    print(
+        f"{stats['added']} eklendi, {stats['overwritten']} üzerine yazıldı, "
+        f"{stats['renamed']} yeniden adlandırıldı, {stats['skipped']} atlandı."
+    )
+    return 0
+
+
+def cmd_export(core: VaultCore, args) -> int:
+    count = core.export_file(args.path)
+    print(f"{count} kayıt dışa aktarıldı.")
+    return 0
+
+
+def cmd_backup(core: VaultCore, args) -> int:
+    manifest = core.backup()
+    print(
+        f"Yedek oluşturuldu: {manifest['id']} "
+        f"({manifest['new_chunks']} yeni parça, {manifest['new_bytes'] // 1024} KB)"
+    )
+    return 0
+
+
+def cmd_backups(core: VaultCore, args) -> int:
+    for snapshot_id in core.list_backups():
+        print(snapshot_id)
+    return 0
+
+
+def cmd_diff(core: VaultCore, args) -> int:
+    diff = core.diff_backup(args.snapshot)
+    for mark, key in (("+", "added"), ("~", "changed"), ("-", "removed")):
+        for title in diff[key]:
+            print(f"{mark} {title}")
+    return 0
+
+
+def cmd_restore(core: VaultCore, args) -> int:
+    if args.merge or args.title:
+        # Verilen başlıklar, yoksa yedekte eklenmiş/değişmiş olanlar; kasadaki fazlalar kalır
+        titles = args.title
+        if not titles:
+            diff = core.diff_backup(args.snapshot)
+            titles = diff["added"] + diff["changed"]
+        count = core.merge_backup(args.snapshot, titles)
+        print(f"{count} kayıt geri yüklendi.")
+        return 0
+    if args.snapshot.endswith(".json"):
+        core.restore_json(args.snapshot)
+    else:
+        core.restore(args.snapshot)
+    print("Yedek geri yüklendi.")
+    return 0
+
+
+def cmd_sync(core: VaultCore, args) -> int:
+    if args.stop:
+        core.stop_sync()
+        print("Senkronizasyon kapatıldı.")
+        return 0
+    passphrase = None
+    if args.server:
+        passphrase = os.environ.get("VAULT_SYNC_PASSPHRASE") or getpass.getpass("Senkronizasyon parolası: ")
+    stats = core.sync(args.server, passphrase)
+    print(
+        f"{stats['received']} kayıt alındı, {stats['sent']} kayıt gönderildi, {stats['conflicts']} çakışma "
+        f"({stats['bytes_received'] // 1024} KB indirildi, {stats['bytes_sent'] // 1024} KB yüklendi)."
+    )
+    return 0
+
+
+def cmd_scrub(core: VaultCore, args) -> int:
+    scrubber = core.new_scrubber(bytes_per_second=int(args.rate * 1024 * 1024) if args.rate else None)
+    try:
+        finished = scrubber.run_pass()
+    except KeyboardInterrupt:
+        # Konum kaydedildi; sonraki çalıştırma kaldığı yerden sürer
+        print("Tarama yarıda kesildi, kaldığı yerden devam edilecek.", file=sys.stderr)
+        return 1
+    last = scrubber.state["last_pass"]
+    if finished:
+        print(f"{last['checked']} kayıt denetlendi, {last['bytes'] // (1024 * 1024)} MB okundu.")
+    for problem in scrubber.problems:
+        print(f"{problem['title']}\t{problem['detail']}")
+    return 1 if scrubber.problems else 0
+
+
+def cmd_history(core: VaultCore, args) -> int:
+    if args.diff:
+        old_rev, new_rev = args.diff
+        for line in core.diff_revisions(args.title, old_rev, new_rev):
+            print(line)
+        return 0
+
+    rev = args.rev
+    if args.as_of:
+        rev = core.revision_at(args.title, datetime.fromisoformat(args.as_of).timestamp())
+        if rev is None and core.entry_history(args.title):
+            print(f"{args.as_of} tarihinde kayıt yoktu.", file=sys.stderr)
+            return 1
+    if args.restore:
+        if not core.restore_revision(args.title, args.restore):
+            print(f"Sürüm geri yüklenemedi: #{args.restore}", file=sys.stderr)
+            return 1
+        print(f"{args.title} #{args.restore} sürümüne döndürüldü.")
+        return 0
+    if rev is not None or args.as_of:
+        entry = core.get_revision(args.title, rev)
+        if entry is None:
+            print("(kayıt silinmiş)", file=sys.stderr)
+            return 1
+        print(entry.get('content', ''))
+        return 0
+
+    for revision in core.entry_history(args.title):
+        when = datetime.fromtimestamp(revision['time']).isoformat(sep=' ', timespec='seconds') if revision['time'] else "-"
+        state = "\tsilindi" if revision['deleted'] else ""
+        print(f"#{revision['rev']}\t{when}{state}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="vault", description="Dijital Kasa komut satırı aracı")
+    parser.add_argument("--vault-dir", help="kasa dosyalarının bulunduğu dizin")
+    parser.add_argument("--vault", help="vaults.json'da tanımlı kasa adı")
+    parser.add_argument("--backend", choices=("journal", "sqlite"), help="depolama türü")
+    parser.add_argument("--pin", help="PIN (verilmezse VAULT_PIN ya da sorulur)")
+    parser.add_argument("--metrics", action="store_true", help="bitince işlem sürelerini stderr'e yaz")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("list", help="başlıkları listele")
+    p.add_argument("--offset", type=int, default=0)
+    p.add_argument("--limit", type=int)
+    p.add_argument("--tag", help="sadece bu etiketteki kayıtlar")
+    p.add_argument("--recent", action="store_true", help="son değiştirilen önce")
+    p.set_defaults(func=cmd_list)
+
+    p = commands.add_parser("tags", help="etiketleri kayıt sayılarıyla listele")
+    p.set_defaults(func=cmd_tags)
+
+    p = commands.add_parser("get", help="bir kaydın içeriğini yaz")
+    p.add_argument("title")
+    p.add_argument("--json", action="store_true", help="kaydı JSON olarak yaz")
+    p.set_defaults(func=cmd_get)
+
+    p = commands.add_parser("put", help="kayıt ekle ya da güncelle")
+    p.add_argument("title")
+    p.add_argument("content", nargs="?", help="içerik (verilmezse stdin'den okunur)")
+    p.add_argument("--file", help="eklenecek dosya")
+    p.add_argument("--tag", action="append", help="etiket (birden fazla verilebilir)")
+    p.set_defaults(func=cmd_put)
+
+    p = commands.add_parser("delete", help="kaydı sil")
+    p.add_argument("title")
+    p.set_defaults(func=cmd_delete)
+
+    p = commands.add_parser("search", help="başlık ve içerikte ara")
+    p.add_argument("query")
+    p.set_defaults(func=cmd_search)
+
+    p = commands.add_parser("import", help="JSONL/CSV dosyasından toplu içe aktar")
+    p.add_argument("path")
+    p.add_argument("--mode", choices=VaultCore.MERGE_MODES, default="overwrite",
+                   help="aynı başlıklı kayıt varsa: üzerine yaz, atla ya da yeniden adlandır")
+    p.add_argument("--batch-size", type=int, help="kaç kayıtta bir yazılacağı")
+    p.set_defaults(func=cmd_import)
+
+    p = commands.add_parser("export", help="kayıtları JSONL/CSV dosyasına aktar")
+    p.add_argument("path")
+    p.set_defaults(func=cmd_export)
+
+    p = commands.add_parser("backup", help="artımlı yedek al")
+    p.set_defaults(func=cmd_backup)
+
+    p = commands.add_parser("backups", help="yedekleri listele")
+    p.set_defaults(func=cmd_backups)
+
+    p = commands.add_parser("diff", help="yedeği kasayla kayıt kayıt karşılaştır")
+    p.add_argument("snapshot", help="yedek kimliği")
+    p.set_defaults(func=cmd_diff)
+
+    p = commands.add_parser("restore", help="yedeği ya da eski JSON yedeğini geri yükle")
+    p.add_argument("snapshot", help="yedek kimliği ya da .json dosyası")
+    p.add_argument("--merge", action="store_true",
+                   help="sadece yedekte eklenmiş/değişmiş kayıtları yaz, diğerlerine dokunma")
+    p.add_argument("--title", action="append", help="sadece bu kaydı geri yükle (tekrarlanabilir)")
+    p.set_defaults(func=cmd_restore)
+
+    p = commands.add_parser("sync", help="senkronizasyon sunucusuyla değişiklikleri alıp gönder")
+    p.add_argument("--server", help="sunucu adresi (ilk seferde ya da değiştirirken; parola VAULT_SYNC_PASSPHRASE ya da sorulur)")
+    p.add_argument("--stop", action="store_true", help="kasanın sunucu bağlantısını kaldır")
+    p.set_defaults(func=cmd_sync)
+
+    p = commands.add_parser("scrub", help="kayıtları ve ekleri sağlama toplamlarıyla denetle, sahipsiz dosyaları sil")
+    p.add_argument("--rate", type=float, help="en fazla okuma hızı (MB/s)")
+    p.set_defaults(func=cmd_scrub)
+
+    p = commands.add_parser("history", help="kaydın önceki sürümleri")
+    p.add_argument("title")
+    p.add_argument("--rev", type=int, help="bu sürümün içeriğini yaz")
+    p.add_argument("--as-of", help="bu tarihteki (YYYY-MM-DD[ SS:DD]) içeriği yaz")
+    p.add_argument("--diff", nargs=2, type=int, metavar=("ESKI", "YENI"), help="iki sürümü karşılaştır")
+    p.add_argument("--restore", type=int, metavar="REV", help="kaydı bu sürüme döndür")
+    p.set_defaults(func=cmd_history)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    vault_dir = args.vault_dir
+    if vault_dir is None:
+        vaults = VaultPool(os.environ.get("VAULT_CONFIG", os.path.join(app_dir, "vaults.json")), app_dir)
+        try:
+            vault_dir = vaults.path(args.vault or VaultPool.DEFAULT_NAME)
+        except KeyError as e:
+            print(f"Hata: {e.args[0]}", file=sys.stderr)
+            return 1
+    if args.metrics:
+        metrics.enable()
+    core = VaultCore(vault_dir, backend=args.backend)
+    try:
+        core.open()
+        pin = args.pin or os.environ.get("VAULT_PIN") or getpass.getpass("PIN: ")
+        core.load_pin()
+        if not core.check_pin(pin):
+            print(f"Hatalı PIN! {core.attempts_left()} deneme hakkınız kaldı.", file=sys.stderr)
+            return 1
+        if not core.unlock(pin):
+            print("Şifreleme anahtarı açılamadı!", file=sys.stderr)
+            return 1
+        return args.func(core, args)
+    except (IOError, ValueError, PinLockedError, VaultWipedError) as e:
+        print(f"Hata: {str(e)}", file=sys.stderr)
+        return 1
+    finally:
+        # Göstergeler kasa açıkken okunur
+        if args.metrics:
+            metrics.set_gauge("entries", lambda: len(core))
+            metrics.set_gauge("disk", core.disk_usage)
+            print(metrics.format_report(), file=sys.stderr)
+        core.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
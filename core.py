@@ -0,0 +1,765 @@
+import difflib
+import json
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import metrics
+from blobstore import BlobStore
+from crypto import VaultCrypto
+from history import HistoryStore
+from metaindex import MetaIndex
+from pinstore import PinStore
+from preview import read_prefix
+from scrubber import Scrubber
+from search import SearchIndex
+from snapshots import SnapshotStore
+from sync import SyncClient, SyncLog
+from storage import open_store
+from transfer import read_records, write_records
+
+
+class VaultWipedError(Exception):
+    """Raised by check_pin when too many wrong PINs in a row made it wipe the vault."""
+
+    def __init__(self, backed_up: bool):
+        self.backed_up = backed_up
+        super().__init__("Çok fazla hatalı PIN girildi, kasa silindi")
+
+
+class VaultCore:
+    """The vault without a user interface.
+
+    Owns the storage backend, the attachment store, encryption, the search
+    index and snapshots. The Tk application and the command line tool are
+    thin clients of this class. Nothing here shows dialogs: failures are
+    raised (IOError, ValueError, VaultLockedError) for the caller to report.
+
+    Entries go in and come out with their content in plaintext; they are
+    sealed on the way to the store. put() takes over the attachment
+    reference of the new entry and releases the one held by the entry it
+    replaces.
+
+    The search and metadata indexes are only touched under _index_lock:
+    the Tk thread, the save queue and a running sync all update them.
+    Stored changes and their sync marks are written under _write_lock, so
+    a sync can look for local changes and apply remote ones without a
+    save landing in between.
+    """
+
+    DEFAULT_PIN = "1234"
+    # Üst üste bu kadar hatalı PIN kasayı siler (bkz. breach)
+    MAX_ATTEMPTS = 3
+    # 'journal' veya 'sqlite'
+    STORAGE_BACKEND = os.environ.get("VAULT_BACKEND", "journal")
+    # Yedek saklama politikası: son N yedek + son N günün her biri için bir yedek
+    BACKUP_KEEP_LAST = 10
+    BACKUP_KEEP_DAILY = 30
+    # Kayıt geçmişi: kayıt başına son N revizyon; 0'dan büyükse bu kadar günden eskiler de silinir
+    HISTORY_KEEP_LAST = 100
+    HISTORY_KEEP_DAYS = 365
+    IMPORT_BATCH_SIZE = 1000
+    MERGE_MODES = ('overwrite', 'skip', 'rename')
+    ATTACHMENT_FIELDS = ('file_name', 'file_hash', 'file_size', 'file_type')
+
+    def __init__(self, base_dir: str, backend: str = None):
+        self.base_dir = base_dir
+        self.files_dir = os.path.join(base_dir, "vault_files")
+        self.backup_dir = os.path.join(base_dir, "backups")
+        self.store = open_store(backend or self.STORAGE_BACKEND, self.data_file)
+        self.blob_store = BlobStore(self.files_dir)
+        self.snapshots = SnapshotStore(os.path.join(self.backup_dir, "snapshots"))
+        self.crypto = VaultCrypto(self.key_file)
+        self.pins = PinStore(self.pin_file)
+        self.history = HistoryStore(
+            os.path.join(base_dir, "vault_history.db"), self.crypto,
+            keep_last=self.HISTORY_KEEP_LAST, max_age=self.HISTORY_KEEP_DAYS * 86400
+        )
+        self.search_index = SearchIndex()
+        self.meta_index = MetaIndex()
+        self._index_lock = threading.RLock()
+        self._write_lock = threading.RLock()
+        self.sync_log = SyncLog(os.path.join(base_dir, "vault_sync.db"))
+        self._sync_client = None
+        self.scrubber = None
+        self.temp_dir = None
+        self._security_manager = None
+
+    @property
+    def data_file(self) -> str:
+        """Get the path to the data file."""
+        return os.path.join(self.base_dir, "vault_data.json")
+
+    @property
+    def pin_file(self) -> str:
+        """Get the path to the PIN file."""
+        return os.path.join(self.base_dir, "pin.json")
+
+    @property
+    def key_file(self) -> str:
+        """Get the path to the PIN-wrapped encryption key."""
+        return os.path.join(self.base_dir, "vault_key.json")
+
+    @property
+    def index_file(self) -> str:
+        """Get the path to the saved search index."""
+        return os.path.join(self.base_dir, "vault_index.json")
+
+    @property
+    def meta_file(self) -> str:
+        """Get the path to the saved tag and date index."""
+        return os.path.join(self.base_dir, "vault_meta.json")
+
+    @property
+    def scrub_file(self) -> str:
+        """Get the path to the integrity scrubber's saved position and findings."""
+        return os.path.join(self.base_dir, "vault_scrub.json")
+
+    @property
+    def quarantine_dir(self) -> str:
+        """Get the directory corrupt attachments are moved to."""
+        return os.path.join(self.base_dir, "quarantine")
+
+    @property
+    def security_manager(self):
+        """The secret-location backup manager, created on first use."""
+        if self._security_manager is None:
+            from security import SecurityManager
+            self._security_manager = SecurityManager()
+        return self._security_manager
+
+    def open(self) -> None:
+        """Open the attachment store and the storage engine."""
+        os.makedirs(self.files_dir, exist_ok=True)
+        with metrics.span("core.open"):
+            self.blob_store.open()
+            self.history.open()
+            self.sync_log.open()
+            self.store.load()
+
+    def close(self) -> None:
+        """Close the storage engine and lock the vault."""
+        # Tarama kapatılacak depolamayı kullanıyor; önce o durdurulur
+        self.stop_scrubber()
+        self.store.close()
+        self.blob_store.close()
+        self.history.close()
+        self.lock()
+        self.sync_log.close()
+
+    def load_pin(self) -> None:
+        """Load the PIN hash from file or create it with the default PIN."""
+        self.pins.load(self.DEFAULT_PIN)
+
+    def save_pin(self, pin: str) -> None:
+        """Save PIN to file."""
+        self.pins.set(pin)
+
+    def check_pin(self, pin: str) -> bool:
+        """Verify a PIN, counting failures; raises PinLockedError while backing off after failures.
+
+        The MAX_ATTEMPTS-th wrong PIN in a row wipes the vault (see breach)
+        and raises VaultWipedError instead of returning False.
+        """
+        with metrics.span("core.check_pin"):
+            verified = self.pins.verify(pin)
+        if not verified and self.attempts_left() == 0:
+            raise VaultWipedError(self.breach())
+        return verified
+
+    def attempts_left(self) -> int:
+        """How many more wrong PINs are accepted before the vault is wiped."""
+        return max(0, self.MAX_ATTEMPTS - self.pins.failures)
+
+    def breach(self) -> bool:
+        """Wipe the vault after too many wrong PINs and start counting again; returns whether the secret backup succeeded."""
+        backed_up = self.wipe()
+        try:
+            self.pins.reset_failures()
+        except IOError as e:
+            print(f"Deneme sayacı sıfırlanamadı: {str(e)}")
+        return backed_up
+
+    def change_pin(self, pin: str) -> None:
+        """Save a new PIN and re-wrap the encryption key with it."""
+        self.save_pin(pin)
+        self.crypto.rewrap(pin)
+
+    def unlock(self, pin: str) -> bool:
+        """Unlock the encryption key (creating it on first use) and load the search index.
+
+        Returns False if the key cannot be opened with pin.
+        """
+        with metrics.span("core.unlock"):
+            if not self.crypto.exists():
+                self.crypto.create(pin)
+                self.encrypt_existing_data()
+            elif not self.crypto.unlock(pin):
+                return False
+        self.blob_store.crypto = self.crypto
+
+        # Kayıtlı indeks güncelse içerikleri çözmeye gerek yok
+        with self._index_lock:
+            if self.search_index.load(self.index_file, self.store.fingerprint(), self.crypto):
+                metrics.count("search_index.hit")
+            else:
+                metrics.count("search_index.miss")
+                with metrics.span("search.build"):
+                    self.search_index.build(self.plain_items(self.store.items()))
+            if self.meta_index.load(self.meta_file, self.store.fingerprint(), self.crypto):
+                metrics.count("meta_index.hit")
+            else:
+                metrics.count("meta_index.miss")
+                with metrics.span("meta.build"):
+                    self.meta_index.build(self.store.items())
+        return True
+
+    def lock(self) -> None:
+        """Save the search index, forget the encryption key and remove decrypted temp files."""
+        if not self.crypto.unlocked:
+            return
+        self.stop_scrubber()
+        fingerprint = self.store.fingerprint()
+        with self._index_lock:
+            try:
+                self.search_index.save(self.index_file, fingerprint, self.crypto)
+                self.meta_index.save(self.meta_file, fingerprint, self.crypto)
+            except IOError as e:
+                print(f"Arama indeksi kaydedilemedi: {str(e)}")
+            self.search_index.clear()
+            self.meta_index.clear()
+        self.crypto.lock()
+        # Senkronizasyon anahtarı da bellekten atılır
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+        if self.temp_dir is not None:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir = None
+
+    def encrypt_existing_data(self) -> None:
+        """Encrypt entries and attachments saved before encryption was enabled."""
+        self.store.replace({title: self.seal_entry(title, entry) for title, entry in self.store.items()})
+        self.blob_store.crypto = self.crypto
+        self.blob_store.encrypt_existing()
+
+    def seal_entry(self, title: str, entry: dict) -> dict:
+        """Return the entry with its plaintext content replaced by ciphertext."""
+        if 'content' not in entry:
+            return entry
+        sealed = {key: value for key, value in entry.items() if key != 'content'}
+        sealed['content_enc'] = self.crypto.encrypt_text(entry['content'], title)
+        return sealed
+
+    def open_entry(self, title: str, entry: dict) -> dict:
+        """Return the entry with its content decrypted."""
+        if 'content_enc' not in entry:
+            return entry
+        opened = {key: value for key, value in entry.items() if key != 'content_enc'}
+        opened['content'] = self.crypto.decrypt_text(entry['content_enc'], title)
+        return opened
+
+    def plain_items(self, items):
+        """Yield (title, {'content': ...}) pairs with contents decrypted, for indexing."""
+        for title, entry in items:
+            yield title, {'content': self.open_entry(title, entry).get('content', '')}
+
+    def get(self, title: str):
+        """Return the entry stored under title with its content decrypted, or None."""
+        with metrics.span("core.get"):
+            entry = self.store.get(title)
+            if entry is None:
+                return None
+            return self.open_entry(title, entry)
+
+    def titles(self, offset: int = 0, limit: int = None) -> list:
+        """Return titles in sorted order, optionally a single page of them."""
+        return self.store.titles(offset, limit)
+
+    def rank(self, title: str) -> int:
+        """Return how many titles sort before title (its row if it were listed)."""
+        return self.store.rank(title)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __contains__(self, title: str) -> bool:
+        return title in self.store
+
+    def search(self, query: str):
+        """Return the set of matching titles, or None for an empty query."""
+        with metrics.span("core.search"), self._index_lock:
+            return self.search_index.search(query)
+
+    def list_titles(self, tag: str = None, order: str = 'title') -> list:
+        """Return titles, optionally only those tagged tag, by title or most recently modified first."""
+        if tag is None and order == 'title':
+            return self.store.titles()
+        with self._index_lock:
+            return self.meta_index.titles(tag, order)
+
+    def tags(self) -> dict:
+        """Return {tag: number of entries}."""
+        with self._index_lock:
+            return self.meta_index.tags()
+
+    def stamp(self, title: str, entry: dict, touch: bool = True) -> dict:
+        """Return entry with its timestamps filled in.
+
+        'created' is kept from the entry or the version it replaces;
+        'modified' becomes now when touch is set and is otherwise only
+        filled in if missing (imports and restores keep their dates).
+        """
+        now = time.time()
+        stamped = dict(entry)
+        with self._index_lock:
+            created = self.meta_index.created(title)
+        stamped['created'] = entry.get('created') or created or now
+        if touch or not entry.get('modified'):
+            stamped['modified'] = now
+        return stamped
+
+    @staticmethod
+    def file_meta(file_name: str, size: int) -> dict:
+        """Return the attachment size and type fields for an entry."""
+        return {
+            'file_size': size,
+            'file_type': mimetypes.guess_type(file_name)[0] or 'application/octet-stream'
+        }
+
+    def put(self, title: str, entry: dict) -> None:
+        """Insert or overwrite a single entry."""
+        self.put_many([(title, entry)])
+
+    def put_many(self, items, touch: bool = True, track: bool = True) -> int:
+        """Insert or overwrite many (title, entry) pairs in one transaction; returns the count.
+
+        Entries are stamped first (see stamp); track=False keeps them out of
+        the next sync (used for changes that came from the sync server).
+        """
+        rows = {}
+        for title, entry in items:
+            rows[title] = self.stamp(title, entry, touch)
+        self.write_changes(rows, track)
+        for title, entry in rows.items():
+            self.index_entry(title, entry)
+        return len(rows)
+
+    def write_changes(self, changes: dict, track: bool = True) -> None:
+        """Store puts (title -> entry) and deletes (title -> None) without touching the search index.
+
+        The puts are written as one transaction. The versions they replace
+        go to the entry history, and attachment references held by replaced
+        or deleted entries are released afterwards. With track the titles
+        are queued for the next sync. Safe to call from a background thread.
+        """
+        with metrics.span("core.write"), self._write_lock:
+            replaced = []
+            revisions = []
+            for title, entry in changes.items():
+                previous = self.store.get(title)
+                if previous:
+                    replaced.append((previous, entry))
+                    revisions.append((title, previous, entry))
+
+            with metrics.span("core.seal"):
+                sealed = [
+                    (title, self.seal_entry(title, entry)) for title, entry in changes.items() if entry is not None
+                ]
+            self.store.put_many(sealed)
+            for title, entry in changes.items():
+                if entry is None:
+                    self.store.delete(title)
+            if track:
+                self.sync_log.mark(changes)
+        metrics.count("core.entries_written", len(changes))
+        if revisions and self.crypto.unlocked:
+            self.record_history(revisions)
+        for previous, entry in replaced:
+            if entry is None:
+                self.release_file(previous)
+            else:
+                self.release_replaced(previous, entry)
+
+    def record_history(self, revisions: list) -> None:
+        """Add (title, sealed previous entry, new plaintext entry or None) changes to the history."""
+        try:
+            with metrics.span("core.history"):
+                self.history.record([
+                    (title, self.open_entry(title, previous), entry) for title, previous, entry in revisions
+                ])
+        except Exception as e:
+            # Geçmiş yazılamasa da kayıt kaydedilmiş olur; zincir sonraki değişiklikte yeniden başlar
+            print(f"Kayıt geçmişi yazılamadı: {str(e)}")
+
+    def entry_history(self, title: str) -> list:
+        """Return the recorded revisions of a title, newest first (see HistoryStore.revisions)."""
+        return self.history.revisions(title)
+
+    def get_revision(self, title: str, rev: int = None):
+        """Return a revision of an entry (the live one when rev is None), or None if it was deleted."""
+        if rev is None:
+            return self.get(title)
+        return self.history.get(title, rev)
+
+    def get_as_of(self, title: str, when: float):
+        """Return the entry as it was at time when (a timestamp), or None if it did not exist then.
+
+        Entries that have never changed have no history and are returned
+        as they are now.
+        """
+        rev = self.revision_at(title, when)
+        if rev is None:
+            return None if self.history.revisions(title) else self.get(title)
+        return self.history.get(title, rev)
+
+    def revision_at(self, title: str, when: float):
+        """Return the number of the revision that was current at time when, or None."""
+        return self.history.rev_at(title, when)
+
+    def diff_revisions(self, title: str, old_rev: int, new_rev: int = None) -> list:
+        """Return a unified diff (lines) of two revisions' content; new_rev None is the live entry."""
+        old = self.get_revision(title, old_rev) or {}
+        new = self.get_revision(title, new_rev) or {}
+        return list(difflib.unified_diff(
+            old.get('content', '').splitlines(), new.get('content', '').splitlines(),
+            f"#{old_rev}", "güncel" if new_rev is None else f"#{new_rev}", lineterm=''
+        ))
+
+    def restore_revision(self, title: str, rev: int) -> bool:
+        """Make an old revision the live entry again; returns False if it is a delete or unknown."""
+        entry = self.history.get(title, rev)
+        if entry is None:
+            return False
+        # Ekin dosyası hâlâ duruyorsa yeniden referans alınır, yoksa ek düşer
+        self.put(title, self._import_entry(title, entry))
+        return True
+
+    def index_entry(self, title: str, entry) -> None:
+        """Update the search and metadata indexes for a put (entry) or a delete (None)."""
+        with self._index_lock:
+            if entry is None:
+                self.search_index.remove(title)
+                self.meta_index.remove(title)
+                return
+            if 'content' in entry:
+                self.search_index.add(title, entry['content'])
+            self.meta_index.add(title, entry)
+
+    def import_file(self, path: str, mode: str = 'overwrite', batch_size: int = None) -> dict:
+        """Stream entries from a JSONL or CSV file into the vault; see import_records."""
+        with metrics.span("core.import"):
+            return self.import_records(read_records(path), mode, batch_size)
+
+    def import_records(self, records, mode: str = 'overwrite', batch_size: int = None) -> dict:
+        """Add (title, entry) pairs, committing every batch_size entries.
+
+        On a title conflict mode decides: 'overwrite' replaces the entry,
+        'skip' keeps the existing one and 'rename' stores the new one as
+        "title (2)", "title (3)", ... Only one batch is held in memory.
+        Returns how many entries were added, overwritten, skipped and renamed.
+        """
+        if mode not in self.MERGE_MODES:
+            raise ValueError(f"Bilinmeyen birleştirme türü: {mode}")
+        batch_size = batch_size or self.IMPORT_BATCH_SIZE
+
+        stats = {"added": 0, "overwritten": 0, "skipped": 0, "renamed": 0}
+        batch = {}
+        for title, entry in records:
+            conflict = title in batch or title in self.store
+            if conflict and mode == 'skip':
+                stats["skipped"] += 1
+                continue
+
+            entry = self._import_entry(title, entry)
+            if not conflict:
+                stats["added"] += 1
+            elif mode == 'rename':
+                title = self._free_title(title, batch)
+                stats["renamed"] += 1
+            else:
+                stats["overwritten"] += 1
+                if title in batch:
+                    self.release_file(batch[title])
+
+            batch[title] = entry
+            if len(batch) >= batch_size:
+                self.put_many(batch.items(), touch=False)
+                batch = {}
+        if batch:
+            self.put_many(batch.items(), touch=False)
+        return stats
+
+    def export_file(self, path: str) -> int:
+        """Stream every entry, decrypted, to a JSONL or CSV file; returns the count."""
+        with metrics.span("core.export"):
+            return write_records(path, ((title, self.open_entry(title, entry)) for title, entry in self.store.items()))
+
+    def delete(self, title: str, track: bool = True) -> bool:
+        """Remove an entry and its attachment reference; returns False if it did not exist."""
+        if title not in self.store:
+            return False
+        self.write_changes({title: None}, track)
+        self.index_entry(title, None)
+        return True
+
+    def replace(self, data: dict) -> None:
+        """Replace the whole vault with the given entries."""
+        if self.crypto.unlocked:
+            data = {title: self.seal_entry(title, entry) for title, entry in data.items()}
+        # Silinen kayıtlar da senkronize edilir
+        self.sync_log.mark(set(self.store.titles()) | set(data))
+        self.store.replace(data)
+        with self._index_lock:
+            self.search_index.build(self.plain_items(data.items()))
+            self.meta_index.build(data.items())
+        self.blob_store.reset_refs(
+            entry['file_hash'] for entry in data.values() if entry.get('file_hash')
+        )
+
+    @property
+    def sync_server(self):
+        """The address of the sync server this vault syncs with, or None."""
+        return self.sync_log.get("server")
+
+    def sync(self, server: str = None, passphrase: str = None) -> dict:
+        """Exchange changes with the sync server; see SyncClient.
+
+        server and passphrase are needed the first time (or to switch
+        servers). Returns the counts from SyncClient.run.
+        """
+        if self._sync_client is None:
+            self._sync_client = SyncClient(self)
+        if server is not None:
+            self._sync_client.configure(server, passphrase)
+        return self._sync_client.run()
+
+    def new_scrubber(self, bytes_per_second: int = None, busy=None) -> Scrubber:
+        """Return a Scrubber for this vault that resumes from the saved position."""
+        return Scrubber(self, self.scrub_file, self.quarantine_dir, bytes_per_second, busy)
+
+    def start_scrubber(self, busy=None) -> None:
+        """Start background integrity checks (see Scrubber); they stop when the vault is locked."""
+        if self.scrubber is None:
+            self.scrubber = self.new_scrubber(busy=busy)
+            self.scrubber.start()
+
+    def stop_scrubber(self) -> None:
+        if self.scrubber is not None:
+            self.scrubber.stop()
+            self.scrubber = None
+
+    def stop_sync(self) -> None:
+        """Disconnect the vault from its sync server and forget the sync state."""
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+        self.sync_log.forget()
+
+    def add_file(self, src_path: str, progress=None, cancelled=None) -> str:
+        """Copy a file into the attachment store and return its digest (one reference)."""
+        return self.blob_store.add_file(src_path, progress=progress, cancelled=cancelled)
+
+    def keep_attachment(self, entry: dict, previous) -> dict:
+        """Return entry with previous's attachment, for a save that does not pick a new file.
+
+        The kept attachment gets its own reference, so releasing previous
+        when entry replaces it leaves the file in place.
+        """
+        if not previous or not previous.get('file_name'):
+            return entry
+        kept = dict(entry, **{key: previous[key] for key in self.ATTACHMENT_FIELDS if key in previous})
+        if kept.get('file_hash'):
+            self.blob_store.retain(kept['file_hash'])
+        return kept
+
+    def attachment_path(self, entry_data: dict) -> str:
+        """Get the path of an entry's attachment."""
+        if entry_data.get('file_hash'):
+            return self.blob_store.path(entry_data['file_hash'])
+        # Eski kayıtlar dosyayı zaman damgalı adla doğrudan saklıyordu
+        return os.path.join(self.files_dir, entry_data['file_name'])
+
+    def read_attachment(self, entry_data: dict, limit: int) -> bytes:
+        """Return at most the first limit bytes of an entry's attachment, decrypted."""
+        with metrics.span("core.read_attachment"):
+            return read_prefix(self.crypto, self.attachment_path(entry_data), limit)
+
+    def release_file(self, entry_data: dict) -> None:
+        """Drop an entry's reference to its attachment."""
+        if entry_data.get('file_hash'):
+            self.blob_store.release(entry_data['file_hash'])
+        elif entry_data.get('file_name'):
+            file_path = self.attachment_path(entry_data)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def disk_usage(self) -> dict:
+        """Return the bytes used by the storage files, entry history, attachments and backups."""
+        usage = {"storage_bytes": 0, "history_bytes": 0, "attachment_bytes": 0, "backup_bytes": 0}
+        for path in (self.history.db_path, self.history.db_path + "-wal"):
+            if os.path.exists(path):
+                usage["history_bytes"] += os.path.getsize(path)
+        for path in self.store.files():
+            if os.path.exists(path):
+                usage["storage_bytes"] += os.path.getsize(path)
+        for key, root in (("attachment_bytes", self.files_dir), ("backup_bytes", self.backup_dir)):
+            for dirpath, _, filenames in os.walk(root):
+                for name in filenames:
+                    try:
+                        usage[key] += os.path.getsize(os.path.join(dirpath, name))
+                    except FileNotFoundError:
+                        pass
+        return usage
+
+    def decrypt_to_temp(self, file_path: str, file_name: str) -> str:
+        """Decrypt an attachment into a temp directory that is removed on lock."""
+        if self.temp_dir is None:
+            self.temp_dir = tempfile.mkdtemp(prefix="vault_")
+        temp_path = os.path.join(self.temp_dir, file_name)
+        self.crypto.decrypt_file(file_path, temp_path)
+        return temp_path
+
+    def list_backups(self) -> list:
+        """Return snapshot ids, newest first."""
+        return self.snapshots.list_snapshots()
+
+    def backup(self) -> dict:
+        """Take an incremental snapshot of entries and attachments and prune old ones."""
+        files = {}
+        for _, entry_data in self.store.items():
+            key = self.snapshots.file_key(entry_data)
+            if key is not None:
+                files[key] = self.attachment_path(entry_data)
+
+        with metrics.span("core.backup"):
+            manifest = self.snapshots.create(self.store.items(), files)
+            self.snapshots.prune(self.BACKUP_KEEP_LAST, self.BACKUP_KEEP_DAILY)
+            # Yaş sınırı sadece değişen kayıtlarda uygulanır; yedekte hepsi elden geçer
+            self.history.prune()
+        return manifest
+
+    def snapshot_file_path(self, key: str) -> str:
+        """Get where a snapshot attachment key should be restored to."""
+        if key.startswith("file:"):
+            return os.path.join(self.files_dir, key[len("file:"):])
+        return self.blob_store.path(key)
+
+    def restore(self, snapshot_id: str) -> None:
+        """Restore entries and attachments from a snapshot."""
+        with metrics.span("core.restore"):
+            self.replace(self.snapshots.restore(snapshot_id, self.snapshot_file_path))
+
+    def diff_backup(self, snapshot_id: str) -> dict:
+        """Compare the live vault with a snapshot, entry by entry.
+
+        Returns sorted title lists: 'added' (only in the backup), 'changed'
+        (different content or attachment) and 'removed' (only in the vault).
+        Entries whose stored form differs only because they were sealed
+        again with a new nonce, or saved again unchanged (new timestamps),
+        are not reported as changed.
+        """
+        def strip(entry):
+            return {key: value for key, value in entry.items() if key not in ('created', 'modified')}
+
+        diff = self.snapshots.diff(snapshot_id, self.store.items())
+        # Aynı içerik yeniden şifrelenince özet değişir; sadece bunlar çözülüp karşılaştırılır
+        saved = self.snapshots.get_entries(snapshot_id, diff["changed"])
+        diff["changed"] = [
+            title for title in diff["changed"]
+            if strip(self.open_entry(title, saved[title])) != strip(self.get(title))
+        ]
+        return diff
+
+    def merge_backup(self, snapshot_id: str, titles) -> int:
+        """Apply selected entries of a snapshot to the live vault; returns how many were written.
+
+        Titles present in the backup are restored (with their attachments),
+        titles that only exist in the vault are deleted. Nothing else is
+        touched.
+        """
+        titles = list(titles)
+        restored = self.snapshots.restore(snapshot_id, self.snapshot_file_path, titles)
+        rows = []
+        for title, entry in restored.items():
+            entry = self.open_entry(title, entry)
+            if entry.get('file_hash'):
+                self.blob_store.retain(entry['file_hash'])
+            rows.append((title, entry))
+        self.put_many(rows, touch=False)
+
+        deleted = 0
+        for title in titles:
+            if title not in restored and self.delete(title):
+                deleted += 1
+        return len(rows) + deleted
+
+    def restore_json(self, path: str) -> None:
+        """Restore entries from an old-style JSON backup file."""
+        with open(path, 'r') as f:
+            self.replace(json.load(f))
+
+    def wipe(self) -> bool:
+        """Back up everything to the secret location, then erase entries, their history and attachments.
+
+        Returns whether the secret backup succeeded.
+        """
+        self.stop_scrubber()
+        export_file = os.path.join(self.base_dir, "vault_export.json")
+        try:
+            self.store.export(export_file)
+        except IOError as e:
+            print(f"Dışa aktarma hatası: {str(e)}")
+        backed_up = self.security_manager.backup_to_secret_location(export_file, self.files_dir, [self.key_file])
+        if os.path.exists(export_file):
+            os.remove(export_file)
+
+        try:
+            self.replace({})
+        except IOError as e:
+            print(f"Veriler silinemedi: {str(e)}")
+        try:
+            self.history.clear()
+        except Exception as e:
+            print(f"Kayıt geçmişi silinemedi: {str(e)}")
+        # Silme sunucuya gönderilmez; kasa yeniden bağlanana kadar senkronize edilmez
+        self.sync_log.forget()
+
+        self.blob_store.close()
+        if os.path.exists(self.files_dir):
+            try:
+                shutil.rmtree(self.files_dir)
+            except Exception as e:
+                print(f"Dosyalar silinirken hata oluştu: {str(e)}")
+        return backed_up
+
+    def _import_entry(self, title: str, entry: dict) -> dict:
+        """Prepare an imported entry: plaintext content and an owned attachment reference."""
+        # Başlık şifrelemede AAD olduğundan, bu kasadan dışa aktarılmış şifreli
+        # içerik eski başlıkla çözülür; put yeni başlıkla yeniden şifreler
+        entry = self.open_entry(title, dict(entry))
+        if entry.get('file_hash') and self.blob_store.exists(entry['file_hash']):
+            self.blob_store.retain(entry['file_hash'])
+        else:
+            entry.pop('file_hash', None)
+            entry['file_name'] = None
+        return entry
+
+    def _free_title(self, title: str, batch: dict) -> str:
+        suffix = 2
+        while True:
+            candidate = f"{title} ({suffix})"
+            if candidate not in batch and candidate not in self.store:
+                return candidate
+            suffix += 1
+
+    def release_replaced(self, previous: dict, entry: dict) -> None:
+        """Release the attachment of an entry that entry replaces, unless entry keeps it."""
+        # Eski tip kayıtta aynı dosya adı korunuyorsa dosya silinmez
+        if not previous.get('file_hash') and previous.get('file_name') == entry.get('file_name'):
+            return
+        self.release_file(previous)
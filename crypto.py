@@ -0,0 +1,245 @@
+import base64
+import hashlib
+import hmac
+import os
+
+from durable import read_json, write_json
+
+
+def _gcm(key: bytes, nonce: bytes):
+    # Cryptodome ilk şifreleme işleminde yüklenir, açılış ekranını bekletmez
+    from Cryptodome.Cipher import AES
+    return AES.new(key, AES.MODE_GCM, nonce=nonce)
+
+
+class VaultLockedError(Exception):
+    """Raised when encrypted data is accessed before the vault key is unlocked."""
+
+
+class VaultCrypto:
+    """Encryption at rest for entries, attachments and the search index.
+
+    A random 256-bit data key encrypts everything with AES-GCM. The data key
+    itself is stored wrapped by a key derived from the PIN with scrypt, so
+    the slow KDF runs once per login and changing the PIN only re-wraps the
+    data key. After unlock() the data key stays in memory until lock().
+
+    Attachments are encrypted in CHUNK_SIZE pieces, each with its own nonce
+    (prefix + counter + last-chunk flag), so files of any size stream
+    through a fixed amount of memory and truncation is detected.
+    """
+
+    KDF_N = 2 ** 15
+    KDF_R = 8
+    KDF_P = 1
+    CHUNK_SIZE = 1024 * 1024
+    MAGIC = b'DVE1'
+    TAG_SIZE = 16
+
+    def __init__(self, key_file: str):
+        self.key_file = key_file
+        self._key = None
+
+    @property
+    def unlocked(self) -> bool:
+        return self._key is not None
+
+    def exists(self) -> bool:
+        """Whether a wrapped data key has been created yet."""
+        return os.path.exists(self.key_file)
+
+    def create(self, pin: str) -> None:
+        """Generate a new data key, wrap it with the PIN and keep it unlocked."""
+        self._key = os.urandom(32)
+        self.rewrap(pin)
+
+    def unlock(self, pin: str) -> bool:
+        """Unwrap the data key with the PIN; returns False if the PIN does not match."""
+        saved = read_json(self.key_file)
+        kek = self._derive(pin, base64.b64decode(saved["salt"]), saved["n"], saved["r"], saved["p"])
+        try:
+            self._key = self._open(kek, base64.b64decode(saved["wrapped_key"]), b'data-key')
+        except ValueError:
+            return False
+        return True
+
+    def rewrap(self, pin: str) -> None:
+        """Store the unlocked data key wrapped with a (new) PIN."""
+        self._require_key()
+        salt = os.urandom(16)
+        kek = self._derive(pin, salt, self.KDF_N, self.KDF_R, self.KDF_P)
+        saved = {
+            "kdf": "scrypt",
+            "n": self.KDF_N,
+            "r": self.KDF_R,
+            "p": self.KDF_P,
+            "salt": base64.b64encode(salt).decode('ascii'),
+            "wrapped_key": base64.b64encode(self._seal(kek, self._key, b'data-key')).decode('ascii')
+        }
+        # Önceki sürüm saklanmaz: eski PIN ile açılabilen bir kopya bırakmamak için
+        write_json(self.key_file, saved)
+
+    def lock(self) -> None:
+        """Forget the data key."""
+        self._key = None
+
+    @classmethod
+    def from_passphrase(cls, passphrase: str, salt: bytes) -> "VaultCrypto":
+        """Return an unlocked, file-less VaultCrypto whose key is derived from passphrase."""
+        crypto = cls(None)
+        crypto._key = cls._derive(passphrase, salt, cls.KDF_N, cls.KDF_R, cls.KDF_P)
+        return crypto
+
+    def wrap_key(self, other: "VaultCrypto") -> bytes:
+        """Encrypt other's key with this one, e.g. to keep a sync key inside the vault."""
+        return self.encrypt_bytes(other._require_key(), b'wrapped-key')
+
+    def unwrap_key(self, wrapped: bytes) -> "VaultCrypto":
+        """Return a file-less VaultCrypto for a key wrapped with wrap_key."""
+        crypto = VaultCrypto(None)
+        crypto._key = self.decrypt_bytes(wrapped, b'wrapped-key')
+        return crypto
+
+    def encrypt_bytes(self, data: bytes, aad: bytes = b'') -> bytes:
+        return self._seal(self._require_key(), data, aad)
+
+    def decrypt_bytes(self, data: bytes, aad: bytes = b'') -> bytes:
+        return self._open(self._require_key(), data, aad)
+
+    def encrypt_text(self, text: str, aad: str = '') -> str:
+        """Encrypt text into a base64 token bound to aad (the entry title)."""
+        return base64.b64encode(self.encrypt_bytes(text.encode('utf-8'), aad.encode('utf-8'))).decode('ascii')
+
+    def decrypt_text(self, token: str, aad: str = '') -> str:
+        return self.decrypt_bytes(base64.b64decode(token), aad.encode('utf-8')).decode('utf-8')
+
+    def mac(self, data: bytes) -> str:
+        """Keyed SHA-256 of data (hex), for telling contents apart without storing them."""
+        mac_key = hashlib.sha256(b'mac-key' + self._require_key()).digest()
+        return hmac.new(mac_key, data, hashlib.sha256).hexdigest()
+
+    def is_encrypted_file(self, path: str) -> bool:
+        with open(path, 'rb') as f:
+            return f.read(len(self.MAGIC)) == self.MAGIC
+
+    def writer(self, dst):
+        """Return a ChunkWriter that encrypts into the binary file object dst."""
+        return ChunkWriter(self, dst)
+
+    def decrypt_chunks(self, src):
+        """Yield plaintext chunks from an encrypted binary file object."""
+        key = self._require_key()
+        header = src.read(len(self.MAGIC) + 7)
+        if header[:len(self.MAGIC)] != self.MAGIC:
+            raise ValueError("Şifreli dosya biçimi tanınmadı")
+        prefix = header[len(self.MAGIC):]
+
+        index = 0
+        current = src.read(self.CHUNK_SIZE + self.TAG_SIZE)
+        while True:
+            following = src.read(self.CHUNK_SIZE + self.TAG_SIZE)
+            final = not following
+            yield self._open_chunk(key, prefix, index, final, current)
+            if final:
+                return
+            current = following
+            index += 1
+
+    def decrypt_prefix(self, path: str, limit: int) -> bytes:
+        """Return the first limit plaintext bytes of an encrypted file, decrypting only the chunks they are in."""
+        key = self._require_key()
+        sealed_chunk = self.CHUNK_SIZE + self.TAG_SIZE
+        with open(path, 'rb') as src:
+            header = src.read(len(self.MAGIC) + 7)
+            if header[:len(self.MAGIC)] != self.MAGIC:
+                raise ValueError("Şifreli dosya biçimi tanınmadı")
+            prefix = header[len(self.MAGIC):]
+            # Son parça işaretini bilmek için dosyanın kaç parça olduğu boyutundan hesaplanır
+            chunks = max(1, -(-(os.fstat(src.fileno()).st_size - len(header)) // sealed_chunk))
+            plain = []
+            size = 0
+            for index in range(chunks):
+                if size >= limit:
+                    break
+                chunk = self._open_chunk(key, prefix, index, index == chunks - 1, src.read(sealed_chunk))
+                plain.append(chunk[:limit - size])
+                size += len(plain[-1])
+        return b''.join(plain)
+
+    def encrypt_file(self, src_path: str, dst_path: str) -> None:
+        with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+            writer = self.writer(dst)
+            while True:
+                chunk = src.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                writer.write(chunk)
+            writer.finish()
+            dst.flush()
+            os.fsync(dst.fileno())
+
+    def decrypt_file(self, src_path: str, dst_path: str) -> None:
+        with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+            for chunk in self.decrypt_chunks(src):
+                dst.write(chunk)
+
+    def _require_key(self) -> bytes:
+        if self._key is None:
+            raise VaultLockedError("Kasa kilitli")
+        return self._key
+
+    @staticmethod
+    def _derive(pin: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        return hashlib.scrypt(pin.encode('utf-8'), salt=salt, n=n, r=r, p=p, maxmem=256 * 1024 * 1024, dklen=32)
+
+    @staticmethod
+    def _seal(key: bytes, data: bytes, aad: bytes) -> bytes:
+        nonce = os.urandom(12)
+        cipher = _gcm(key, nonce)
+        cipher.update(aad)
+        ciphertext, tag = cipher.encrypt_and_digest(data)
+        return nonce + ciphertext + tag
+
+    @staticmethod
+    def _open(key: bytes, data: bytes, aad: bytes) -> bytes:
+        cipher = _gcm(key, data[:12])
+        cipher.update(aad)
+        return cipher.decrypt_and_verify(data[12:-16], data[-16:])
+
+    @staticmethod
+    def _chunk_nonce(prefix: bytes, index: int, final: bool) -> bytes:
+        return prefix + index.to_bytes(4, 'big') + (b'\x01' if final else b'\x00')
+
+    def _open_chunk(self, key: bytes, prefix: bytes, index: int, final: bool, data: bytes) -> bytes:
+        cipher = _gcm(key, self._chunk_nonce(prefix, index, final))
+        return cipher.decrypt_and_verify(data[:-self.TAG_SIZE], data[-self.TAG_SIZE:])
+
+
+class ChunkWriter:
+    """Streams plaintext into VaultCrypto's chunked file format."""
+
+    def __init__(self, crypto: VaultCrypto, dst):
+        self.crypto = crypto
+        self.dst = dst
+        self.key = crypto._require_key()
+        self.prefix = os.urandom(7)
+        self.index = 0
+        self.buffer = b''
+        dst.write(crypto.MAGIC + self.prefix)
+
+    def write(self, data: bytes) -> None:
+        self.buffer += data
+        # Son parça işaretlenebilsin diye her zaman en az bir parça bekletilir
+        while len(self.buffer) > self.crypto.CHUNK_SIZE:
+            self._emit(self.buffer[:self.crypto.CHUNK_SIZE], final=False)
+            self.buffer = self.buffer[self.crypto.CHUNK_SIZE:]
+
+    def finish(self) -> None:
+        self._emit(self.buffer, final=True)
+        self.buffer = b''
+
+    def _emit(self, chunk: bytes, final: bool) -> None:
+        cipher = _gcm(self.key, self.crypto._chunk_nonce(self.prefix, self.index, final))
+        ciphertext, tag = cipher.encrypt_and_digest(chunk)
+        self.dst.write(ciphertext + tag)
+        self.index += 1
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+
+# Dosya sonuna eklenen sağlama satırı: "\n#sha256=<64 hex>\n"
+TRAILER_PREFIX = b"\n#sha256="
+TRAILER_SIZE = len(TRAILER_PREFIX) + 64 + 1
+PREVIOUS_SUFFIX = ".prev"
+
+
+class CorruptFileError(IOError):
+    """Raised when a file does not match its checksum trailer."""
+
+
+def fsync_dir(path: str) -> None:
+    """Flush a directory, so a file just created or renamed in it survives a crash."""
+    # Windows'ta dizinler fsync için açılamaz; rename orada zaten günlüklenir
+    if os.name == 'nt':
+        return
+    fd = os.open(path or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def replace_file(tmp_path: str, path: str, keep_previous: bool = False) -> None:
+    """Atomically move a fully written and fsynced tmp_path over path.
+
+    With keep_previous the current file is kept as path + ".prev" so
+    readers can fall back to it.
+    """
+    if keep_previous and os.path.exists(path):
+        os.replace(path, path + PREVIOUS_SUFFIX)
+    os.replace(tmp_path, path)
+    fsync_dir(os.path.dirname(path))
+
+
+def write_file(path: str, data: bytes, checksum: bool = True, keep_previous: bool = False) -> None:
+    """Write data to path via a temp file, fsync and an atomic rename.
+
+    With checksum a SHA-256 trailer is appended, which read_file verifies.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        if checksum:
+            f.write(TRAILER_PREFIX + hashlib.sha256(data).hexdigest().encode('ascii') + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+    replace_file(tmp_path, path, keep_previous)
+
+
+def read_file(path: str) -> bytes:
+    """Read a file written by write_file and verify its trailer.
+
+    Files without a trailer (written before checksums were added) are
+    returned as they are.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    trailer = raw[-TRAILER_SIZE:]
+    if len(raw) < TRAILER_SIZE or not trailer.startswith(TRAILER_PREFIX) or not trailer.endswith(b"\n"):
+        return raw
+    data = raw[:-TRAILER_SIZE]
+    if hashlib.sha256(data).hexdigest().encode('ascii') != trailer[len(TRAILER_PREFIX):-1]:
+        raise CorruptFileError(f"Sağlama toplamı tutmuyor: {path}")
+    return data
+
+
+def write_json(path: str, data, keep_previous: bool = False) -> None:
+    """Durably write data as JSON with a checksum trailer."""
+    write_file(path, json.dumps(data, ensure_ascii=False).encode('utf-8'), keep_previous=keep_previous)
+
+
+def read_json(path: str):
+    """Read a JSON file written by write_json.
+
+    If the file is missing, torn or fails its checksum, the previous
+    generation (path + ".prev") is used when there is one.
+    """
+    try:
+        return json.loads(read_file(path).decode('utf-8'))
+    except (FileNotFoundError, CorruptFileError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        previous = path + PREVIOUS_SUFFIX
+        if not os.path.exists(previous):
+            raise
+        print(f"{os.path.basename(path)} okunamadı, önceki sürüm kullanılıyor: {str(e)}")
+        return json.loads(read_file(previous).decode('utf-8'))
@@ -0,0 +1,259 @@
+import difflib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+
+class HistoryStore:
+    """Past versions of entries, stored as forward deltas with keyframes.
+
+    A title gets history the first time it is overwritten or deleted: the
+    version being replaced is stored in full (a keyframe), the new one as a
+    line delta against it. A new keyframe is written once the delta chain
+    reaches MAX_CHAIN revisions or its deltas add up to more than a full
+    copy would take, so rebuilding any revision applies a bounded number of
+    deltas and the space used grows with the size of the edits.
+
+    Revisions are compressed and encrypted with the vault's VaultCrypto
+    (bound to title and revision number). A keyed digest of every version
+    lets record() notice when the vault changed behind its back (restore,
+    a crash between the two writes) and start a new keyframe instead of
+    chaining onto a version it never saw.
+    """
+
+    MAX_CHAIN = 50
+
+    def __init__(self, db_path: str, crypto, keep_last: int = 100, max_age: float = None):
+        self.db_path = db_path
+        self.crypto = crypto
+        self.keep_last = keep_last
+        self.max_age = max_age
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        self._conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Güç kesintisinde son geçmiş kaydı kaybolabilir; özet kontrolü zinciri yeniden başlatır
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS revisions ("
+            "title TEXT NOT NULL, rev INTEGER NOT NULL, time REAL NOT NULL, kind TEXT NOT NULL, "
+            "digest TEXT, chain INTEGER NOT NULL, chain_bytes INTEGER NOT NULL, data BLOB NOT NULL, "
+            "PRIMARY KEY (title, rev))"
+        )
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def record(self, changes: list, when: float = None) -> None:
+        """Store revisions for (title, previous, entry) triples in one transaction.
+
+        previous and entry are plaintext entries; entry None is a delete.
+        Titles without a previous version get no history until they change.
+        Titles with more than keep_last revisions are pruned as they go.
+        """
+        when = time.time() if when is None else when
+        crowded = []
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for title, previous, entry in changes:
+                    if previous is not None and self._record(title, previous, entry, when) > self.keep_last:
+                        crowded.append(title)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        for title in crowded:
+            self.prune(title)
+
+    def clear(self) -> None:
+        """Forget every revision."""
+        with self._lock:
+            self._conn.execute("DELETE FROM revisions")
+
+    def revisions(self, title: str) -> list:
+        """Return [{'rev', 'time', 'deleted'}] for a title, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT rev, time, kind FROM revisions WHERE title = ? ORDER BY rev DESC", (title,)
+            ).fetchall()
+        return [{'rev': rev, 'time': when, 'deleted': kind == 'del'} for rev, when, kind in rows]
+
+    def titles(self) -> list:
+        """Return every title that has history, including deleted ones."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT title FROM revisions ORDER BY title")]
+
+    def get(self, title: str, rev: int):
+        """Rebuild a revision; returns the entry, or None if it is a delete or unknown."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT rev, kind, data FROM revisions WHERE title = ? AND rev <= ? AND rev >= "
+                "(SELECT MAX(rev) FROM revisions WHERE title = ? AND rev <= ? AND kind != 'delta') "
+                "ORDER BY rev",
+                (title, rev, title, rev)
+            ).fetchall()
+        if not rows or rows[-1][0] != rev or rows[-1][1] == 'del':
+            return None
+
+        entry = None
+        for row_rev, kind, data in rows:
+            record = self._unpack(title, row_rev, data)
+            entry = record if kind == 'full' else apply_delta(entry, record)
+        return entry
+
+    def attachments(self):
+        """Yield (file_hash, file_name) for every stored revision that has an attachment."""
+        with self._lock:
+            rows = self._conn.execute("SELECT title, rev, kind, data FROM revisions WHERE kind != 'del'").fetchall()
+        for title, rev, kind, data in rows:
+            record = self._unpack(title, rev, data)
+            # Delta kayıtları içerik dışındaki alanların tamamını taşır
+            fields = record if kind == 'full' else record['fields']
+            if fields.get('file_hash') or fields.get('file_name'):
+                yield fields.get('file_hash'), fields.get('file_name')
+
+    def rev_at(self, title: str, when: float):
+        """Return the number of the revision that was current at time when, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(rev) FROM revisions WHERE title = ? AND time <= ?", (title, when)
+            ).fetchone()
+        return row[0]
+
+    def prune(self, title: str = None) -> int:
+        """Drop revisions beyond the newest keep_last and those replaced more than max_age seconds ago.
+
+        Only whole delta chains are removed (everything before a keyframe),
+        so what is kept never has to be rewritten: the keyframe the oldest
+        kept revision is rebuilt from always stays, as does the newest
+        revision of a title. Returns the number of revisions removed.
+        """
+        keep_last = self.keep_last
+        cutoff = time.time() - self.max_age if self.max_age else None
+        removed = 0
+        with self._lock:
+            titles = [title] if title is not None else [
+                row[0] for row in self._conn.execute("SELECT DISTINCT title FROM revisions")
+            ]
+            for name in titles:
+                revs = self._conn.execute(
+                    "SELECT rev, time, kind FROM revisions WHERE title = ? ORDER BY rev DESC", (name,)
+                ).fetchall()
+                # Bir revizyonun yaşı, yerine yenisinin geçtiği andan sayılır
+                drop_from = next((
+                    i for i in range(1, len(revs))
+                    if i >= keep_last or (cutoff is not None and revs[i - 1][1] < cutoff)
+                ), None)
+                if drop_from is None:
+                    continue
+                # Kalan en eski revizyonun zincirinin başındaki anahtar kare de kalır
+                boundary = next(rev for rev, _, kind in revs[drop_from - 1:] if kind != 'delta')
+                cursor = self._conn.execute("DELETE FROM revisions WHERE title = ? AND rev < ?", (name, boundary))
+                removed += cursor.rowcount
+        return removed
+
+    def _record(self, title: str, previous: dict, entry, when: float) -> int:
+        """Insert the revision(s) for one change and return the new revision number."""
+        latest = self._conn.execute(
+            "SELECT rev, kind, digest, chain, chain_bytes FROM revisions WHERE title = ? ORDER BY rev DESC LIMIT 1",
+            (title,)
+        ).fetchone()
+        previous_digest = self._digest(previous)
+
+        rev = 1
+        if latest is not None:
+            rev = latest[0] + 1
+        if latest is None or latest[1] == 'del' or latest[2] != previous_digest:
+            # Önceki sürüm geçmişte yok: önce o tam olarak saklanır. İlk kez değişen
+            # kaydın zamanı son değişikliğidir; bilinmiyorsa (eski kayıtlar) 0, yani "hep vardı"
+            since = when if latest is not None else min(previous.get('modified') or 0, when)
+            self._insert(title, rev, since, 'full', previous_digest, 0, 0, previous)
+            latest = (rev, 'full', previous_digest, 0, 0)
+            rev += 1
+
+        if entry is None:
+            self._insert(title, rev, when, 'del', None, 0, 0, None)
+            return rev
+
+        # Boyutlar şifrelemeden önce karşılaştırılır; şifreleme sabit bir ek getirir
+        delta_raw = self._compress(make_delta(previous, entry))
+        full_raw = self._compress(entry)
+        chain, chain_bytes = latest[3] + 1, latest[4] + len(delta_raw)
+        digest = self._digest(entry)
+        if chain >= self.MAX_CHAIN or chain_bytes >= len(full_raw):
+            self._conn.execute(
+                "INSERT INTO revisions VALUES (?, ?, ?, 'full', ?, 0, 0, ?)",
+                (title, rev, when, digest, self._seal(title, rev, full_raw))
+            )
+        else:
+            self._conn.execute(
+                "INSERT INTO revisions VALUES (?, ?, ?, 'delta', ?, ?, ?, ?)",
+                (title, rev, when, digest, chain, chain_bytes, self._seal(title, rev, delta_raw))
+            )
+        return rev
+
+    def _insert(self, title, rev, when, kind, digest, chain, chain_bytes, value) -> None:
+        data = b'' if value is None else self._seal(title, rev, self._compress(value))
+        self._conn.execute(
+            "INSERT INTO revisions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (title, rev, when, kind, digest, chain, chain_bytes, data)
+        )
+
+    @staticmethod
+    def _compress(value) -> bytes:
+        return zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+
+    def _seal(self, title: str, rev: int, raw: bytes) -> bytes:
+        return self.crypto.encrypt_bytes(raw, f"{title}\0{rev}".encode('utf-8'))
+
+    def _unpack(self, title: str, rev: int, data: bytes):
+        raw = self.crypto.decrypt_bytes(data, f"{title}\0{rev}".encode('utf-8'))
+        return json.loads(zlib.decompress(raw).decode('utf-8'))
+
+    def _digest(self, entry: dict) -> str:
+        return self.crypto.mac(json.dumps(entry, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+
+
+def make_delta(old: dict, new: dict) -> dict:
+    """Describe new as line edits of old's content plus new's other fields."""
+    old_lines = old.get('content', '').splitlines(keepends=True)
+    new_lines = new.get('content', '').splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append(i2 - i1)
+        else:
+            # Sayı: eski satırları kopyala; liste: [atlanacak eski satır sayısı, yeni satırlar]
+            ops.append([i2 - i1, new_lines[j1:j2]])
+    return {
+        'fields': {key: value for key, value in new.items() if key != 'content'},
+        'has_content': 'content' in new,
+        'ops': ops
+    }
+
+
+def apply_delta(old: dict, delta: dict) -> dict:
+    """Rebuild the entry make_delta(old, new) was made from."""
+    old_lines = old.get('content', '').splitlines(keepends=True)
+    lines = []
+    position = 0
+    for op in delta['ops']:
+        if isinstance(op, int):
+            lines.extend(old_lines[position:position + op])
+            position += op
+        else:
+            skip, added = op
+            lines.extend(added)
+            position += skip
+    entry = dict(delta['fields'])
+    if delta['has_content']:
+        entry['content'] = ''.join(lines)
+    return entry
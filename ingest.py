@@ -0,0 +1,118 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from blobstore import BlobStore, IngestCancelled
+
+
+class IngestJob:
+    """Progress and outcome of one attachment being copied into the vault."""
+
+    def __init__(self, src_path: str, on_done=None):
+        self.src_path = src_path
+        self.file_name = os.path.basename(src_path)
+        try:
+            self.total = os.path.getsize(src_path)
+        except OSError:
+            self.total = 0
+        self.copied = 0
+        self.digest = None
+        self.error = None
+        self.finished = False
+        self.on_done = on_done
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the file copied so far, between 0 and 1."""
+        return self.copied / self.total if self.total else 0.0
+
+    def cancel(self) -> None:
+        """Ask the worker to stop; the partial copy is discarded."""
+        self._cancel.set()
+
+
+class AttachmentIngester:
+    """Copies attachments into the blob store on worker threads.
+
+    Files are streamed in BlobStore.CHUNK_SIZE chunks into a temp file and
+    renamed into place once complete. The Tk thread never touches the data:
+    it polls the running jobs with window.after, reports progress through
+    on_progress and runs each job's on_done callback once it has finished.
+    """
+
+    POLL_MS = 100
+
+    def __init__(self, window, blob_store: BlobStore, max_workers: int = 2, on_progress=None):
+        self.window = window
+        self.blob_store = blob_store
+        self.on_progress = on_progress
+        self.jobs = []
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self._polling = False
+
+    def submit(self, src_path: str, on_done=None) -> IngestJob:
+        """Start copying src_path into the vault and return its job."""
+        job = IngestJob(src_path, on_done)
+        self.jobs.append(job)
+        self._executor.submit(self._run, job)
+        if not self._polling:
+            self._polling = True
+            self.window.after(self.POLL_MS, self._poll)
+        return job
+
+    def cancel_all(self) -> None:
+        """Cancel every running job; their on_done callbacks still run."""
+        for job in self.jobs:
+            job.cancel()
+
+    def shutdown(self) -> None:
+        """Cancel every running job, wait for the workers to stop and hand every job to its on_done.
+
+        Jobs that had already finished are not cancelled, so their copy can
+        still be attached; a job's reference to its blob is released here
+        when it has no on_done to take it over.
+        """
+        for job in self.jobs:
+            if not job.finished:
+                job.cancel()
+        self._executor.shutdown(wait=True)
+        # Bitip henüz yoklanmamış işlerin blob referansı kaybolmasın
+        jobs, self.jobs = self.jobs, []
+        for job in jobs:
+            if job.on_done is not None:
+                job.on_done(job)
+            elif job.digest is not None:
+                self.blob_store.release(job.digest)
+
+    def _run(self, job: IngestJob) -> None:
+        def progress(copied):
+            job.copied = copied
+
+        try:
+            job.digest = self.blob_store.add_file(job.src_path, progress=progress, cancelled=lambda: job.cancelled)
+        except IngestCancelled:
+            pass
+        except Exception as e:
+            job.error = e
+        finally:
+            job.finished = True
+
+    def _poll(self) -> None:
+        done = [job for job in self.jobs if job.finished]
+        self.jobs = [job for job in self.jobs if not job.finished]
+
+        if self.on_progress is not None:
+            self.on_progress(self.jobs)
+        for job in done:
+            if job.on_done is not None:
+                job.on_done(job)
+
+        if self.jobs:
+            self.window.after(self.POLL_MS, self._poll)
+        else:
+            self._polling = False
@@ -1,107 +1,143 @@
-import subprocess
+import time
+_started = time.perf_counter()
+
 import tkinter as tk
-from tkinter import messagebox, filedialog
-import json
+from tkinter import messagebox, filedialog, simpledialog
 import os
-import shutil
+import subprocess
+import sys
+import threading
 from datetime import datetime
-import winreg
-import platform
-import py7zr
-
-
-class SecurityManager:
-    def __init__(self):
-        self.registry_path = r"Software\DigitalVault"
-        self.registry_key = "SecretPath"
-        self.secret_path = self.get_or_create_secret_path()
-
-    def get_or_create_secret_path(self):
-        if platform.system() != 'Windows':
-            # Windows dışı sistemler için alternatif yol
-            secret_path = os.path.join(os.path.expanduser('~'), '.vault_backup')
-            if not os.path.exists(secret_path):
-                os.makedirs(secret_path)
-            return secret_path
-
-        try:
-            key = winreg.CreateKey(winreg.HKEY_CURRENT_USER, self.registry_path)
-            path, _ = winreg.QueryValueEx(key, self.registry_key)
-            winreg.CloseKey(key)
-
-            if not os.path.exists(path):
-                os.makedirs(path)
-                subprocess.run(['attrib', '+h', path], shell=True)
 
-            return path
-        except:
-            documents_path = os.path.expanduser('~\\Documents')
-            secret_path = os.path.join(documents_path, '.vault_backup')
-
-            if not os.path.exists(secret_path):
-                os.makedirs(secret_path)
-                subprocess.run(['attrib', '+h', secret_path], shell=True)
-
-            key = winreg.CreateKey(winreg.HKEY_CURRENT_USER, self.registry_path)
-            winreg.SetValueEx(key, self.registry_key, 0, winreg.REG_SZ, secret_path)
-            winreg.CloseKey(key)
-
-            return secret_path
-
-    def backup_to_secret_location(self, vault_path, files_dir):
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            archive_name = f"vault_backup_{timestamp}.7z"
-            archive_path = os.path.join(self.secret_path, archive_name)
-
-            # 7z formatında şifreli arşiv oluştur
-            with py7zr.SevenZipFile(archive_path, 'w', password='your_password_here') as archive:
-                if os.path.exists(vault_path):
-                    archive.write(vault_path, os.path.basename(vault_path))
-                if os.path.exists(files_dir):
-                    archive.writeall(files_dir, 'files')
-
-            return True
-        except Exception as e:
-            print(f"Yedekleme hatası: {str(e)}")
-            return False
+import metrics
+from core import VaultWipedError
+from metaindex import parse_tags
+from ingest import AttachmentIngester
+from pinstore import PinLockedError
+from preview import (
+    LRUCache, MAX_IMAGE_BYTES, TEXT_PREVIEW_BYTES, make_thumbnail, preview_kind, text_preview, thumbnail_bytes
+)
+from savequeue import SaveQueue
+from vaults import VaultPool
+from widgets import VirtualListbox
 
 
 class DigitalVault:
-    DEFAULT_PIN = "1234"
-    MAX_ATTEMPTS = 3
+    LIST_PAGE_SIZE = 500
+    # Değişiklikler en fazla bu aralıkla (saniye) toplu olarak diske yazılır
+    SAVE_FLUSH_INTERVAL = 0.5
+    SAVE_POLL_MS = 250
+    STATUS_MS = 2000
+    # Bu kadar saniye kullanılmayan kasalar kasa değiştirirken kapatılır
+    VAULT_IDLE_SECONDS = 600
+    METRICS_REFRESH_MS = 1000
+    # Disk kullanımı dizinleri gezerek ölçülür; arka planda en fazla bu sıklıkla (saniye)
+    DISK_SAMPLE_SECONDS = 30
+    BACKGROUND_POLL_MS = 50
+    SYNC_DEFAULT_SERVER = "http://127.0.0.1:8765"
+    ALL_TAGS = "Tüm etiketler"
+    ORDERS = {"Başlık": 'title', "Son değişiklik": 'modified'}
+    # Çözülmüş önizlemeler ve küçük resimler için ayrılan en fazla bellek
+    PREVIEW_CACHE_BYTES = 16 * 1024 * 1024
 
     def __init__(self):
         """Initialize the Digital Vault application."""
         self.window = tk.Tk()
         self.setup_window()
 
-        # Security Manager
-        self.security_manager = SecurityManager()
-
-        # Dosya saklama dizini oluştur
-        self.files_dir = os.path.join(os.path.dirname(__file__), "vault_files")
-        os.makedirs(self.files_dir, exist_ok=True)
+        # Kasa işlemleri arayüzden bağımsız çekirdekte; pencere sadece istemci.
+        # Birden fazla kasa açık tutulur, etkin olan self.core
+        app_dir = os.path.dirname(__file__)
+        self.vaults = VaultPool(os.environ.get("VAULT_CONFIG", os.path.join(app_dir, "vaults.json")), app_dir)
+        self.vault_name = None
+        self.core = None
+        self.ingester = None
+        self.save_queue = None
+        self.watching_saves = False
 
         # Instance variables
-        self.attempt_count = 0
+        self.verifying_pin = False
+        self.syncing = False
         self.is_logged_in = False
         self.data_listbox = None
         self.title_entry = None
         self.content_text = None
+        self.tags_entry = None
+        self.meta_label = None
         self.pin_entry = None
         self.selected_file_path = None
         self.selected_file_label = None
+        self.open_file_button = None
+        self.preview_image = None
+        self.preview_text = None
+        self.attachment_entry = None
+        self.preview_cache = LRUCache(self.PREVIEW_CACHE_BYTES, name="preview_cache")
+        self.ingest_frame = None
+        self.ingest_rows = {}
+        self.pending_ingest = {}
+        self.search_var = None
+        self.tag_var = None
+        self.tag_menu = None
+        self.order_var = None
+        self.status_label = None
+        self.metrics_window = None
+        self.disk_gauge = None
+        self.startup_seconds = None
+        # VAULT_METRICS_DUMP ayarlıysa ölçümler düzenli olarak yazılır
+        self.metrics_dumper = metrics.start_dumper_from_env()
+
+        self.open_vault(os.environ.get("VAULT_NAME", self.vaults.names()[0]))
+
+    def open_vault(self, name: str) -> None:
+        """Make name the active vault and show its login screen; the vault itself loads once that is drawn."""
+        if self.core is not None:
+            self.close_active_vault()
+        self.vaults.evict_idle(self.VAULT_IDLE_SECONDS, keep=(name,))
+        self.vault_name = name
+        self.core = None
+        if name == VaultPool.DEFAULT_NAME:
+            self.window.title("Gelişmiş Dijital Kasa")
+        else:
+            self.window.title(f"Gelişmiş Dijital Kasa - {name}")
 
-        # Load data
-        self.vault_data = self.load_data()
-        self.correct_pin = self.load_pin()
+        self.create_login_screen()
+        # Boşta çalışan işler sırayla yürür: ekran önce çizilir, depolama sonra açılır
+        self.window.after_idle(self.load_vault)
+
+    def load_vault(self) -> None:
+        """Open the active vault's storage and background workers, and read its PIN."""
+        if self.core is not None:
+            return
+        if self.startup_seconds is None:
+            # main.py yüklenmeye başladığından giriş ekranı çizilene kadar geçen süre
+            self.startup_seconds = time.perf_counter() - _started
+            metrics.record("gui.startup", self.startup_seconds)
+
+        with metrics.span("gui.load_vault"):
+            if not self.load_data():
+                return
+            metrics.set_gauge("entries", lambda: len(self.core))
+            self.disk_gauge = metrics.SampledGauge(self.core.disk_usage, self.DISK_SAMPLE_SECONDS)
+            metrics.set_gauge("disk", self.disk_gauge)
+            metrics.set_gauge("preview_cache_bytes", lambda: self.preview_cache.size)
+            self.ingester = AttachmentIngester(self.window, self.core.blob_store, on_progress=self.update_ingest_rows)
+            self.save_queue = SaveQueue(self.core, self.SAVE_FLUSH_INTERVAL)
+            self.load_pin()
 
         # İlk kurulumu kontrol et
-        if not os.path.exists(self.pin_file):
+        if not os.path.exists(self.core.pin_file):
             self.first_time_setup()
-        else:
-            self.create_login_screen()
+
+    def close_active_vault(self) -> None:
+        """Stop the active vault's background work; the vault itself stays open in the pool."""
+        if self.core is None:
+            return
+        self.preview_cache.clear()
+        self.ingester.shutdown()
+        try:
+            self.save_queue.close()
+        except IOError:
+            messagebox.showerror("Hata", "Veriler kaydedilemedi!")
 
     def setup_window(self) -> None:
         """Set up the main window properties."""
@@ -116,58 +152,105 @@ class DigitalVault:
 
     def on_closing(self) -> None:
         """Handle window closing event."""
-        if self.is_logged_in:
-            if messagebox.askokcancel("Çıkış", "Kasadan çıkmak istediğinize emin misiniz?"):
-                self.window.destroy()
-        else:
-            self.window.destroy()
-
-    @property
-    def data_file(self) -> str:
-        """Get the path to the data file."""
-        return os.path.join(os.path.dirname(__file__), "vault_data.json")
-
-    @property
-    def pin_file(self) -> str:
-        """Get the path to the PIN file."""
-        return os.path.join(os.path.dirname(__file__), "pin.json")
+        if self.is_logged_in and not messagebox.askokcancel("Çıkış", "Kasadan çıkmak istediğinize emin misiniz?"):
+            return
+        self.close_data()
+        if self.metrics_dumper is not None:
+            self.metrics_dumper.stop()
+        self.window.destroy()
 
-    def load_pin(self) -> str:
+    def load_pin(self) -> None:
         """Load PIN from file or create with default."""
         try:
-            if os.path.exists(self.pin_file):
-                with open(self.pin_file, 'r') as f:
-                    return json.load(f)["pin"]
-        except (json.JSONDecodeError, KeyError, IOError):
-            pass
-        self.save_pin(self.DEFAULT_PIN)
-        return self.DEFAULT_PIN
+            self.core.load_pin()
+        except IOError as e:
+            # Okunamayan PIN dosyası varsayılanla değiştirilmez; giriş yapılamaz
+            messagebox.showerror("Hata", f"PIN yüklenemedi: {str(e)}")
 
     def save_pin(self, pin: str) -> None:
         """Save PIN to file."""
         try:
-            with open(self.pin_file, 'w') as f:
-                json.dump({"pin": pin}, f)
+            self.core.save_pin(pin)
         except IOError:
             messagebox.showerror("Hata", "PIN kaydedilemedi!")
 
-    def load_data(self) -> dict:
-        """Load vault data from file."""
+    def load_data(self) -> bool:
+        """Open the active vault's storage engine, or reuse it if the pool has it open.
+
+        Returns False (leaving core unset) if it cannot be opened.
+        """
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            pass
-        return {}
-
-    def save_data(self) -> None:
-        """Save vault data to file."""
+            self.core = self.vaults.open(self.vault_name)
+        except IOError as e:
+            # Açılamayan kasa ile devam edilmez; giriş ekranından tekrar denenir ya da başka kasa seçilir
+            messagebox.showerror("Hata", f"Veriler yüklenemedi: {str(e)}")
+            self.core = None
+            return False
+        return True
+
+    def close_data(self) -> None:
+        """Close every open vault's storage engine and lock them."""
+        self.close_active_vault()
+        if self.core is not None and not self.vaults.is_open(self.vault_name):
+            self.core.close()
+        self.vaults.close_all()
+
+    def run_background(self, work, on_done) -> None:
+        """Run work() on a worker thread and call on_done(result, error) on the Tk thread."""
+        outcome = {}
+
+        def target():
+            try:
+                outcome['result'] = work()
+            except Exception as e:
+                outcome['error'] = e
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+
+        def poll():
+            if thread.is_alive():
+                self.window.after(self.BACKGROUND_POLL_MS, poll)
+            else:
+                on_done(outcome.get('result'), outcome.get('error'))
+
+        self.window.after(self.BACKGROUND_POLL_MS, poll)
+
+    def lock_vault(self) -> None:
+        """Stop attachment copies and lock the vault."""
+        self.ingester.cancel_all()
+        self.flush_saves()
+        # Önbellekte çözülmüş dosya içerikleri var
+        self.preview_cache.clear()
+        self.core.lock()
+
+    def save_data(self, title: str, entry: dict = None) -> None:
+        """Queue a single entry to be saved, or deleted when no entry is given."""
+        if entry is None:
+            self.save_queue.delete(title)
+        else:
+            self.save_queue.put(title, entry)
+        if not self.watching_saves:
+            self.watching_saves = True
+            self.window.after(self.SAVE_POLL_MS, self.watch_saves)
+
+    def watch_saves(self) -> None:
+        """Report background write errors until the save queue is empty."""
+        if self.save_queue.pop_error() is not None:
+            messagebox.showerror("Hata", "Veriler kaydedilemedi!")
+        if self.save_queue.idle:
+            self.watching_saves = False
+        else:
+            self.window.after(self.SAVE_POLL_MS, self.watch_saves)
+
+    def flush_saves(self) -> bool:
+        """Write queued changes now; returns False (after telling the user) if that failed."""
         try:
-            with open(self.data_file, 'w') as f:
-                json.dump(self.vault_data, f, ensure_ascii=False, indent=2)
+            self.save_queue.flush()
+            return True
         except IOError:
             messagebox.showerror("Hata", "Veriler kaydedilemedi!")
+            return False
 
     def first_time_setup(self):
         """İlk kurulum ekranı"""
@@ -200,7 +283,6 @@ class DigitalVault:
                 return
 
             # PIN'i kaydet
-            self.correct_pin = pin
             self.save_pin(pin)
 
             messagebox.showinfo(
@@ -280,6 +362,39 @@ class DigitalVault:
 
         self.create_custom_button(login_frame, "Giriş", self.check_pin).pack(pady=10)
 
+        # Kasa seçimi
+        vault_frame = tk.Frame(login_frame, bg='#2c3e50')
+        vault_frame.pack(pady=10)
+        names = self.vaults.names()
+        if len(names) > 1:
+            vault_var = tk.StringVar(value=self.vault_name)
+            vault_menu = tk.OptionMenu(vault_frame, vault_var, *names, command=self.switch_vault)
+            vault_menu.configure(font=('Helvetica', 11), bg='#34495e', fg='white', highlightthickness=0)
+            vault_menu.pack(side=tk.LEFT, padx=5)
+        self.create_custom_button(vault_frame, "Kasa Ekle...", self.add_vault).pack(side=tk.LEFT, padx=5)
+
+    def switch_vault(self, name: str) -> None:
+        """Switch the login screen to another vault."""
+        if name != self.vault_name and not self.verifying_pin:
+            self.open_vault(name)
+
+    def add_vault(self) -> None:
+        """Register a new vault directory and switch to it."""
+        if self.verifying_pin:
+            return
+        path = filedialog.askdirectory(title="Kasa Dizini Seç")
+        if not path:
+            return
+        name = simpledialog.askstring("Kasa Ekle", "Kasa adı:", parent=self.window)
+        if not name or not name.strip():
+            return
+        try:
+            self.vaults.add(name.strip(), path)
+        except IOError as e:
+            messagebox.showerror("Hata", f"Kasa eklenemedi: {str(e)}")
+            return
+        self.open_vault(name.strip())
+
     def create_vault_screen(self) -> None:
         """Create the main vault screen."""
         self.clear_widgets()
@@ -306,7 +421,12 @@ class DigitalVault:
             ("← Geri", self.logout),
             ("PIN Değiştir", self.show_change_pin_dialog),
             ("Yedekle", self.backup_data),
-            ("Yedeği Geri Yükle", self.restore_backup)
+            ("Yedeği Geri Yükle", self.restore_backup),
+            ("İçe Aktar", self.import_entries),
+            ("Dışa Aktar", self.export_entries),
+            ("Senkronize Et", self.sync_vault),
+            ("Bütünlük", self.show_integrity_report),
+            ("Performans", self.show_metrics_panel)
         ]
 
         for text, command in buttons:
@@ -333,6 +453,14 @@ class DigitalVault:
         )
         self.content_text.pack(pady=5, fill='both', expand=True)
 
+        self.create_custom_label(left_frame, "Etiketler (virgülle):").pack()
+        self.tags_entry = self.create_custom_entry(left_frame)
+        self.tags_entry.pack(pady=5, fill='x')
+
+        # Oluşturma/değişiklik tarihi ve dosya bilgisi
+        self.meta_label = self.create_custom_label(left_frame, "", size=10)
+        self.meta_label.pack()
+
         # Dosya seçme butonu ve etiketi
         file_frame = tk.Frame(left_frame, bg='#2c3e50')
         file_frame.pack(fill='x', pady=5)
@@ -340,12 +468,35 @@ class DigitalVault:
         self.create_custom_button(file_frame, "Dosya Seç", self.select_file).pack(side=tk.LEFT)
         self.selected_file_label = self.create_custom_label(file_frame, "")
         self.selected_file_label.pack(side=tk.LEFT, padx=10)
+        self.open_file_button = self.create_custom_button(file_frame, "Aç", self.open_selected_file)
+
+        # Seçili kaydın dosyasının önizlemesi (metin ya da küçük resim)
+        self.preview_image = tk.Label(left_frame, bg='#2c3e50')
+        self.preview_text = tk.Text(
+            left_frame,
+            font=('Courier', 10),
+            height=6,
+            bg='#34495e',
+            fg='white',
+            wrap='none'
+        )
 
         button_frame = tk.Frame(left_frame, bg='#2c3e50')
         button_frame.pack(pady=10)
 
         self.create_custom_button(button_frame, "Kaydet", self.save_entry).pack(side=tk.LEFT, padx=5)
         self.create_custom_button(button_frame, "Sil", self.delete_entry).pack(side=tk.LEFT, padx=5)
+        self.create_custom_button(button_frame, "Geçmiş", self.show_history).pack(side=tk.LEFT, padx=5)
+
+        self.status_label = self.create_custom_label(left_frame, "", size=10)
+        self.status_label.pack()
+
+        # Arka planda kopyalanan dosyaların ilerlemesi
+        self.ingest_frame = tk.Frame(left_frame, bg='#2c3e50')
+        self.ingest_frame.pack(fill='x')
+        self.ingest_rows = {}
+        for job in self.ingester.jobs:
+            self.add_ingest_row(job)
 
     def create_list_panel(self, parent: tk.Widget) -> None:
         """Create the list panel for showing saved data."""
@@ -354,70 +505,105 @@ class DigitalVault:
 
         self.create_custom_label(right_frame, "Kayıtlı Veriler:").pack()
 
-        list_frame = tk.Frame(right_frame, bg='#2c3e50')
-        list_frame.pack(fill='both', expand=True)
-
-        scrollbar = tk.Scrollbar(list_frame)
-        scrollbar.pack(side=tk.RIGHT, fill='y')
-
-        self.data_listbox = tk.Listbox(
-            list_frame,
+        search_frame = tk.Frame(right_frame, bg='#2c3e50')
+        search_frame.pack(fill='x', pady=5)
+
+        self.create_custom_label(search_frame, "Ara:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        search_entry = self.create_custom_entry(search_frame)
+        search_entry.configure(textvariable=self.search_var)
+        search_entry.pack(side=tk.LEFT, fill='x', expand=True, padx=5)
+        self.search_var.trace_add('write', lambda *args: self.apply_search())
+
+        # Etikete göre süzme ve sıralama ikincil indekslerden gelir
+        filter_frame = tk.Frame(right_frame, bg='#2c3e50')
+        filter_frame.pack(fill='x', pady=(0, 5))
+
+        self.tag_var = tk.StringVar(value=self.ALL_TAGS)
+        self.tag_menu = tk.OptionMenu(filter_frame, self.tag_var, self.ALL_TAGS)
+        self.tag_menu.configure(font=('Helvetica', 11), bg='#34495e', fg='white', highlightthickness=0)
+        self.tag_menu.pack(side=tk.LEFT)
+        self.tag_var.trace_add('write', lambda *args: self.apply_search())
+
+        self.order_var = tk.StringVar(value="Başlık")
+        order_menu = tk.OptionMenu(filter_frame, self.order_var, *self.ORDERS)
+        order_menu.configure(font=('Helvetica', 11), bg='#34495e', fg='white', highlightthickness=0)
+        order_menu.pack(side=tk.RIGHT)
+        self.order_var.trace_add('write', lambda *args: self.apply_search())
+
+        # Sadece görünen satırları çizen liste
+        self.data_listbox = VirtualListbox(
+            right_frame,
             font=('Helvetica', 12),
             width=30,
             height=15,
             bg='#34495e',
-            fg='white',
-            selectmode=tk.SINGLE,
-            yscrollcommand=scrollbar.set
+            fg='white'
         )
-        self.data_listbox.pack(side=tk.LEFT, fill='both', expand=True)
-        scrollbar.config(command=self.data_listbox.yview)
+        self.data_listbox.pack(fill='both', expand=True)
 
         self.data_listbox.bind('<<ListboxSelect>>', self.show_content)
 
     def check_pin(self) -> None:
-        """Check entered PIN and handle login."""
+        """Verify the entered PIN in the background, then log in or count the failure."""
+        if self.verifying_pin:
+            return
         entered_pin = self.pin_entry.get()
-        if entered_pin == self.correct_pin:
+        # Kasa henüz yüklenmediyse (ekran çizilir çizilmez giriş yapıldıysa) şimdi yüklenir
+        self.load_vault()
+        if self.core is None:
+            return
+        self.verifying_pin = True
+        self.pin_entry.config(state='disabled')
+
+        def verify():
+            # PIN karması ve anahtar türetme bilerek yavaş; arayüz donmasın diye iş parçacığında.
+            # Anahtar türetme oturum başına bir kez yapılır
+            if not self.core.check_pin(entered_pin):
+                return None
+            return self.core.unlock(entered_pin)
+
+        self.run_background(verify, self.on_pin_checked)
+
+    def on_pin_checked(self, unlocked, error) -> None:
+        """Finish a login attempt started by check_pin (runs on the Tk thread)."""
+        self.verifying_pin = False
+        if self.pin_entry.winfo_exists():
+            self.pin_entry.config(state='normal')
+            self.pin_entry.delete(0, tk.END)
+
+        if isinstance(error, PinLockedError):
+            messagebox.showwarning("Hatalı PIN", str(error))
+        elif isinstance(error, VaultWipedError):
+            self.handle_security_breach(error)
+        elif error is not None:
+            messagebox.showerror("Hata", f"Şifreleme anahtarı yüklenemedi: {str(error)}")
+        elif unlocked is None:
+            # Hatalı denemeler PIN dosyasında sayılır, yeniden başlatınca sıfırlanmaz
+            messagebox.showwarning(
+                "Hatalı PIN",
+                f"Yanlış PIN! {self.core.attempts_left()} deneme hakkınız kaldı."
+            )
+        elif not unlocked:
+            messagebox.showerror("Hata", "Şifreleme anahtarı açılamadı!")
+        else:
             self.is_logged_in = True
             self.create_vault_screen()
-        else:
-            self.attempt_count += 1
-            remaining = self.MAX_ATTEMPTS - self.attempt_count
-            if remaining > 0:
-                messagebox.showwarning(
-                    "Hatalı PIN",
-                    f"Yanlış PIN! {remaining} deneme hakkınız kaldı."
-                )
-                self.pin_entry.delete(0, tk.END)
-            else:
-                self.handle_security_breach()
+            # Kullanıcı kaydederken ya da dosya kopyalarken tarama bekler
+            save_queue, ingester = self.save_queue, self.ingester
+            self.core.start_scrubber(busy=lambda: not save_queue.idle or bool(ingester.jobs))
 
-    def handle_security_breach(self):
+    def handle_security_breach(self, error: VaultWipedError):
         """Güvenlik ihlali durumunda yapılacak işlemler"""
-        success_message = ""
-
-        # Gizli konuma yedekle
-        if self.security_manager.backup_to_secret_location(self.data_file, self.files_dir):
-            success_message += "Veriler güvenli konuma yedeklendi.\n"
-
-        # Verileri sil
-        self.vault_data = {}
-        self.save_data()
-
-        # Dosyaları sil
-        if os.path.exists(self.files_dir):
-            try:
-                shutil.rmtree(self.files_dir)
-            except Exception as e:
-                print(f"Dosyalar silinirken hata oluştu: {str(e)}")
-
-        if success_message:
-            print(success_message)
+        # Veriler core.check_pin içinde gizli konuma yedeklenip silindi
+        if error.backed_up:
+            print("Veriler güvenli konuma yedeklendi.")
+        self.ingester.shutdown()
+        self.close_data()
 
         messagebox.showerror(
             "Kasa Kilitlendi",
-            "3 kere yanlış PIN girdiniz. Güvenlik önlemleri uygulandı!"
+            f"{self.core.MAX_ATTEMPTS} kere yanlış PIN girdiniz. Güvenlik önlemleri uygulandı!"
         )
         self.window.quit()
 
@@ -431,23 +617,70 @@ class DigitalVault:
             self.selected_file_path = file_path
             self.selected_file_label.config(text=os.path.basename(file_path))
 
-    def save_file_to_vault(self, file_path):
-        """Dosyayı kasa dizinine kopyala"""
+    def save_file_to_vault(self, title: str, file_path: str) -> None:
+        """Dosyayı arka planda kasaya kopyala, bitince kayda bağla"""
         if not file_path:
-            return None, None
+            return
 
-        try:
-            file_name = os.path.basename(file_path)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_")
-            new_file_name = timestamp + file_name
-            new_file_path = os.path.join(self.files_dir, new_file_name)
+        # Aynı kayıt için bekleyen eski kopya artık geçersiz
+        previous = self.pending_ingest.pop(title, None)
+        if previous is not None:
+            previous.cancel()
+
+        job = self.ingester.submit(file_path, on_done=lambda job: self.on_file_saved(title, job))
+        self.pending_ingest[title] = job
+        self.add_ingest_row(job)
+
+    def on_file_saved(self, title: str, job) -> None:
+        """Attach a finished ingest job to its entry (runs on the Tk thread)."""
+        row, _ = self.ingest_rows.pop(job, (None, None))
+        if row is not None and row.winfo_exists():
+            row.destroy()
+        if self.pending_ingest.get(title) is job:
+            del self.pending_ingest[title]
+
+        entry_data = self.save_queue.get(title)
+        if job.cancelled or entry_data is None:
+            if job.digest is not None:
+                self.core.blob_store.release(job.digest)
+            return
+        if job.error is not None:
+            messagebox.showerror("Hata", f"Dosya kaydedilirken hata oluştu: {str(job.error)}")
+            return
 
-            shutil.copy2(file_path, new_file_path)
+        self.disk_gauge.invalidate()
+        # Kaydın önceki dosya referansı put içinde bırakılır
+        self.save_data(title, dict(
+            entry_data,
+            file_name=job.file_name,
+            file_hash=job.digest,
+            **self.core.file_meta(job.file_name, job.total)
+        ))
+
+    def add_ingest_row(self, job) -> None:
+        """Show a progress line with a cancel button for an ingest job."""
+        if self.ingest_frame is None or not self.ingest_frame.winfo_exists():
+            return
+        row = tk.Frame(self.ingest_frame, bg='#2c3e50')
+        row.pack(fill='x', pady=2)
+        label = self.create_custom_label(row, f"{job.file_name}: %0", size=10)
+        label.pack(side=tk.LEFT)
+        tk.Button(
+            row,
+            text="İptal",
+            command=job.cancel,
+            font=('Helvetica', 9),
+            bg='#c0392b',
+            fg='white'
+        ).pack(side=tk.RIGHT)
+        self.ingest_rows[job] = (row, label)
 
-            return new_file_name, new_file_path
-        except Exception as e:
-            messagebox.showerror("Hata", f"Dosya kaydedilirken hata oluştu: {str(e)}")
-            return None, None
+    def update_ingest_rows(self, jobs) -> None:
+        """Refresh the progress lines of running ingest jobs."""
+        for job in jobs:
+            row, label = self.ingest_rows.get(job, (None, None))
+            if row is not None and row.winfo_exists():
+                label.config(text=f"{job.file_name}: %{int(job.progress * 100)}")
 
     def save_entry(self) -> None:
         """Save a new data entry or update existing one."""
@@ -458,19 +691,21 @@ class DigitalVault:
             messagebox.showwarning("Hata", "Başlık ve içerik boş olamaz!")
             return
 
-        file_name = None
-        if self.selected_file_path:
-            file_name, _ = self.save_file_to_vault(self.selected_file_path)
-
-        self.vault_data[title] = {
+        # Yeni dosya seçilmediyse (ya da kopyalanana kadar) kayıttaki dosya korunur
+        self.save_data(title, self.core.keep_attachment({
             'content': content,
-            'file_name': file_name
-        }
+            'file_name': None,
+            'tags': parse_tags(self.tags_entry.get())
+        }, self.save_queue.get(title)))
 
-        self.save_data()
-        self.update_data_list()
+        # Dosya arka planda kopyalanır, kayıt hemen kullanılabilir
+        if self.selected_file_path:
+            self.save_file_to_vault(title, self.selected_file_path)
+        self.data_listbox.insert(title)
+        self.refresh_tag_menu()
+        self.apply_search()
         self.clear_input_fields()
-        messagebox.showinfo("Başarılı", "Veri kaydedildi!")
+        self.show_status("Veri kaydedildi.")
 
     def delete_entry(self) -> None:
         """Delete selected data entry and associated file."""
@@ -481,18 +716,14 @@ class DigitalVault:
 
         title = self.data_listbox.get(selection[0])
         if messagebox.askyesno("Onay", f"{title} silinecek. Emin misiniz?"):
-            entry_data = self.vault_data[title]
-            if entry_data.get('file_name'):
-                file_path = os.path.join(self.files_dir, entry_data['file_name'])
-                try:
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
-                except Exception as e:
-                    messagebox.showerror("Hata", f"Dosya silinirken hata oluştu: {str(e)}")
-
-            del self.vault_data[title]
-            self.save_data()
-            self.update_data_list()
+            job = self.pending_ingest.pop(title, None)
+            if job is not None:
+                job.cancel()
+
+            self.save_data(title)
+            self.data_listbox.delete(title)
+            self.refresh_tag_menu()
+            self.apply_search()
             self.clear_input_fields()
 
     def show_content(self, event=None) -> None:
@@ -500,80 +731,613 @@ class DigitalVault:
         selection = self.data_listbox.curselection()
         if selection:
             title = self.data_listbox.get(selection[0])
-            entry_data = self.vault_data[title]
+            # İçerik sadece seçildiğinde okunup çözülür
+            entry_data = self.save_queue.get(title)
+            if entry_data is None:
+                return
 
             self.clear_input_fields()
             self.title_entry.insert(0, title)
-            self.content_text.insert("1.0", entry_data['content'])
+            self.content_text.insert("1.0", entry_data.get('content', ''))
+            self.tags_entry.insert(0, ", ".join(entry_data.get('tags') or ()))
+            self.meta_label.config(text=self.describe_entry(entry_data))
 
             if entry_data.get('file_name'):
                 self.selected_file_label.config(text=entry_data['file_name'])
-                if messagebox.askyesno("Dosya", "İlişkili dosyayı açmak ister misiniz?"):
-                    self.open_file(entry_data['file_name'])
+                self.open_file_button.pack(side=tk.RIGHT)
+                self.attachment_entry = entry_data
+                self.show_preview(entry_data)
+
+    def show_preview(self, entry_data: dict) -> None:
+        """Preview an entry's text or image attachment from its first bytes, using the preview cache."""
+        kind = preview_kind(entry_data)
+        if kind is None:
+            return
+        if entry_data.get('file_hash'):
+            key = (kind, entry_data['file_hash'])
+        else:
+            key = (kind, entry_data['file_name'])
+        cached = self.preview_cache.get(key)
+        if cached is not None:
+            self.display_preview(kind, cached)
+            return
 
-    def open_file(self, file_name):
+        # Resim tamamı okunmadan çözülemez; boyutu preview_kind ile sınırlı
+        limit = TEXT_PREVIEW_BYTES + 1 if kind == 'text' else MAX_IMAGE_BYTES
+
+        def on_read(data, error):
+            # Bu arada başka kayıt seçildiyse sonuç gösterilmez
+            if self.attachment_entry is not entry_data or not self.preview_text.winfo_exists():
+                return
+            if error is not None:
+                print(f"Önizleme okunamadı: {str(error)}")
+                return
+            if kind == 'text':
+                value = text_preview(data)
+                size = len(value) * 4
+            else:
+                value = make_thumbnail(data, entry_data.get('file_type', ''))
+                if value is None:
+                    return
+                size = thumbnail_bytes(value)
+            self.preview_cache.put(key, value, size)
+            self.display_preview(kind, value)
+
+        self.run_background(lambda: self.core.read_attachment(entry_data, limit), on_read)
+
+    def display_preview(self, kind: str, value) -> None:
+        """Show a decoded text preview or thumbnail under the file row."""
+        if kind == 'text':
+            self.preview_text.config(state='normal')
+            self.preview_text.delete("1.0", tk.END)
+            self.preview_text.insert("1.0", value)
+            self.preview_text.config(state='disabled')
+            self.preview_text.pack(before=self.status_label, pady=5, fill='x')
+        else:
+            self.preview_image.config(image=value)
+            self.preview_image.image = value
+            self.preview_image.pack(before=self.status_label, pady=5)
+
+    def clear_preview(self) -> None:
+        """Hide the attachment preview and the open button."""
+        self.attachment_entry = None
+        if self.preview_text is None:
+            return
+        self.preview_text.config(state='normal')
+        self.preview_text.delete("1.0", tk.END)
+        self.preview_text.pack_forget()
+        self.preview_image.config(image='')
+        self.preview_image.image = None
+        self.preview_image.pack_forget()
+        self.open_file_button.pack_forget()
+
+    def open_selected_file(self) -> None:
+        """Open the shown entry's attachment with the system's default program."""
+        if self.attachment_entry is None:
+            messagebox.showwarning("Hata", "Açılacak dosya yok!")
+            return
+        self.open_file(self.attachment_entry)
+
+    @staticmethod
+    def describe_entry(entry_data: dict) -> str:
+        """Return a one-line summary of an entry's dates and attachment."""
+        parts = []
+        for key, label in (('created', "Oluşturma"), ('modified', "Değişiklik")):
+            if entry_data.get(key):
+                parts.append(f"{label}: {datetime.fromtimestamp(entry_data[key]).strftime('%d.%m.%Y %H:%M')}")
+        if entry_data.get('file_name') and entry_data.get('file_size') is not None:
+            parts.append(f"Dosya: {entry_data['file_size'] / 1024:.0f} KB, {entry_data.get('file_type', '')}")
+        return "  ".join(parts)
+
+    def open_file(self, entry_data: dict):
         """Open the associated file."""
         try:
-            file_path = os.path.join(self.files_dir, file_name)
+            file_path = self.core.attachment_path(entry_data)
             if os.path.exists(file_path):
-                os.startfile(file_path)  # Windows için
+                if self.core.crypto.is_encrypted_file(file_path):
+                    file_path = self.core.decrypt_to_temp(file_path, entry_data['file_name'])
+                if hasattr(os, 'startfile'):
+                    os.startfile(file_path)  # Windows için
+                elif sys.platform == 'darwin':
+                    subprocess.Popen(['open', file_path])
+                else:
+                    subprocess.Popen(['xdg-open', file_path])
             else:
                 messagebox.showerror("Hata", "Dosya bulunamadı!")
         except Exception as e:
             messagebox.showerror("Hata", f"Dosya açılırken hata oluştu: {str(e)}")
 
+    def show_status(self, text: str) -> None:
+        """Show a short message under the input panel that clears itself."""
+        self.status_label.config(text=text)
+        label = self.status_label
+        self.window.after(self.STATUS_MS, lambda: label.winfo_exists() and label.config(text=""))
+
     def clear_input_fields(self) -> None:
         """Clear input fields."""
         self.title_entry.delete(0, tk.END)
         self.content_text.delete("1.0", tk.END)
+        self.tags_entry.delete(0, tk.END)
+        self.meta_label.config(text="")
         self.selected_file_path = None
         self.selected_file_label.config(text="")
+        self.clear_preview()
 
     def update_data_list(self) -> None:
         """Update the list of saved data entries."""
         try:
-            self.data_listbox.delete(0, tk.END)
-            sorted_titles = sorted(self.vault_data.keys())
-            for title in sorted_titles:
-                self.data_listbox.insert(tk.END, title)
+            with metrics.span("gui.update_data_list"):
+                # Liste yalnızca görünen sayfaları ister; kuyruktaki kayıtlar da dahil
+                self.data_listbox.set_source(self.save_queue.count, self.save_queue.titles, self.LIST_PAGE_SIZE)
+            self.refresh_tag_menu()
+            self.apply_search()
         except Exception as e:
             messagebox.showerror("Hata", f"Liste güncellenemedi: {str(e)}")
 
+    def apply_search(self) -> None:
+        """Filter the entry list by the search box and selected tag, in the selected order."""
+        query = self.search_var.get() if self.search_var else ""
+        tag = self.tag_var.get() if self.tag_var else self.ALL_TAGS
+        tag = None if tag == self.ALL_TAGS else tag
+        order = self.ORDERS[self.order_var.get()] if self.order_var else 'title'
+        if not query.strip() and tag is None and order == 'title' and not self.data_listbox.filtered:
+            return
+        with metrics.span("gui.apply_search"):
+            matches = self.core.search(query)
+            if tag is None and order == 'title':
+                self.data_listbox.set_filter(matches)
+                return
+            titles = self.core.list_titles(tag, order)
+            if matches is not None:
+                titles = [title for title in titles if title in matches]
+            self.data_listbox.set_filter(titles, ordered=order != 'title')
+
+    def refresh_tag_menu(self) -> None:
+        """Rebuild the tag filter choices from the vault's tags."""
+        if self.tag_menu is None or not self.tag_menu.winfo_exists():
+            return
+        tags = self.core.tags()
+        menu = self.tag_menu['menu']
+        menu.delete(0, tk.END)
+        menu.add_command(label=self.ALL_TAGS, command=lambda: self.tag_var.set(self.ALL_TAGS))
+        for tag in sorted(tags):
+            menu.add_command(label=f"{tag} ({tags[tag]})", command=lambda tag=tag: self.tag_var.set(tag))
+        # Son kaydıyla birlikte kaybolan etiket seçili kalmaz
+        if self.tag_var.get() != self.ALL_TAGS and self.tag_var.get() not in tags:
+            self.tag_var.set(self.ALL_TAGS)
+
     def backup_data(self) -> None:
-        """Backup vault data."""
+        """Take an incremental snapshot of entries and attachments."""
+        if not self.flush_saves():
+            return
         try:
-            backup_dir = os.path.join(os.path.dirname(__file__), "backups")
-            os.makedirs(backup_dir, exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = os.path.join(backup_dir, f"backup_{timestamp}.json")
-            shutil.copy2(self.data_file, backup_file)
-            messagebox.showinfo("Başarılı", f"Yedek oluşturuldu:\n{backup_file}")
+            manifest = self.core.backup()
+            self.disk_gauge.invalidate()
+            messagebox.showinfo(
+                "Başarılı",
+                f"Yedek oluşturuldu: {manifest['id']}\n"
+                f"{manifest['new_chunks']} yeni parça, {manifest['new_bytes'] // 1024} KB yazıldı."
+            )
         except Exception as e:
             messagebox.showerror("Hata", f"Yedekleme yapılamadı: {str(e)}")
 
     def restore_backup(self) -> None:
-        """Restore data from a backup."""
+        """Show the list of snapshots to restore from."""
+        snapshot_ids = self.core.list_backups()
+
+        dialog = tk.Toplevel(self.window)
+        dialog.title("Yedeği Geri Yükle")
+        dialog.geometry("350x400")
+        dialog.configure(bg='#2c3e50')
+        dialog.grab_set()
+
+        self.create_custom_label(dialog, "Yedekler:").pack(pady=5)
+        snapshot_list = tk.Listbox(
+            dialog,
+            font=('Helvetica', 12),
+            bg='#34495e',
+            fg='white',
+            selectmode=tk.SINGLE
+        )
+        snapshot_list.pack(fill='both', expand=True, padx=10)
+        for snapshot_id in snapshot_ids:
+            snapshot_list.insert(tk.END, snapshot_id)
+
+        def restore_selected():
+            selection = snapshot_list.curselection()
+            if not selection:
+                messagebox.showwarning("Hata", "Geri yüklemek için bir yedek seçin!")
+                return
+            dialog.destroy()
+            self.restore_snapshot(snapshot_ids[selection[0]])
+
+        def compare_selected():
+            selection = snapshot_list.curselection()
+            if not selection:
+                messagebox.showwarning("Hata", "Karşılaştırmak için bir yedek seçin!")
+                return
+            dialog.destroy()
+            self.show_backup_diff(snapshot_ids[selection[0]])
+
+        def restore_json():
+            dialog.destroy()
+            self.restore_json_backup()
+
+        button_frame = tk.Frame(dialog, bg='#2c3e50')
+        button_frame.pack(pady=10)
+        self.create_custom_button(button_frame, "Geri Yükle", restore_selected).pack(side=tk.LEFT, padx=5)
+        self.create_custom_button(button_frame, "Karşılaştır", compare_selected).pack(side=tk.LEFT, padx=5)
+        self.create_custom_button(button_frame, "JSON Dosyası...", restore_json).pack(side=tk.LEFT, padx=5)
+
+    def restore_snapshot(self, snapshot_id: str) -> None:
+        """Restore entries and attachments from a snapshot."""
+        if not self.flush_saves():
+            return
+        try:
+            self.core.restore(snapshot_id)
+            self.update_data_list()
+            messagebox.showinfo("Başarılı", "Yedek geri yüklendi!")
+        except Exception as e:
+            messagebox.showerror("Hata", f"Yedek geri yüklenemedi: {str(e)}")
+
+    def show_backup_diff(self, snapshot_id: str) -> None:
+        """Show how a snapshot differs from the vault and restore the chosen entries."""
+        if not self.flush_saves():
+            return
+        try:
+            diff = self.core.diff_backup(snapshot_id)
+        except Exception as e:
+            messagebox.showerror("Hata", f"Yedek karşılaştırılamadı: {str(e)}")
+            return
+
+        rows = (
+            [("+", title) for title in diff["added"]] +
+            [("~", title) for title in diff["changed"]] +
+            [("-", title) for title in diff["removed"]]
+        )
+        if not rows:
+            messagebox.showinfo("Karşılaştır", "Yedek ile kasa aynı.")
+            return
+
+        dialog = tk.Toplevel(self.window)
+        dialog.title(f"Yedek {snapshot_id}")
+        dialog.geometry("400x450")
+        dialog.configure(bg='#2c3e50')
+        dialog.grab_set()
+
+        self.create_custom_label(
+            dialog,
+            "+ yedekte var, ~ değişmiş, - sadece kasada (silinir)",
+            size=10
+        ).pack(pady=5)
+        change_list = tk.Listbox(
+            dialog,
+            font=('Helvetica', 12),
+            bg='#34495e',
+            fg='white',
+            selectmode=tk.EXTENDED
+        )
+        change_list.pack(fill='both', expand=True, padx=10)
+        for mark, title in rows:
+            change_list.insert(tk.END, f"{mark} {title}")
+        # Varsayılan olarak veri kaybettirmeyen değişiklikler seçili
+        for i, (mark, _) in enumerate(rows):
+            if mark != "-":
+                change_list.selection_set(i)
+
+        def apply_selected():
+            titles = [rows[i][1] for i in change_list.curselection()]
+            if not titles:
+                messagebox.showwarning("Hata", "Uygulamak için kayıt seçin!")
+                return
+            dialog.destroy()
+            try:
+                count = self.core.merge_backup(snapshot_id, titles)
+                self.update_data_list()
+                messagebox.showinfo("Başarılı", f"{count} kayıt geri yüklendi.")
+            except Exception as e:
+                messagebox.showerror("Hata", f"Yedek geri yüklenemedi: {str(e)}")
+
+        self.create_custom_button(dialog, "Seçilenleri Uygula", apply_selected).pack(pady=10)
+
+    def show_history(self) -> None:
+        """Show earlier versions of the entry in the title field: view, compare, jump to a date, restore."""
+        title = self.title_entry.get().strip()
+        if not title:
+            messagebox.showwarning("Hata", "Geçmişini görmek için bir kayıt seçin!")
+            return
+        if not self.flush_saves():
+            return
+        try:
+            revisions = self.core.entry_history(title)
+        except Exception as e:
+            messagebox.showerror("Hata", f"Kayıt geçmişi okunamadı: {str(e)}")
+            return
+        if not revisions:
+            messagebox.showinfo("Geçmiş", "Bu kaydın önceki sürümü yok.")
+            return
+
+        dialog = tk.Toplevel(self.window)
+        dialog.title(f"Geçmiş: {title}")
+        dialog.geometry("520x560")
+        dialog.configure(bg='#2c3e50')
+        dialog.grab_set()
+
+        self.create_custom_label(
+            dialog,
+            "Bir sürüm seçin ya da karşılaştırmak için iki sürüm seçin",
+            size=10
+        ).pack(pady=5)
+        rev_list = tk.Listbox(
+            dialog,
+            font=('Helvetica', 12),
+            height=8,
+            bg='#34495e',
+            fg='white',
+            selectmode=tk.EXTENDED
+        )
+        rev_list.pack(fill='x', padx=10)
+        for revision in revisions:
+            # İlk kez değişen kaydın önceki sürümünün tarihi bilinmiyor (0)
+            when = datetime.fromtimestamp(revision['time']).strftime("%d.%m.%Y %H:%M") if revision['time'] else "ilk sürüm"
+            rev_list.insert(tk.END, f"#{revision['rev']}  {when}{'  (silindi)' if revision['deleted'] else ''}")
+
+        preview = tk.Text(dialog, font=('Courier', 10), height=15, bg='#34495e', fg='white', wrap='none')
+        preview.pack(fill='both', expand=True, padx=10, pady=5)
+
+        def selected_revs():
+            return [revisions[i]['rev'] for i in rev_list.curselection()]
+
+        def set_preview(text):
+            preview.delete("1.0", tk.END)
+            preview.insert("1.0", text)
+
+        def show_selected(event=None):
+            revs = selected_revs()
+            if len(revs) != 1:
+                return
+            try:
+                entry = self.core.get_revision(title, revs[0])
+            except Exception as e:
+                messagebox.showerror("Hata", f"Sürüm okunamadı: {str(e)}")
+                return
+            set_preview("(kayıt silinmiş)" if entry is None else entry.get('content', ''))
+
+        def compare():
+            revs = sorted(selected_revs())
+            if len(revs) not in (1, 2):
+                messagebox.showwarning("Hata", "Güncel hâliyle karşılaştırmak için bir, birbirleriyle için iki sürüm seçin!")
+                return
+            try:
+                lines = self.core.diff_revisions(title, revs[0], revs[1] if len(revs) == 2 else None)
+            except Exception as e:
+                messagebox.showerror("Hata", f"Sürümler karşılaştırılamadı: {str(e)}")
+                return
+            set_preview("\n".join(lines) if lines else "Fark yok.")
+
+        def go_to_date():
+            text = simpledialog.askstring("Tarihe Git", "Tarih (GG.AA.YYYY SS:DD):", parent=dialog)
+            if not text:
+                return
+            for fmt in ("%d.%m.%Y %H:%M", "%d.%m.%Y"):
+                try:
+                    when = datetime.strptime(text.strip(), fmt)
+                    break
+                except ValueError:
+                    continue
+            else:
+                messagebox.showerror("Hata", "Tarih anlaşılamadı!")
+                return
+            rev = self.core.revision_at(title, when.timestamp())
+            if rev is None:
+                set_preview("(o tarihte kayıt yoktu)")
+                return
+            index = next(i for i, revision in enumerate(revisions) if revision['rev'] == rev)
+            rev_list.selection_clear(0, tk.END)
+            rev_list.selection_set(index)
+            rev_list.see(index)
+            show_selected()
+
+        def restore():
+            revs = selected_revs()
+            if len(revs) != 1:
+                messagebox.showwarning("Hata", "Geri yüklemek için bir sürüm seçin!")
+                return
+            if not messagebox.askyesno("Onay", f"{title} #{revs[0]} sürümüne döndürülecek. Emin misiniz?", parent=dialog):
+                return
+            # Kuyrukta bekleyen değişiklik geri yüklenen sürümü ezmesin
+            if not self.flush_saves():
+                return
+            try:
+                if not self.core.restore_revision(title, revs[0]):
+                    messagebox.showwarning("Hata", "Silinmiş bir sürüme dönülemez!")
+                    return
+                entry = self.core.get(title)
+            except Exception as e:
+                messagebox.showerror("Hata", f"Sürüm geri yüklenemedi: {str(e)}")
+                return
+            dialog.destroy()
+            self.data_listbox.insert(title)
+            self.apply_search()
+            self.clear_input_fields()
+            self.title_entry.insert(0, title)
+            self.content_text.insert("1.0", entry.get('content', ''))
+            self.show_status("Sürüm geri yüklendi.")
+
+        rev_list.bind('<<ListboxSelect>>', show_selected)
+        button_frame = tk.Frame(dialog, bg='#2c3e50')
+        button_frame.pack(pady=10)
+        self.create_custom_button(button_frame, "Karşılaştır", compare).pack(side=tk.LEFT, padx=5)
+        self.create_custom_button(button_frame, "Tarihe Git", go_to_date).pack(side=tk.LEFT, padx=5)
+        self.create_custom_button(button_frame, "Geri Yükle", restore).pack(side=tk.LEFT, padx=5)
+
+    def restore_json_backup(self) -> None:
+        """Restore data from an old-style JSON backup file."""
+        if not self.flush_saves():
+            return
         try:
-            backup_dir = os.path.join(os.path.dirname(__file__), "backups")
-            if not os.path.exists(backup_dir):
+            if not os.path.exists(self.core.backup_dir):
                 messagebox.showerror("Hata", "Yedek bulunamadı!")
                 return
 
             backup_file = filedialog.askopenfilename(
                 title="Yedek Dosyası Seç",
                 filetypes=[("JSON files", "*.json")],
-                initialdir=backup_dir
+                initialdir=self.core.backup_dir
             )
 
             if backup_file:
-                with open(backup_file, 'r') as f:
-                    self.vault_data = json.load(f)
-                self.save_data()
+                self.core.restore_json(backup_file)
                 self.update_data_list()
                 messagebox.showinfo("Başarılı", "Yedek geri yüklendi!")
         except Exception as e:
             messagebox.showerror("Hata", f"Yedek geri yüklenemedi: {str(e)}")
 
+    def import_entries(self) -> None:
+        """Import entries from a JSONL or CSV file."""
+        path = filedialog.askopenfilename(
+            title="İçe Aktarılacak Dosya",
+            filetypes=[("JSONL / CSV", "*.jsonl *.csv"), ("Tüm Dosyalar", "*.*")]
+        )
+        if not path:
+            return
+
+        overwrite = messagebox.askyesnocancel(
+            "İçe Aktar",
+            "Aynı başlıklı kayıtların üzerine yazılsın mı?\n(Hayır: yeni kayıt yeniden adlandırılır)"
+        )
+        if overwrite is None or not self.flush_saves():
+            return
+        try:
+            stats = self.core.import_file(path, mode='overwrite' if overwrite else 'rename')
+            self.update_data_list()
+            messagebox.showinfo(
+                "Başarılı",
+                f"{stats['added']} kayıt eklendi, {stats['overwritten']} kaydın üzerine yazıldı, "
+                f"{stats['renamed']} kayıt yeniden adlandırıldı."
+            )
+        except Exception as e:
+            self.update_data_list()
+            messagebox.showerror("Hata", f"İçe aktarılamadı: {str(e)}")
+
+    def export_entries(self) -> None:
+        """Export every entry to a JSONL or CSV file."""
+        if not self.flush_saves():
+            return
+        path = filedialog.asksaveasfilename(
+            title="Dışa Aktar",
+            defaultextension=".jsonl",
+            filetypes=[("JSONL", "*.jsonl"), ("CSV", "*.csv")]
+        )
+        if not path:
+            return
+        try:
+            count = self.core.export_file(path)
+            messagebox.showinfo("Başarılı", f"{count} kayıt dışa aktarıldı.")
+        except Exception as e:
+            messagebox.showerror("Hata", f"Dışa aktarılamadı: {str(e)}")
+
+    def sync_vault(self) -> None:
+        """Exchange changes with the sync server in the background, asking for the server the first time."""
+        if self.syncing or not self.flush_saves():
+            return
+        server = passphrase = None
+        if self.core.sync_server is None:
+            server = simpledialog.askstring(
+                "Senkronizasyon", "Sunucu adresi:", initialvalue=self.SYNC_DEFAULT_SERVER, parent=self.window
+            )
+            if not server:
+                return
+            passphrase = simpledialog.askstring(
+                "Senkronizasyon", "Senkronizasyon parolası (tüm cihazlarda aynı):", show='*', parent=self.window
+            )
+            if not passphrase:
+                return
+
+        self.syncing = True
+        self.show_status("Senkronize ediliyor...")
+        core = self.core
+        self.run_background(
+            lambda: core.sync(server, passphrase),
+            lambda stats, error: self.on_synced(core, stats, error)
+        )
+
+    def on_synced(self, core, stats, error) -> None:
+        """Refresh the list after a sync and report its outcome."""
+        self.syncing = False
+        # Bu arada kasa değiştirildiyse ya da kilitlendiyse ekran zaten yenilendi
+        if core is not self.core or not core.crypto.unlocked:
+            return
+        self.update_data_list()
+        if error is not None:
+            messagebox.showerror("Hata", f"Senkronizasyon başarısız: {str(error)}")
+            return
+        self.show_status(f"{stats['received']} kayıt alındı, {stats['sent']} kayıt gönderildi.")
+        if stats['conflicts']:
+            messagebox.showwarning(
+                "Çakışma",
+                f"{stats['conflicts']} kayıt iki tarafta da değişmişti. Sunucudaki sürüm alındı, "
+                f"yerel sürümler \"(çakışma)\" ekiyle saklandı."
+            )
+
+    def show_integrity_report(self) -> None:
+        """Show what the background integrity scrubber found."""
+        scrubber = self.core.scrubber or self.core.new_scrubber()
+        state = scrubber.state
+        lines = []
+        if state["last_pass"] is not None:
+            finished = datetime.fromtimestamp(state["last_pass"]["finished"]).strftime('%d.%m.%Y %H:%M')
+            lines.append(f"Son tam tarama: {finished}, {state['last_pass']['checked']} kayıt.")
+        else:
+            lines.append("Henüz tam bir tarama yapılmadı.")
+        if state["phase"] is not None:
+            lines.append(f"Süren tarama: {state['checked']} kayıt denetlendi.")
+        problems = scrubber.problems
+        if not problems:
+            lines.append("Sorun bulunmadı.")
+        for problem in problems[:20]:
+            lines.append(f"• {problem['title']}: {problem['detail']}")
+        if len(problems) > 20:
+            lines.append(f"... ve {len(problems) - 20} sorun daha")
+        if problems:
+            messagebox.showwarning("Bütünlük", "\n".join(lines))
+        else:
+            messagebox.showinfo("Bütünlük", "\n".join(lines))
+
+    def show_metrics_panel(self) -> None:
+        """Show live operation timings, cache hit rates and storage size; collects while open."""
+        if self.metrics_window is not None and self.metrics_window.winfo_exists():
+            self.metrics_window.lift()
+            return
+
+        # Ölçüm ortam değişkeniyle açılmadıysa sadece pencere açıkken toplanır
+        was_enabled = metrics.enabled
+        metrics.enable()
+
+        dialog = tk.Toplevel(self.window)
+        dialog.title("Performans")
+        dialog.geometry("560x420")
+        dialog.configure(bg='#2c3e50')
+        self.metrics_window = dialog
+
+        text = tk.Text(dialog, font=('Courier', 10), bg='#34495e', fg='white', wrap='none')
+        text.pack(fill='both', expand=True, padx=10, pady=10)
+
+        def refresh():
+            if not dialog.winfo_exists():
+                return
+            text.delete("1.0", tk.END)
+            text.insert("1.0", metrics.format_report())
+            dialog.after(self.METRICS_REFRESH_MS, refresh)
+
+        def close():
+            metrics.enable(was_enabled)
+            dialog.destroy()
+
+        self.create_custom_button(dialog, "Sıfırla", metrics.reset).pack(pady=(0, 10))
+        dialog.protocol("WM_DELETE_WINDOW", close)
+        refresh()
+
     def show_change_pin_dialog(self) -> None:
         """Show dialog to change the PIN."""
         dialog = tk.Toplevel(self.window)
@@ -591,24 +1355,46 @@ class DigitalVault:
         new_pin.pack(pady=5)
 
         def change_pin():
-            if current_pin.get() == self.correct_pin:
-                if len(new_pin.get()) == 4 and new_pin.get().isdigit():
-                    self.correct_pin = new_pin.get()
-                    self.save_pin(new_pin.get())
-                    messagebox.showinfo("Başarılı", "PIN değiştirildi!")
-                    dialog.destroy()
-                else:
-                    messagebox.showerror("Hata", "Yeni PIN 4 haneli sayı olmalıdır!")
+            pin = new_pin.get()
+            if len(pin) != 4 or not pin.isdigit():
+                messagebox.showerror("Hata", "Yeni PIN 4 haneli sayı olmalıdır!")
+                return
+            current = current_pin.get()
+            button.config(state='disabled')
+
+            def work():
+                if not self.core.check_pin(current):
+                    return False
+                self.core.change_pin(pin)
+                return True
+
+            self.run_background(work, on_changed)
+
+        def on_changed(changed, error):
+            if not dialog.winfo_exists():
+                return
+            button.config(state='normal')
+            if isinstance(error, PinLockedError):
+                messagebox.showwarning("Hata", str(error))
+            elif isinstance(error, VaultWipedError):
+                dialog.destroy()
+                self.handle_security_breach(error)
+            elif error is not None:
+                messagebox.showerror("Hata", "PIN kaydedilemedi!")
+            elif not changed:
+                messagebox.showerror("Hata", f"Mevcut PIN yanlış! {self.core.attempts_left()} deneme hakkınız kaldı.")
             else:
-                messagebox.showerror("Hata", "Mevcut PIN yanlış!")
+                messagebox.showinfo("Başarılı", "PIN değiştirildi!")
+                dialog.destroy()
 
-        self.create_custom_button(dialog, "Değiştir", change_pin).pack(pady=20)
+        button = self.create_custom_button(dialog, "Değiştir", change_pin)
+        button.pack(pady=20)
 
     def logout(self) -> None:
         """Log out from the vault."""
         if messagebox.askyesno("Çıkış", "Çıkış yapmak istediğinize emin misiniz?"):
             self.is_logged_in = False
-            self.attempt_count = 0
+            self.lock_vault()
             self.create_login_screen()
 
     def run(self) -> None:
@@ -0,0 +1,136 @@
+import bisect
+import json
+
+from durable import read_file, write_file
+
+ORDERS = ('title', 'modified')
+
+
+def parse_tags(text: str) -> list:
+    """Split comma-separated tags, dropping blanks and repeats (first spelling wins)."""
+    tags = []
+    for tag in text.split(','):
+        tag = tag.strip()
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+class MetaIndex:
+    """Secondary indexes over entry metadata: tag -> titles and modification order.
+
+    Tag lists are kept sorted by title and the modification list sorted by
+    (modified, title), both updated with bisect on every save and delete, so
+    filtering by tag or listing newest first never scans the store. Entries
+    saved before timestamps existed sort as oldest. Like SearchIndex it can
+    be saved next to the store with the store fingerprint, so startup does
+    not have to read every entry.
+    """
+
+    def __init__(self):
+        self.meta = {}
+        self.by_tag = {}
+        self.by_modified = []
+
+    def add(self, title: str, entry: dict) -> None:
+        """Index (or re-index) a single entry."""
+        self.remove(title)
+        modified = entry.get('modified') or 0
+        tags = tuple(entry.get('tags') or ())
+        self.meta[title] = (modified, entry.get('created'), tags)
+        bisect.insort(self.by_modified, (modified, title))
+        for tag in tags:
+            bisect.insort(self.by_tag.setdefault(tag, []), title)
+
+    def remove(self, title: str) -> None:
+        """Drop a single entry from the index."""
+        meta = self.meta.pop(title, None)
+        if meta is None:
+            return
+        modified, _, tags = meta
+        del self.by_modified[bisect.bisect_left(self.by_modified, (modified, title))]
+        for tag in tags:
+            titles = self.by_tag[tag]
+            del titles[bisect.bisect_left(titles, title)]
+            if not titles:
+                del self.by_tag[tag]
+
+    def clear(self) -> None:
+        self.meta = {}
+        self.by_tag = {}
+        self.by_modified = []
+
+    def build(self, items) -> None:
+        """Rebuild the index from (title, entry) pairs."""
+        self.clear()
+        for title, entry in items:
+            self.meta[title] = (entry.get('modified') or 0, entry.get('created'), tuple(entry.get('tags') or ()))
+        self._rebuild_lists()
+
+    def created(self, title: str):
+        """Return when an indexed entry was created, or None."""
+        meta = self.meta.get(title)
+        return meta[1] if meta else None
+
+    def tags(self) -> dict:
+        """Return {tag: number of entries}."""
+        return {tag: len(titles) for tag, titles in self.by_tag.items()}
+
+    def titles(self, tag: str = None, order: str = 'title') -> list:
+        """Return titles, optionally only those with tag, sorted by title or newest first."""
+        if order not in ORDERS:
+            raise ValueError(f"Bilinmeyen sıralama: {order}")
+        if order == 'title':
+            if tag is None:
+                return sorted(self.meta)
+            return list(self.by_tag.get(tag, ()))
+
+        if tag is None:
+            return [title for _, title in reversed(self.by_modified)]
+        tagged = self.by_tag.get(tag, ())
+        if len(tagged) * 16 < len(self.by_modified):
+            # Az kayıtlı etikette tüm listeyi taramak yerine o kayıtlar sıralanır
+            return sorted(tagged, key=lambda title: (self.meta[title][0], title), reverse=True)
+        tagged = set(tagged)
+        return [title for _, title in reversed(self.by_modified) if title in tagged]
+
+    def save(self, path: str, fingerprint: str, crypto=None) -> None:
+        """Write the index to path, tagged with the store fingerprint it matches.
+
+        The index holds titles, tags and dates, so it is encrypted with
+        crypto when one is given.
+        """
+        data = json.dumps({
+            "fingerprint": fingerprint,
+            "entries": {title: list(meta) for title, meta in self.meta.items()}
+        }, ensure_ascii=False).encode('utf-8')
+        if crypto is not None:
+            data = crypto.encrypt_bytes(data, b'meta-index')
+
+        write_file(path, data)
+
+    def load(self, path: str, fingerprint: str, crypto=None) -> bool:
+        """Load a saved index; returns False if it is missing or out of date."""
+        try:
+            data = read_file(path)
+            if crypto is not None:
+                data = crypto.decrypt_bytes(data, b'meta-index')
+            saved = json.loads(data.decode('utf-8'))
+        except (IOError, ValueError):
+            return False
+        if saved.get("fingerprint") != fingerprint:
+            return False
+
+        self.clear()
+        for title, (modified, created, tags) in saved["entries"].items():
+            self.meta[title] = (modified, created, tuple(tags))
+        self._rebuild_lists()
+        return True
+
+    def _rebuild_lists(self) -> None:
+        self.by_modified = sorted((modified, title) for title, (modified, _, _) in self.meta.items())
+        for title, (_, _, tags) in self.meta.items():
+            for tag in tags:
+                self.by_tag.setdefault(tag, []).append(title)
+        for titles in self.by_tag.values():
+            titles.sort()
@@ -0,0 +1,257 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# VAULT_METRICS=1 ölçümü açar; kapalıyken span() paylaşılan boş bir nesne döndürür
+enabled = os.environ.get("VAULT_METRICS") == "1"
+# Yüzdelikler her işlemin son bu kadar örneğinden hesaplanır
+SAMPLE_WINDOW = 1024
+
+_lock = threading.Lock()
+_spans = {}
+_counters = {}
+_gauges = {}
+
+
+class _Stats:
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+
+
+class _Span:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def enable(flag: bool = True) -> None:
+    """Turn collection on or off at runtime."""
+    global enabled
+    enabled = flag
+
+
+def span(name: str):
+    """Time a block: ``with metrics.span("storage.put"): ...``."""
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def record(name: str, seconds: float) -> None:
+    """Add one latency sample to an operation."""
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = _Stats()
+        stats.count += 1
+        stats.total += seconds
+        stats.max = max(stats.max, seconds)
+        stats.samples.append(seconds)
+
+
+def count(name: str, n: int = 1) -> None:
+    """Bump a counter; counters named "<x>.hit" and "<x>.miss" are reported as a hit rate."""
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def set_gauge(name: str, fn) -> None:
+    """Register a callable whose value is read every time a report is made (None removes it).
+
+    A callable may return a dict to report several related values at once.
+    """
+    with _lock:
+        if fn is None:
+            _gauges.pop(name, None)
+        else:
+            _gauges[name] = fn
+
+
+class SampledGauge:
+    """A gauge for slow measurements: returns the last value and re-samples on a worker thread.
+
+    A sample older than max_age seconds (or after invalidate()) starts a
+    new one in the background; the report shows the previous value until
+    it finishes, so reading the gauge never blocks on fn.
+    """
+
+    def __init__(self, fn, max_age: float):
+        self.fn = fn
+        self.max_age = max_age
+        self.value = None
+        self._sampled_at = None
+        self._sampling = False
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            stale = self._sampled_at is None or time.monotonic() - self._sampled_at >= self.max_age
+            if stale and not self._sampling:
+                self._sampling = True
+                threading.Thread(target=self._sample, name="gauge", daemon=True).start()
+        return "ölçülüyor" if self.value is None else self.value
+
+    def invalidate(self) -> None:
+        """Sample again the next time the gauge is read."""
+        with self._lock:
+            self._sampled_at = None
+
+    def _sample(self) -> None:
+        try:
+            value = self.fn()
+        except Exception as e:
+            value = f"hata: {str(e)}"
+        with self._lock:
+            self.value = value
+            self._sampled_at = time.monotonic()
+            self._sampling = False
+
+
+def reset() -> None:
+    """Forget every span and counter (gauges stay registered)."""
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+def report() -> dict:
+    """Return per-operation counts and latencies, counters, hit rates and gauges."""
+    with _lock:
+        spans = {name: (stats.count, stats.total, stats.max, sorted(stats.samples)) for name, stats in _spans.items()}
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+
+    result = {"spans": {}, "counters": counters, "hit_rates": {}, "gauges": {}}
+    for name, (calls, total, longest, samples) in sorted(spans.items()):
+        result["spans"][name] = {
+            "count": calls,
+            "total_ms": total * 1000,
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+            "max_ms": longest * 1000,
+        }
+    for name in sorted(counters):
+        if name.endswith(".hit"):
+            cache = name[:-len(".hit")]
+            hits = counters[name]
+            lookups = hits + counters.get(cache + ".miss", 0)
+            result["hit_rates"][cache] = hits / lookups if lookups else 0.0
+    for name, fn in sorted(gauges.items()):
+        try:
+            value = fn()
+            if isinstance(value, dict):
+                result["gauges"].update(value)
+            else:
+                result["gauges"][name] = value
+        except Exception as e:
+            result["gauges"][name] = f"hata: {str(e)}"
+    return result
+
+
+def format_report(data: dict = None) -> str:
+    """Render report() as a plain-text table."""
+    data = report() if data is None else data
+    lines = [f"{'işlem':<28}{'adet':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+    for name, stats in data["spans"].items():
+        lines.append(
+            f"{name:<28}{stats['count']:>8}{stats['p50_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}"
+        )
+    if data["hit_rates"]:
+        lines.append("")
+        for cache, rate in data["hit_rates"].items():
+            lines.append(f"{cache + ' isabet':<28}{rate * 100:>7.1f}%")
+    if data["gauges"]:
+        lines.append("")
+        for name, value in data["gauges"].items():
+            if isinstance(value, int):
+                value = f"{value / 1024:.0f} KB" if name.endswith("_bytes") else str(value)
+            lines.append(f"{name:<28}{value:>8}")
+    return "\n".join(lines)
+
+
+class MetricsDumper:
+    """Writes a report every interval seconds on a daemon thread.
+
+    Reports are appended to path as JSON lines, or printed as a table when
+    no path is given.
+    """
+
+    def __init__(self, interval: float, path: str = None):
+        self.interval = interval
+        self.path = path
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-dump", daemon=True)
+
+    def start(self) -> "MetricsDumper":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the thread after one last report."""
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self) -> None:
+        data = report()
+        try:
+            if self.path is None:
+                print(format_report(data))
+                return
+            data["time"] = time.time()
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(data, ensure_ascii=False, default=str) + "\n")
+        except IOError as e:
+            print(f"Ölçümler yazılamadı: {str(e)}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.dump()
+        self.dump()
+
+
+def start_dumper_from_env():
+    """Start a MetricsDumper if VAULT_METRICS_DUMP (seconds) is set; also enables collection."""
+    interval = os.environ.get("VAULT_METRICS_DUMP")
+    if not interval:
+        return None
+    enable()
+    return MetricsDumper(float(interval), os.environ.get("VAULT_METRICS_FILE")).start()
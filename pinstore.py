@@ -0,0 +1,130 @@
+import base64
+import hashlib
+import hmac
+import os
+import time
+
+from durable import read_json, write_json
+
+
+class PinLockedError(Exception):
+    """Raised when a PIN is tried before the backoff after earlier failures has passed."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        super().__init__(f"Çok fazla hatalı deneme, {int(seconds + 0.999)} saniye bekleyin")
+
+
+class PinStore:
+    """The PIN as a salted scrypt hash, with failed attempts counted on disk.
+
+    verify() compares hashes in constant time. Every failure doubles the
+    time before the next attempt is accepted (BACKOFF_BASE, 2x, 4x, ... up
+    to BACKOFF_MAX), and the count survives restarts. The failure is written
+    before the hash is computed, so killing the process mid-check does not
+    give a free attempt; a correct PIN clears it again.
+
+    Files from older versions that hold the PIN in plaintext are converted
+    on load().
+    """
+
+    KDF_N = 2 ** 14
+    KDF_R = 8
+    KDF_P = 1
+    BACKOFF_BASE = 1.0
+    BACKOFF_MAX = 300.0
+
+    def __init__(self, path: str):
+        self.path = path
+        self._saved = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path) or os.path.exists(self.path + ".prev")
+
+    @property
+    def failures(self) -> int:
+        """How many wrong PINs were entered since the last correct one."""
+        return self._load()["failures"]
+
+    def load(self, default: str) -> None:
+        """Read the PIN file, creating it with default only if there is none (or converting a plaintext one).
+
+        A PIN file that exists but cannot be read raises IOError instead of
+        being replaced with the default, which would also clear the failure
+        count and the backoff.
+        """
+        if not self.exists():
+            self.set(default)
+            return
+        saved = self._read()
+        if "pin" in saved:
+            # Eski sürüm PIN'i düz metin saklıyordu; düz metin kopya bırakılmaz
+            self.set(saved["pin"])
+            if os.path.exists(self.path + ".prev"):
+                os.remove(self.path + ".prev")
+        else:
+            self._saved = saved
+
+    def set(self, pin: str) -> None:
+        """Store a new PIN and clear the failure count."""
+        salt = os.urandom(16)
+        self._write({
+            "kdf": "scrypt",
+            "n": self.KDF_N,
+            "r": self.KDF_R,
+            "p": self.KDF_P,
+            "salt": base64.b64encode(salt).decode('ascii'),
+            "hash": base64.b64encode(self._derive(pin, salt, self.KDF_N, self.KDF_R, self.KDF_P)).decode('ascii'),
+            "failures": 0,
+            "locked_until": 0
+        })
+
+    def wait(self) -> float:
+        """Seconds until the next attempt is accepted (0 if it may be made now)."""
+        return max(0.0, self._load()["locked_until"] - time.time())
+
+    def verify(self, pin: str) -> bool:
+        """Check a PIN, counting a failure on disk; raises PinLockedError while backing off.
+
+        Slow on purpose (one scrypt run), so call it off the UI thread.
+        """
+        wait = self.wait()
+        if wait > 0:
+            raise PinLockedError(wait)
+
+        saved = dict(self._load())
+        failures = saved["failures"] + 1
+        delay = min(self.BACKOFF_BASE * 2 ** (failures - 1), self.BACKOFF_MAX)
+        self._write(dict(saved, failures=failures, locked_until=time.time() + delay))
+
+        expected = base64.b64decode(saved["hash"])
+        actual = self._derive(pin, base64.b64decode(saved["salt"]), saved["n"], saved["r"], saved["p"])
+        if not hmac.compare_digest(expected, actual):
+            return False
+        self._write(dict(saved, failures=0, locked_until=0))
+        return True
+
+    def reset_failures(self) -> None:
+        self._write(dict(self._load(), failures=0, locked_until=0))
+
+    def _load(self) -> dict:
+        if self._saved is None:
+            self._saved = self._read()
+        return self._saved
+
+    def _read(self) -> dict:
+        try:
+            saved = read_json(self.path)
+            if "pin" not in saved and not {"hash", "salt", "n", "r", "p", "failures", "locked_until"} <= set(saved):
+                raise ValueError("eksik alanlar")
+        except (ValueError, TypeError) as e:
+            raise IOError(f"PIN dosyası okunamadı: {str(e)}") from e
+        return saved
+
+    def _write(self, saved: dict) -> None:
+        write_json(self.path, saved, keep_previous=True)
+        self._saved = saved
+
+    @staticmethod
+    def _derive(pin: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        return hashlib.scrypt(pin.encode('utf-8'), salt=salt, n=n, r=r, p=p, maxmem=64 * 1024 * 1024, dklen=32)
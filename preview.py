@@ -0,0 +1,174 @@
+import base64
+import io
+import mimetypes
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+import metrics
+
+# Metin önizlemesi için dosyanın başından okunan en fazla bayt
+TEXT_PREVIEW_BYTES = 64 * 1024
+# Bundan büyük resimler önizlenmez: çözmek için dosyanın tamamı gerekir
+MAX_IMAGE_BYTES = 8 * 1024 * 1024
+# Çözülen resmin bellekte kaplayacağı alan (en, boy) sınırı
+MAX_IMAGE_PIXELS = 2048 * 2048
+THUMBNAIL_SIZE = (320, 200)
+# Tk'nin kendi başına açabildiği biçimler; diğerleri için Pillow kuruluysa o kullanılır
+TK_IMAGE_TYPES = ('image/png', 'image/gif', 'image/x-portable-pixmap')
+TEXT_TYPES = ('application/json', 'application/xml', 'application/javascript', 'application/x-sh')
+
+
+class LRUCache:
+    """A least-recently-used cache bounded by the total size of its values.
+
+    Sizes are given by the caller with each value (an estimate of the
+    memory it holds); values larger than the whole cache are not kept.
+    Lookups are counted as "<name>.hit"/"<name>.miss" in metrics.
+    """
+
+    def __init__(self, max_bytes: int, name: str = "lru"):
+        self.max_bytes = max_bytes
+        self.name = name
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key):
+        """Return the cached value (marking it recently used), or None."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+        metrics.count(f"{self.name}.hit" if item is not None else f"{self.name}.miss")
+        return None if item is None else item[0]
+
+    def put(self, key, value, size: int) -> None:
+        """Cache value, evicting the least recently used values until it fits."""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._items[key] = (value, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.size -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+
+def preview_kind(entry_data: dict):
+    """Return 'text' or 'image' if an entry's attachment can be previewed, else None."""
+    file_type = entry_data.get('file_type') or mimetypes.guess_type(entry_data.get('file_name') or '')[0] or ''
+    if file_type.startswith('text/') or file_type in TEXT_TYPES:
+        return 'text'
+    if file_type.startswith('image/'):
+        if entry_data.get('file_size') is not None and entry_data['file_size'] > MAX_IMAGE_BYTES:
+            return None
+        return 'image'
+    return None
+
+
+def read_prefix(crypto, path: str, limit: int) -> bytes:
+    """Return at most the first limit plaintext bytes of an attachment.
+
+    Encrypted files only have the chunks covering limit decrypted; plain
+    (older) files are memory-mapped and sliced, so neither reads the rest
+    of a large file.
+    """
+    if crypto.is_encrypted_file(path):
+        return crypto.decrypt_prefix(path, limit)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[:limit]
+
+
+def text_preview(data: bytes, limit: int = TEXT_PREVIEW_BYTES) -> str:
+    """Decode the start of a text file, noting when it was cut short.
+
+    Pass one byte more than limit so a file of exactly limit bytes is not
+    marked as cut short.
+    """
+    text = data[:limit].decode('utf-8', errors='replace')
+    if len(data) > limit:
+        # Kesilen çok baytlı karakterin yarısı atılır
+        text = text.rstrip('�') + "\n…"
+    return text
+
+
+def image_size(data: bytes):
+    """Read (width, height) from a PNG or GIF header, or None for other formats."""
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        return struct.unpack('>II', data[16:24])
+    if data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+        return struct.unpack('<HH', data[6:10])
+    return None
+
+
+def make_thumbnail(data: bytes, file_type: str):
+    """Decode an image into a tk.PhotoImage no larger than THUMBNAIL_SIZE; returns None if it cannot.
+
+    Must be called on the Tk thread. Images whose header reports more than
+    MAX_IMAGE_PIXELS are not decoded.
+    """
+    import tkinter as tk
+
+    size = image_size(data)
+    if size is not None and size[0] * size[1] > MAX_IMAGE_PIXELS:
+        return None
+    if file_type not in TK_IMAGE_TYPES:
+        data = _convert_with_pillow(data)
+        if data is None:
+            return None
+
+    try:
+        image = tk.PhotoImage(data=base64.b64encode(data))
+    except tk.TclError:
+        return None
+    factor = max(
+        1,
+        -(-image.width() // THUMBNAIL_SIZE[0]),
+        -(-image.height() // THUMBNAIL_SIZE[1])
+    )
+    if factor == 1:
+        return image
+    # Tam boyutlu resim hemen bırakılır, önbellekte sadece küçüğü kalır
+    return image.subsample(factor)
+
+
+def _convert_with_pillow(data: bytes):
+    # Pillow isteğe bağlı; yoksa JPEG gibi biçimler önizlenmez
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.width * image.height > MAX_IMAGE_PIXELS:
+                return None
+            # draft JPEG'i doğrudan küçültülmüş çözer
+            image.draft('RGB', THUMBNAIL_SIZE)
+            image.thumbnail(THUMBNAIL_SIZE)
+            out = io.BytesIO()
+            image.save(out, format='PNG')
+            return out.getvalue()
+    except (OSError, ValueError):
+        return None
+
+
+def thumbnail_bytes(image) -> int:
+    """Estimate the memory a tk.PhotoImage holds."""
+    return image.width() * image.height() * 4
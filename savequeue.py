@@ -0,0 +1,187 @@
+import bisect
+import threading
+import time
+
+import metrics
+
+
+class SaveQueue:
+    """Writes entry changes to the vault on a background thread.
+
+    put() and delete() only record the change and return. Changes are
+    coalesced per title (the latest one wins) and written together, at most
+    once every flush_interval seconds, through VaultCore.write_changes: one
+    storage transaction per flush however many edits were made. The search
+    index is updated right away on the calling thread, and get(), count()
+    and titles() see changes that have not been written yet.
+
+    A failed write keeps its changes queued for the next attempt; the error
+    is raised by flush() and can be collected with pop_error().
+    """
+
+    def __init__(self, core, flush_interval: float = 0.5):
+        self.core = core
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._writing = {}
+        self._error = None
+        self._flush_requested = False
+        self._closed = False
+        self._cond = threading.Condition()
+        # Yazma sırasında titles() depoyu yarı yazılmış görmesin
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="save-queue", daemon=True)
+        self._thread.start()
+
+    @property
+    def idle(self) -> bool:
+        """Whether every queued change has been written."""
+        with self._cond:
+            return not self._pending and not self._writing
+
+    def put(self, title: str, entry: dict) -> None:
+        """Queue an insert or overwrite of a single entry."""
+        self._queue(title, entry)
+
+    def delete(self, title: str) -> None:
+        """Queue the removal of a single entry."""
+        self._queue(title, None)
+
+    def get(self, title: str):
+        """Return the entry as it will be once queued changes are written, or None."""
+        with self._cond:
+            for changes in (self._pending, self._writing):
+                if title in changes:
+                    entry = changes[title]
+                    return dict(entry) if entry is not None else None
+        return self.core.get(title)
+
+    def count(self) -> int:
+        """Return how many entries the vault will hold once queued changes are written."""
+        with self._write_lock:
+            added, deleted = self._unwritten()
+            return len(self.core) + len(added) - len(deleted)
+
+    def titles(self, offset: int = 0, limit: int = None) -> list:
+        """Return a page of titles in sorted order, including queued changes.
+
+        Only the stored page around offset is read: each queued new title is
+        placed with VaultCore.rank, so the cost does not grow with the vault.
+        """
+        with self._write_lock:
+            added, deleted = self._unwritten()
+            if not added and not deleted:
+                return self.core.titles(offset, limit)
+            added_ranks = [self.core.rank(title) for title in added]
+            deleted_ranks = sorted(self.core.rank(title) for title in deleted)
+            # Bir satır en fazla eklenen sayısı kadar ileri, silinen sayısı kadar geri kayar
+            start = max(0, offset - len(added))
+            window = self.core.titles(start, None if limit is None else offset + limit + len(deleted) - start)
+
+        rows = []
+        for index, title in enumerate(window, start):
+            if title not in deleted:
+                row = index - bisect.bisect_left(deleted_ranks, index) + bisect.bisect_right(added_ranks, index)
+                rows.append((row, title))
+        for before, (rank, title) in enumerate(zip(added_ranks, added)):
+            rows.append((rank - bisect.bisect_left(deleted_ranks, rank) + before, title))
+        end = None if limit is None else offset + limit
+        return [title for row, title in sorted(rows) if row >= offset and (end is None or row < end)]
+
+    def flush(self) -> None:
+        """Write every queued change now and wait until it is on disk."""
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while (self._pending or self._writing) and self._error is None and self._thread.is_alive():
+                self._cond.wait()
+        error = self.pop_error()
+        if error is not None:
+            raise error
+
+    def pop_error(self):
+        """Return and clear the last write error, if any."""
+        with self._cond:
+            error, self._error = self._error, None
+        return error
+
+    def close(self) -> None:
+        """Flush queued changes and stop the writer thread."""
+        try:
+            self.flush()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            self._thread.join()
+
+    def _unwritten(self):
+        # Sıralı yeni başlıklar ve silinecek kayıtlı başlıklar; _write_lock altında çağrılır
+        with self._cond:
+            changes = dict(self._writing)
+            changes.update(self._pending)
+        added = sorted(title for title, entry in changes.items() if entry is not None and title not in self.core)
+        deleted = {title for title, entry in changes.items() if entry is None and title in self.core}
+        return added, deleted
+
+    def _queue(self, title: str, entry) -> None:
+        if entry is not None:
+            entry = self.core.stamp(title, entry)
+        with self._cond:
+            coalesced = title in self._pending
+            previous = self._pending.get(title)
+            self._pending[title] = entry
+            self._cond.notify_all()
+        metrics.count("savequeue.coalesced" if coalesced else "savequeue.queued")
+        # Yazılmadan ezilen değişikliğin dosya referansı hemen bırakılır
+        if previous is not None:
+            self.core.release_replaced(previous, entry or {})
+        self.core.index_entry(title, entry)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+
+                # Aralık dolana kadar gelen değişiklikler aynı yazmada birleşir
+                deadline = time.monotonic() + self.flush_interval
+                while not self._flush_requested and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                self._writing, self._pending = self._pending, {}
+                self._flush_requested = False
+                changes = self._writing
+
+            try:
+                with self._write_lock:
+                    self.core.write_changes(changes)
+                failed = False
+            except Exception as e:
+                failed = True
+                print(f"Veriler kaydedilemedi: {str(e)}")
+                superseded = []
+                with self._cond:
+                    self._error = e
+                    # Daha yeni bir değişiklik yoksa sonraki denemede tekrar yazılır
+                    for title, entry in changes.items():
+                        if title in self._pending:
+                            superseded.append((entry, self._pending[title]))
+                        else:
+                            self._pending[title] = entry
+                for entry, newer in superseded:
+                    if entry is not None:
+                        self.core.release_replaced(entry, newer or {})
+
+            with self._cond:
+                self._writing = {}
+                self._cond.notify_all()
+                if failed and self._closed:
+                    return
+            if failed:
+                time.sleep(self.flush_interval)
@@ -0,0 +1,287 @@
+import bisect
+import hashlib
+import os
+import threading
+import time
+
+import metrics
+from durable import read_json, write_json
+
+
+class Scrubber:
+    """Checks entries and attachments against their checksums, a little at a time.
+
+    A pass walks every entry in title order (its storage CRC and, when the
+    vault is unlocked, its encryption tag) and the attachment it points to
+    (every chunk's tag and the SHA-256 it is stored under), then the files
+    in the attachment directory in name order, removing those nothing
+    references any more: neither a live entry, nor a revision in the entry
+    history, nor a snapshot. Corrupt attachments are moved to the
+    quarantine directory and reported, missing ones are reported. An item
+    that cannot be checked is reported and the pass goes on.
+
+    Reads are throttled to bytes_per_second, and while busy() returns True
+    (the user is saving or copying files) the scrubber waits. Its position
+    is saved every SAVE_INTERVAL seconds, so an interrupted pass continues
+    where it stopped after a restart.
+    """
+
+    BYTES_PER_SECOND = 4 * 1024 * 1024
+    # Okunan her kayıt en az bu kadar bayt sayılır, küçük kayıtlar da bütçeden yer
+    ENTRY_COST = 4096
+    SAVE_INTERVAL = 5.0
+    BUSY_WAIT = 1.0
+    # Yeni kopyalanmış ama henüz kayda bağlanmamış dosyalar bu kadar saniye silinmez
+    ORPHAN_GRACE = 3600
+    PHASES = ('entries', 'files')
+
+    def __init__(self, core, state_path: str, quarantine_dir: str, bytes_per_second: int = None, busy=None):
+        self.core = core
+        self.state_path = state_path
+        self.quarantine_dir = quarantine_dir
+        self.bytes_per_second = bytes_per_second or self.BYTES_PER_SECOND
+        self.busy = busy
+        self.state = self._load()
+        self._stop = threading.Event()
+        self._thread = None
+        self._budget_start = None
+        self._budget_used = 0
+        self._saved_at = 0.0
+
+    @property
+    def problems(self) -> list:
+        """Problems found by the last finished pass and the one in progress."""
+        return self.state["last_problems"] + self.state["problems"]
+
+    def start(self, interval: float = 24 * 3600) -> None:
+        """Scrub on a daemon thread, starting a new pass interval seconds after the last one finished."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="scrubber", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop after the current item and save the position."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run_pass(self) -> bool:
+        """Continue (or start) a pass in this thread; returns True when it finished, False if stopped."""
+        if self.state["phase"] is None:
+            self.state.update(phase='entries', position=None, started=time.time(), checked=0, bytes=0, problems=[])
+        self._budget_start = time.monotonic()
+        self._budget_used = 0
+        verified = set()
+        try:
+            while self.state["phase"] is not None:
+                if self.state["phase"] == 'entries':
+                    finished = self._scrub_entries(verified)
+                else:
+                    finished = self._collect_orphans()
+                if not finished:
+                    return False
+                following = self.PHASES.index(self.state["phase"]) + 1
+                self.state["phase"] = self.PHASES[following] if following < len(self.PHASES) else None
+                self.state["position"] = None
+
+            self.state["last_pass"] = {
+                "started": self.state["started"],
+                "finished": time.time(),
+                "checked": self.state["checked"],
+                "bytes": self.state["bytes"],
+                "problems": len(self.state["problems"])
+            }
+            self.state["last_problems"] = self.state["problems"]
+            self.state["problems"] = []
+            return True
+        finally:
+            self._save()
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.is_set():
+            last = self.state["last_pass"]
+            due = 0.0 if self.state["phase"] is not None or last is None else last["finished"] + interval - time.time()
+            if due > 0:
+                self._stop.wait(min(due, 60.0))
+                continue
+            try:
+                self.run_pass()
+            except Exception as e:
+                # Kasa kilitlendiyse ya da depolama kapandıysa bir sonraki açılışta devam edilir
+                print(f"Bütünlük taraması durdu: {str(e)}")
+                return
+
+    def _scrub_entries(self, verified: set) -> bool:
+        titles = self.core.store.titles()
+        start = 0 if self.state["position"] is None else bisect.bisect_right(titles, self.state["position"])
+        for title in titles[start:]:
+            if not self._wait_turn():
+                return False
+            try:
+                self._check_entry(title, verified)
+            except Exception as e:
+                print(f"Kayıt denetlenemedi ({title}): {str(e)}")
+                self._report(title, 'error', f"Kayıt denetlenemedi: {str(e)}")
+            if self._stop.is_set():
+                # Yarım kalan kayıt bir sonraki açılışta baştan denetlenir
+                return False
+            self.state["position"] = title
+            self.state["checked"] += 1
+            metrics.count("scrub.entries")
+        return True
+
+    def _check_entry(self, title: str, verified: set) -> None:
+        try:
+            entry = self.core.store.get(title)
+            if entry is None:
+                return
+            if self.core.crypto.unlocked:
+                self.core.open_entry(title, entry)
+        except (IOError, ValueError) as e:
+            self._report(title, 'entry', f"Kayıt okunamadı: {str(e)}")
+            return
+        finally:
+            self._spend(self.ENTRY_COST)
+
+        digest = entry.get('file_hash')
+        if digest:
+            if digest in verified:
+                return
+            verified.add(digest)
+            path = self.core.blob_store.path(digest)
+            if not os.path.exists(path):
+                self._report(title, 'missing', f"Dosya bulunamadı: {entry.get('file_name')}")
+            elif not self._verify_blob(path, digest) and os.path.exists(path):
+                moved = self._quarantine(path)
+                if moved is not None:
+                    self._report(title, 'corrupt', f"Dosya bozuk, karantinaya alındı: {moved}")
+        elif entry.get('file_name'):
+            # Eski tip ekin sağlama toplamı yok, sadece varlığı denetlenir
+            if not os.path.exists(self.core.attachment_path(entry)):
+                self._report(title, 'missing', f"Dosya bulunamadı: {entry['file_name']}")
+
+    def _verify_blob(self, path: str, digest: str) -> bool:
+        actual = hashlib.sha256()
+        try:
+            with open(path, 'rb') as f:
+                if self.core.crypto.is_encrypted_file(path):
+                    if not self.core.crypto.unlocked:
+                        return True
+                    chunks = self.core.crypto.decrypt_chunks(f)
+                else:
+                    chunks = iter(lambda: f.read(self.core.blob_store.CHUNK_SIZE), b'')
+                for chunk in chunks:
+                    actual.update(chunk)
+                    self._spend(len(chunk))
+                    if self._stop.is_set():
+                        return True
+        except FileNotFoundError:
+            # Bu arada serbest bırakılıp silinmiş
+            return True
+        except ValueError:
+            return False
+        return actual.hexdigest() == digest
+
+    def _collect_orphans(self) -> bool:
+        """Remove attachment files no entry references (and stale temp files) older than ORPHAN_GRACE."""
+        root = self.core.files_dir
+        legacy = set()
+        if any(
+            os.path.isfile(os.path.join(root, name)) and not name.startswith("refs.db") for name in os.listdir(root)
+        ):
+            # Eski tip ekler kayıtlarda dosya adıyla anılır
+            legacy = {entry.get('file_name') for _, entry in self.core.store.items() if not entry.get('file_hash')}
+        # Geçmişteki sürümlerin ve yedeklerin ekleri de referans sayılır; geri yüklenince gerekir
+        kept = self.core.snapshots.file_keys()
+        for file_hash, file_name in self.core.history.attachments():
+            kept.add(file_hash or "file:" + file_name)
+        legacy |= {key[len("file:"):] for key in kept if key.startswith("file:")}
+
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for name in sorted(filenames):
+                paths.append(os.path.relpath(os.path.join(dirpath, name), root))
+        start = 0 if self.state["position"] is None else bisect.bisect_right(paths, self.state["position"])
+        cutoff = time.time() - self.ORPHAN_GRACE
+        for relpath in paths[start:]:
+            if not self._wait_turn():
+                return False
+            path = os.path.join(root, relpath)
+            name = os.path.basename(relpath)
+            self.state["position"] = relpath
+            try:
+                if name.startswith("refs.db") or os.path.getmtime(path) > cutoff:
+                    continue
+                if os.path.dirname(relpath) == "tmp":
+                    os.remove(path)
+                elif os.path.dirname(relpath) == "":
+                    if name not in legacy:
+                        os.remove(path)
+                    else:
+                        continue
+                elif name in kept or not self.core.blob_store.remove_orphan(name):
+                    continue
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                print(f"Dosya silinemedi ({relpath}): {str(e)}")
+                continue
+            metrics.count("scrub.orphans")
+            self.state.setdefault("orphans_removed", 0)
+            self.state["orphans_removed"] += 1
+        return True
+
+    def _quarantine(self, path: str):
+        """Move a corrupt file aside; returns where it went, or None if it was removed meanwhile."""
+        os.makedirs(self.quarantine_dir, exist_ok=True)
+        target = os.path.join(self.quarantine_dir, os.path.basename(path))
+        try:
+            os.replace(path, target)
+        except FileNotFoundError:
+            # Denetimle taşıma arasında serbest bırakılıp silinmiş
+            return None
+        return target
+
+    def _report(self, title: str, kind: str, detail: str) -> None:
+        metrics.count("scrub.problems")
+        self.state["problems"].append({"title": title, "kind": kind, "detail": detail, "time": time.time()})
+
+    def _wait_turn(self) -> bool:
+        """Wait while the vault is busy and save progress now and then; returns False once stopped."""
+        while self.busy is not None and self.busy() and not self._stop.is_set():
+            self._stop.wait(self.BUSY_WAIT)
+            # Beklenen süre bütçeye sayılmaz
+            self._budget_start = time.monotonic()
+            self._budget_used = 0
+        if time.monotonic() - self._saved_at >= self.SAVE_INTERVAL:
+            self._save()
+        return not self._stop.is_set()
+
+    def _spend(self, size: int) -> None:
+        """Count bytes read and sleep long enough to stay under bytes_per_second."""
+        self.state["bytes"] += size
+        metrics.count("scrub.bytes", size)
+        self._budget_used += size
+        ahead = self._budget_used / self.bytes_per_second - (time.monotonic() - self._budget_start)
+        if ahead > 0:
+            self._stop.wait(ahead)
+
+    def _load(self) -> dict:
+        state = {
+            "phase": None, "position": None, "started": None, "checked": 0, "bytes": 0,
+            "problems": [], "last_problems": [], "last_pass": None
+        }
+        try:
+            state.update(read_json(self.state_path))
+        except (IOError, ValueError):
+            pass
+        return state
+
+    def _save(self) -> None:
+        self._saved_at = time.monotonic()
+        try:
+            write_json(self.state_path, self.state)
+        except IOError as e:
+            print(f"Tarama durumu kaydedilemedi: {str(e)}")
@@ -0,0 +1,132 @@
+import bisect
+import json
+import re
+
+from durable import read_file, write_file
+
+# Türkçe büyük/küçük harf dönüşümü: İ -> i, I -> ı
+_TURKISH_CASE = str.maketrans({'İ': 'i', 'I': 'ı'})
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize(text: str) -> str:
+    """Case-fold text, honouring the Turkish dotted/dotless i."""
+    return text.translate(_TURKISH_CASE).casefold()
+
+
+def tokenize(text: str) -> list:
+    """Split text into normalized word tokens."""
+    return _TOKEN_RE.findall(normalize(text))
+
+
+class SearchIndex:
+    """In-memory inverted index over entry titles and content.
+
+    Every query word is matched as a prefix against a sorted vocabulary, and
+    an entry matches when it contains all query words. The index is updated
+    per entry on save/delete and can be written to disk so startup does not
+    have to re-tokenize the whole vault.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.doc_tokens = {}
+        self.vocabulary = []
+
+    def add(self, title: str, content: str) -> None:
+        """Index (or re-index) a single entry."""
+        self.remove(title)
+        tokens = set(tokenize(title)) | set(tokenize(content))
+        self.doc_tokens[title] = tokens
+        for token in tokens:
+            self._add_posting(token, title)
+
+    def remove(self, title: str) -> None:
+        """Drop a single entry from the index."""
+        for token in self.doc_tokens.pop(title, ()):
+            titles = self.postings[token]
+            titles.discard(title)
+            if not titles:
+                del self.postings[token]
+                del self.vocabulary[bisect.bisect_left(self.vocabulary, token)]
+
+    def clear(self) -> None:
+        self.postings = {}
+        self.doc_tokens = {}
+        self.vocabulary = []
+
+    def build(self, items) -> None:
+        """Rebuild the index from (title, entry) pairs."""
+        self.clear()
+        for title, entry in items:
+            tokens = set(tokenize(title)) | set(tokenize(entry.get('content', '')))
+            self.doc_tokens[title] = tokens
+            for token in tokens:
+                self.postings.setdefault(token, set()).add(title)
+        self.vocabulary = sorted(self.postings)
+
+    def search(self, query: str):
+        """Return the set of titles matching every word of query, or None for an empty query."""
+        words = tokenize(query)
+        if not words:
+            return None
+
+        result = None
+        # Uzun kelimeler daha az eşleşir, önce onlarla daraltılır
+        for word in sorted(set(words), key=len, reverse=True):
+            matches = self._prefix_matches(word, limit_to=result)
+            result = matches if result is None else result & matches
+            if not result:
+                return set()
+        return result
+
+    def save(self, path: str, fingerprint: str, crypto=None) -> None:
+        """Write the index to path, tagged with the store fingerprint it matches.
+
+        The index holds words from entry contents, so it is encrypted with
+        crypto when one is given.
+        """
+        data = json.dumps({
+            "fingerprint": fingerprint,
+            "docs": {title: sorted(tokens) for title, tokens in self.doc_tokens.items()}
+        }, ensure_ascii=False).encode('utf-8')
+        if crypto is not None:
+            data = crypto.encrypt_bytes(data, b'search-index')
+
+        write_file(path, data)
+
+    def load(self, path: str, fingerprint: str, crypto=None) -> bool:
+        """Load a saved index; returns False if it is missing or out of date."""
+        try:
+            data = read_file(path)
+            if crypto is not None:
+                data = crypto.decrypt_bytes(data, b'search-index')
+            saved = json.loads(data.decode('utf-8'))
+        except (IOError, ValueError):
+            return False
+        if saved.get("fingerprint") != fingerprint:
+            return False
+
+        self.clear()
+        for title, tokens in saved["docs"].items():
+            self.doc_tokens[title] = set(tokens)
+            for token in tokens:
+                self.postings.setdefault(token, set()).add(title)
+        self.vocabulary = sorted(self.postings)
+        return True
+
+    def _add_posting(self, token: str, title: str) -> None:
+        titles = self.postings.get(token)
+        if titles is None:
+            titles = self.postings[token] = set()
+            bisect.insort(self.vocabulary, token)
+        titles.add(title)
+
+    def _prefix_matches(self, prefix: str, limit_to: set = None) -> set:
+        matches = set()
+        i = bisect.bisect_left(self.vocabulary, prefix)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(prefix):
+            postings = self.postings[self.vocabulary[i]]
+            matches |= postings if limit_to is None else postings & limit_to
+            i += 1
+        return matches
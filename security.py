@@ -0,0 +1,84 @@
+import os
+import platform
+import subprocess
+from datetime import datetime
+
+from archiver import ParallelArchiver
+
+
+class SecurityManager:
+    ARCHIVE_PASSWORD = 'your_password_here'
+    # 0: sadece şifreleme (en hızlı), 1-9: LZMA2 sıkıştırma seviyesi
+    COMPRESSION_LEVEL = 1
+
+    def __init__(self):
+        self.registry_path = r"Software\DigitalVault"
+        self.registry_key = "SecretPath"
+        self.secret_path = self.get_or_create_secret_path()
+        self.last_backup_stats = None
+
+    def get_or_create_secret_path(self):
+        if platform.system() != 'Windows':
+            # Windows dışı sistemler için alternatif yol
+            secret_path = os.path.join(os.path.expanduser('~'), '.vault_backup')
+            if not os.path.exists(secret_path):
+                os.makedirs(secret_path)
+            return secret_path
+
+        # winreg sadece Windows'ta var
+        import winreg
+
+        try:
+            key = winreg.CreateKey(winreg.HKEY_CURRENT_USER, self.registry_path)
+            path, _ = winreg.QueryValueEx(key, self.registry_key)
+            winreg.CloseKey(key)
+
+            if not os.path.exists(path):
+                os.makedirs(path)
+                subprocess.run(['attrib', '+h', path], shell=True)
+
+            return path
+        except:
+            documents_path = os.path.expanduser('~\\Documents')
+            secret_path = os.path.join(documents_path, '.vault_backup')
+
+            if not os.path.exists(secret_path):
+                os.makedirs(secret_path)
+                subprocess.run(['attrib', '+h', secret_path], shell=True)
+
+            key = winreg.CreateKey(winreg.HKEY_CURRENT_USER, self.registry_path)
+            winreg.SetValueEx(key, self.registry_key, 0, winreg.REG_SZ, secret_path)
+            winreg.CloseKey(key)
+
+            return secret_path
+
+    def backup_to_secret_location(self, vault_path, files_dir, extra_files=(), level: int = None, workers: int = None):
+        try:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+            files = []
+            for path in (vault_path, *extra_files):
+                if os.path.exists(path):
+                    files.append((path, os.path.basename(path)))
+            if os.path.exists(files_dir):
+                for dirpath, _, filenames in os.walk(files_dir):
+                    for name in filenames:
+                        path = os.path.join(dirpath, name)
+                        files.append((path, os.path.join('files', os.path.relpath(path, files_dir))))
+
+            # Dosyalar çekirdek sayısı kadar şifreli 7z parçasına paralel yazılır
+            archiver = ParallelArchiver(
+                self.ARCHIVE_PASSWORD,
+                level=self.COMPRESSION_LEVEL if level is None else level,
+                workers=workers
+            )
+            self.last_backup_stats = archiver.archive(files, self.secret_path, f"vault_backup_{timestamp}")
+            print(
+                f"Yedekleme: {self.last_backup_stats['bytes'] / (1024 * 1024):.1f} MB, "
+                f"{self.last_backup_stats['mb_per_s']:.1f} MB/s"
+            )
+
+            return True
+        except Exception as e:
+            print(f"Yedekleme hatası: {str(e)}")
+            return False
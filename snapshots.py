@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+import zlib
+from datetime import datetime, timedelta
+
+from durable import CorruptFileError, read_json, replace_file, write_file, write_json
+
+
+class SnapshotStore:
+    """Incremental, deduplicated backups.
+
+    Every entry and every chunk of an attachment is stored once in a shared,
+    content-addressed chunk store. A snapshot is just a manifest listing the
+    chunk of each entry and the chunks of each attachment, so taking a new
+    snapshot only writes what changed since the previous one.
+    """
+
+    FILE_CHUNK_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, root: str):
+        self.root = root
+        self.chunks_dir = os.path.join(root, "chunks")
+        self.manifests_dir = os.path.join(root, "manifests")
+
+    def list_snapshots(self) -> list:
+        """Return snapshot ids, newest first."""
+        if not os.path.exists(self.manifests_dir):
+            return []
+        names = [name[:-5] for name in os.listdir(self.manifests_dir) if name.endswith(".json")]
+        return sorted(names, reverse=True)
+
+    def load_manifest(self, snapshot_id: str) -> dict:
+        return read_json(os.path.join(self.manifests_dir, f"{snapshot_id}.json"))
+
+    def file_keys(self) -> set:
+        """Return the attachment keys (see file_key) of every snapshot."""
+        keys = set()
+        for snapshot_id in self.list_snapshots():
+            keys.update(self.load_manifest(snapshot_id)["files"])
+        return keys
+
+    def create(self, entries, files: dict) -> dict:
+        """Take a snapshot.
+
+        entries yields (title, entry) pairs; files maps an attachment key
+        (blob digest or legacy file name) to its path on disk. Returns the
+        manifest together with how many new chunks and bytes were written.
+        """
+        os.makedirs(self.manifests_dir, exist_ok=True)
+        snapshots = self.list_snapshots()
+        previous = self.load_manifest(snapshots[0]) if snapshots else {"files": {}}
+
+        stats = {"new_chunks": 0, "new_bytes": 0}
+        manifest = {
+            "id": self._new_id(snapshots),
+            "created": datetime.now().isoformat(timespec='seconds'),
+            "parent": snapshots[0] if snapshots else None,
+            "entries": {},
+            "files": {}
+        }
+
+        for title, entry in entries:
+            manifest["entries"][title] = self._put_chunk(self.entry_bytes(entry), stats)
+
+        for key, path in files.items():
+            # Blob adları içerik özeti olduğundan önceki yedekteki parça listesi aynen kullanılabilir
+            if key in previous["files"] and all(self._has_chunk(h) for h in previous["files"][key]):
+                manifest["files"][key] = previous["files"][key]
+            elif os.path.exists(path):
+                manifest["files"][key] = self._put_file(path, stats)
+
+        write_json(os.path.join(self.manifests_dir, f"{manifest['id']}.json"), manifest)
+        manifest.update(stats)
+        return manifest
+
+    def restore(self, snapshot_id: str, file_path, titles=None) -> dict:
+        """Rebuild a snapshot's attachments and return its entries.
+
+        file_path maps an attachment key to where it should be written;
+        attachments that already exist there are left alone. When titles is
+        given only those entries, and only their attachments, are restored.
+        """
+        manifest = self.load_manifest(snapshot_id)
+        entries = self._read_entries(manifest, titles)
+
+        if titles is None:
+            keys = manifest["files"]
+        else:
+            keys = [self.file_key(entry) for entry in entries.values()]
+        for key in keys:
+            if key is None or key not in manifest["files"]:
+                continue
+            path = file_path(key)
+            if os.path.exists(path):
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                for chunk_hash in manifest["files"][key]:
+                    f.write(self._get_chunk(chunk_hash))
+                f.flush()
+                os.fsync(f.fileno())
+            replace_file(tmp_path, path)
+
+        return entries
+
+    def get_entries(self, snapshot_id: str, titles) -> dict:
+        """Return the given entries of a snapshot, without touching attachments."""
+        return self._read_entries(self.load_manifest(snapshot_id), titles)
+
+    def diff(self, snapshot_id: str, entries) -> dict:
+        """Compare live (title, entry) pairs with a snapshot in one pass.
+
+        Entries are compared by the hash their chunk would have, so no
+        snapshot chunk has to be read. Returns sorted title lists: 'added'
+        (only in the snapshot), 'changed' (stored differently) and 'removed'
+        (only in the live vault).
+        """
+        saved = self.load_manifest(snapshot_id)["entries"]
+        changed = []
+        removed = []
+        seen = set()
+        for title, entry in entries:
+            seen.add(title)
+            chunk_hash = saved.get(title)
+            if chunk_hash is None:
+                removed.append(title)
+            elif chunk_hash != hashlib.sha256(self.entry_bytes(entry)).hexdigest():
+                changed.append(title)
+        added = [title for title in saved if title not in seen]
+        return {"added": sorted(added), "changed": sorted(changed), "removed": sorted(removed)}
+
+    @staticmethod
+    def entry_bytes(entry: dict) -> bytes:
+        """Canonical encoding of an entry; its SHA-256 is the entry's chunk hash."""
+        return json.dumps(entry, ensure_ascii=False, sort_keys=True).encode('utf-8')
+
+    @staticmethod
+    def file_key(entry: dict):
+        """The attachment key of an entry (blob digest or legacy file name), or None."""
+        if entry.get('file_hash'):
+            return entry['file_hash']
+        if entry.get('file_name'):
+            return "file:" + entry['file_name']
+        return None
+
+    def prune(self, keep_last: int, keep_daily: int) -> int:
+        """Drop old snapshots and the chunks only they referenced.
+
+        Keeps the newest keep_last snapshots plus the newest snapshot of each
+        of the last keep_daily days. Returns the number of snapshots removed.
+        """
+        snapshots = self.list_snapshots()
+        keep = set(snapshots[:keep_last])
+        cutoff = (datetime.now() - timedelta(days=keep_daily)).strftime("%Y%m%d")
+        seen_days = set()
+        for snapshot_id in snapshots:
+            day = snapshot_id[:8]
+            if day >= cutoff and day not in seen_days:
+                seen_days.add(day)
+                keep.add(snapshot_id)
+
+        removed = [snapshot_id for snapshot_id in snapshots if snapshot_id not in keep]
+        if not removed:
+            return 0
+        for snapshot_id in removed:
+            os.remove(os.path.join(self.manifests_dir, f"{snapshot_id}.json"))
+
+        # Kalan yedeklerin kullanmadığı parçaları temizle
+        live = set()
+        for snapshot_id in keep:
+            manifest = self.load_manifest(snapshot_id)
+            live.update(manifest["entries"].values())
+            for chunk_hashes in manifest["files"].values():
+                live.update(chunk_hashes)
+        for dirpath, _, filenames in os.walk(self.chunks_dir):
+            for name in filenames:
+                if name not in live:
+                    os.remove(os.path.join(dirpath, name))
+        return len(removed)
+
+    def _read_entries(self, manifest: dict, titles) -> dict:
+        saved = manifest["entries"]
+        if titles is None:
+            titles = saved
+        return {
+            title: json.loads(self._get_chunk(saved[title]).decode('utf-8'))
+            for title in titles if title in saved
+        }
+
+    def _new_id(self, snapshots: list) -> str:
+        snapshot_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        suffix = 1
+        candidate = snapshot_id
+        while candidate in snapshots:
+            candidate = f"{snapshot_id}_{suffix}"
+            suffix += 1
+        return candidate
+
+    def _chunk_path(self, chunk_hash: str) -> str:
+        return os.path.join(self.chunks_dir, chunk_hash[:2], chunk_hash)
+
+    def _has_chunk(self, chunk_hash: str) -> bool:
+        return os.path.exists(self._chunk_path(chunk_hash))
+
+    def _put_chunk(self, data: bytes, stats: dict) -> str:
+        chunk_hash = hashlib.sha256(data).hexdigest()
+        path = self._chunk_path(chunk_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            compressed = zlib.compress(data)
+            # Parça adı içeriğin özeti olduğundan ayrı bir sağlama satırı gerekmez
+            write_file(path, compressed, checksum=False)
+            stats["new_chunks"] += 1
+            stats["new_bytes"] += len(compressed)
+        return chunk_hash
+
+    def _put_file(self, path: str, stats: dict) -> list:
+        chunk_hashes = []
+        with open(path, 'rb') as f:
+            while True:
+                data = f.read(self.FILE_CHUNK_SIZE)
+                if not data:
+                    break
+                chunk_hashes.append(self._put_chunk(data, stats))
+        return chunk_hashes
+
+    def _get_chunk(self, chunk_hash: str) -> bytes:
+        path = self._chunk_path(chunk_hash)
+        with open(path, 'rb') as f:
+            try:
+                data = zlib.decompress(f.read())
+            except zlib.error as e:
+                raise CorruptFileError(f"Yedek parçası bozuk: {path}") from e
+        if hashlib.sha256(data).hexdigest() != chunk_hash:
+            raise CorruptFileError(f"Yedek parçası bozuk: {path}")
+        return data
@@ -0,0 +1,670 @@
+import bisect
+import json
+import locale
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+
+import metrics
+from durable import fsync_dir, replace_file
+
+
+class StorageError(IOError):
+    """Raised when a storage backend cannot read or write entries."""
+
+
+class VaultStore:
+    """Base class for vault storage backends."""
+
+    def load(self) -> None:
+        """Open the backend and make its entries available."""
+        raise NotImplementedError
+
+    def get(self, title: str):
+        """Return the entry stored under title, or None."""
+        raise NotImplementedError
+
+    def titles(self, offset: int = 0, limit: int = None) -> list:
+        """Return titles in sorted order, optionally a single page of them."""
+        raise NotImplementedError
+
+    def rank(self, title: str) -> int:
+        """Return how many stored titles sort before title."""
+        raise NotImplementedError
+
+    def items(self):
+        """Yield (title, entry) pairs in title order."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __contains__(self, title: str) -> bool:
+        return self.get(title) is not None
+
+    def put(self, title: str, entry: dict) -> None:
+        """Insert or overwrite a single entry."""
+        raise NotImplementedError
+
+    def put_many(self, items) -> None:
+        """Insert or overwrite many (title, entry) pairs as one transaction."""
+        for title, entry in items:
+            self.put(title, entry)
+
+    def delete(self, title: str) -> None:
+        """Remove a single entry."""
+        raise NotImplementedError
+
+    def replace(self, data: dict) -> None:
+        """Replace the whole vault with the given entries."""
+        raise NotImplementedError
+
+    def export(self, path: str) -> None:
+        """Write every entry to path in the vault_data.json format."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("{")
+            for i, (title, entry) in enumerate(self.items()):
+                if i:
+                    f.write(",")
+                f.write(f"\n  {json.dumps(title, ensure_ascii=False)}: {json.dumps(entry, ensure_ascii=False)}")
+            f.write("\n}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        replace_file(tmp_path, path)
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+    def files(self) -> list:
+        """Return the paths of the files this backend keeps on disk."""
+        return []
+
+    def fingerprint(self) -> str:
+        """Describe the on-disk state, so caches can tell whether they are stale."""
+        parts = []
+        for path in self.files():
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            parts.append(f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}")
+        return "|".join(parts)
+
+
+def read_legacy_vault(json_path: str) -> dict:
+    """Read an old vault_data.json plus any journal written next to it by earlier versions."""
+    data = {}
+    try:
+        with open(json_path, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        raw = b''
+
+    # Eski sürümler dosyayı sistem kodlamasıyla yazıyordu
+    try:
+        text = raw.decode('utf-8')
+    except UnicodeDecodeError:
+        text = raw.decode(locale.getpreferredencoding(False), errors='replace')
+    try:
+        loaded = json.loads(text) if text.strip() else {}
+        if isinstance(loaded, dict):
+            data = loaded
+    except json.JSONDecodeError as e:
+        # Boş kasa diye devam etmek bütün veriyi silmek olurdu
+        raise StorageError(f"Eski veri dosyası okunamadı: {str(e)}") from e
+
+    journal_path = os.path.splitext(json_path)[0] + ".journal"
+    for path in (journal_path + ".old", journal_path):
+        if not os.path.exists(path):
+            continue
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line.decode('utf-8'))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    break
+                if record.get("op") == "put":
+                    data[record["title"]] = record["entry"]
+                elif record.get("op") == "del":
+                    data.pop(record["title"], None)
+                elif record.get("op") == "reset":
+                    data = record["data"]
+    return data
+
+
+class JournalStore(VaultStore):
+    """Indexed snapshot + append-only journal storage.
+
+    Only a title -> (file, offset, length, crc) index is kept in memory; an
+    entry is read with seek+read when it is asked for, so startup cost
+    depends on the number of entries rather than on their size. Every
+    entry carries a CRC-32 that is checked when it is read.
+
+    The snapshot (<name>.<gen>.dat) holds one entry per line, followed by
+    the index of those lines and a fixed-size footer pointing at it. Every
+    change is appended to the journal (<name>.<gen>.log) as a small header
+    line plus the entry line, so replay can seek over entry bodies. Once the
+    journal outgrows the snapshot, a new journal generation is started and
+    the previous state is written to a new snapshot on a background thread;
+    snapshot N contains every journal older than N. Files are never renamed
+    while open, which Windows does not allow.
+
+    The previous snapshot and the journals after it are kept until the next
+    compaction, so if the newest snapshot fails its checksum, load() falls
+    back to that last good generation.
+
+    An old-style vault_data.json (and its journal) is imported on first load.
+    """
+
+    FOOTER = struct.Struct('>4sQQI')
+    FOOTER_MAGIC = b'DVX2'
+    # Sağlama toplamı olmayan ilk snapshot biçimi
+    OLD_FOOTER = struct.Struct('>4sQQ')
+    OLD_FOOTER_MAGIC = b'DVIX'
+
+    def __init__(self, data_file: str, compact_threshold: int = 1000, fsync: bool = True):
+        self.legacy_path = data_file
+        self.base_path = os.path.splitext(data_file)[0]
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self.index = {}
+        self.generation = 0
+        self.snapshot_path = None
+        self.journal_path = None
+        self._sorted_titles = []
+        self._journal = None
+        self._readers = {}
+        self._pending = 0
+        self._lock = threading.RLock()
+        self._compactor = None
+
+    def load(self) -> None:
+        """Read the snapshot index and replay journal headers on top of it."""
+        snapshots = self._generations(".dat")
+        journals = self._generations(".log")
+        if not snapshots and not journals and (
+            os.path.exists(self.legacy_path) or os.path.exists(self.base_path + ".journal")
+        ):
+            self._import_legacy()
+            snapshots = self._generations(".dat")
+
+        self.index = {}
+        snapshot_gen = 0
+        corrupt = []
+        # En yeni sağlam snapshot kullanılır; bozuksa bir önceki kuşağa dönülür
+        for gen in reversed(snapshots):
+            path = self._path(gen, ".dat")
+            try:
+                self._read_snapshot_index(path)
+            except (StorageError, ValueError, OSError, struct.error) as e:
+                print(f"Snapshot okunamadı, önceki kuşağa dönülüyor: {str(e)}")
+                self.index = {}
+                corrupt.append(path)
+                continue
+            snapshot_gen = gen
+            self.snapshot_path = path
+            break
+        if snapshots and self.snapshot_path is None:
+            raise StorageError("Okunabilir snapshot bulunamadı")
+        # İncelenebilsin diye silinmez, kuşak listesinden çıkarılır
+        for path in corrupt:
+            os.replace(path, path + ".corrupt")
+            snapshots.remove(self._generation_of(path))
+
+        keep_from = max([gen for gen in snapshots if gen < snapshot_gen], default=snapshot_gen)
+        for gen in snapshots:
+            if gen < keep_from:
+                os.remove(self._path(gen, ".dat"))
+
+        # Snapshot'a zaten dahil edilmiş günlükler atlanır; önceki kuşağınkiler yedek olarak kalır
+        for gen in journals:
+            path = self._path(gen, ".log")
+            if gen < keep_from:
+                os.remove(path)
+            elif gen >= snapshot_gen:
+                self._pending = self._replay(path)
+                self.generation = gen
+
+        self.generation = max(self.generation, snapshot_gen)
+        self.journal_path = self._path(self.generation, ".log")
+        self._journal = open(self.journal_path, 'ab')
+        fsync_dir(os.path.dirname(self.journal_path))
+        self._sorted_titles = sorted(self.index)
+
+    def get(self, title: str):
+        # Konum ve okuma aynı kilit altında: sıkıştırma eski dosyayı arada silebilir
+        with self._lock:
+            location = self.index.get(title)
+            if location is None:
+                return None
+            payload = self._read(location)
+        return json.loads(payload.decode('utf-8'))
+
+    def titles(self, offset: int = 0, limit: int = None) -> list:
+        end = None if limit is None else offset + limit
+        return self._sorted_titles[offset:end]
+
+    def rank(self, title: str) -> int:
+        return bisect.bisect_left(self._sorted_titles, title)
+
+    def items(self):
+        for title in list(self._sorted_titles):
+            entry = self.get(title)
+            if entry is not None:
+                yield title, entry
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, title: str) -> bool:
+        return title in self.index
+
+    def put(self, title: str, entry: dict) -> None:
+        """Append a put record for the entry."""
+        payload = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+        crc = zlib.crc32(payload)
+        header = self._header({"op": "put", "title": title, "len": len(payload), "crc": crc})
+        with self._lock:
+            offset = self._write_journal(header + payload + b"\n") + len(header)
+            if title not in self.index:
+                bisect.insort(self._sorted_titles, title)
+            self.index[title] = (self.journal_path, offset, len(payload), crc)
+        self._after_write()
+
+    def put_many(self, items) -> None:
+        """Append a batch of put records with a single write and fsync.
+
+        The batch header carries the total length, so a batch cut short by a
+        crash is dropped as a whole on replay.
+        """
+        body = bytearray()
+        locations = {}
+        with metrics.span("storage.encode"):
+            for title, entry in items:
+                payload = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+                crc = zlib.crc32(payload)
+                body += self._header({"op": "put", "title": title, "len": len(payload), "crc": crc})
+                locations[title] = (len(body), len(payload), crc)
+                body += payload + b"\n"
+        if not locations:
+            return
+
+        header = self._header({"op": "batch", "len": len(body)})
+        with self._lock, metrics.span("storage.write"):
+            start = self._write_journal(header + bytes(body)) + len(header)
+            new_titles = [title for title in locations if title not in self.index]
+            for title, (offset, length, crc) in locations.items():
+                self.index[title] = (self.journal_path, start + offset, length, crc)
+            if new_titles:
+                # Sıralı listeye toplu ekleme: tek sıralama, tek tek insort değil
+                self._sorted_titles.extend(new_titles)
+                self._sorted_titles.sort()
+        self._after_write(len(locations))
+
+    def delete(self, title: str) -> None:
+        """Append a delete record for the entry."""
+        with self._lock:
+            self._write_journal(self._header({"op": "del", "title": title}))
+            if self.index.pop(title, None) is not None:
+                del self._sorted_titles[bisect.bisect_left(self._sorted_titles, title)]
+        self._after_write()
+
+    def replace(self, data: dict) -> None:
+        """Swap in a whole new vault by writing it straight to a new snapshot."""
+        self._wait_for_compactor()
+        with self._lock:
+            generation = self._start_generation()
+        rows = ((title, json.dumps(entry, ensure_ascii=False).encode('utf-8')) for title, entry in sorted(data.items()))
+        path, new_index = self._write_snapshot(generation, rows)
+        with self._lock:
+            self.index = {}
+            self._install_snapshot(path, new_index, None)
+            self._sorted_titles = sorted(self.index)
+
+    def compact(self, wait: bool = False) -> None:
+        """Start a new journal and fold everything before it into a new snapshot."""
+        if self._compactor is not None and self._compactor.is_alive():
+            if not wait:
+                return
+            self._compactor.join()
+
+        with self._lock:
+            generation = self._start_generation()
+            expected = dict(self.index)
+        self._compactor = threading.Thread(target=self._compact, args=(generation, expected), daemon=True)
+        self._compactor.start()
+        if wait:
+            self._compactor.join()
+
+    def close(self) -> None:
+        """Wait for a running compaction and close every file."""
+        self._wait_for_compactor()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            for reader in self._readers.values():
+                reader.close()
+            self._readers = {}
+
+    def files(self) -> list:
+        return [self._path(gen, ext) for ext in (".dat", ".log") for gen in self._generations(ext)]
+
+    def _path(self, generation: int, ext: str) -> str:
+        return f"{self.base_path}.{generation}{ext}"
+
+    def _generations(self, ext: str) -> list:
+        directory = os.path.dirname(self.base_path) or "."
+        prefix = os.path.basename(self.base_path) + "."
+        generations = []
+        for name in os.listdir(directory):
+            if name.startswith(prefix) and name.endswith(ext):
+                middle = name[len(prefix):-len(ext)]
+                if middle.isdigit():
+                    generations.append(int(middle))
+        return sorted(generations)
+
+    @staticmethod
+    def _header(record: dict) -> bytes:
+        return json.dumps(record, ensure_ascii=False).encode('utf-8') + b"\n"
+
+    def _write_journal(self, data: bytes) -> int:
+        """Append data to the journal and return the offset it was written at."""
+        offset = self._journal.seek(0, os.SEEK_END)
+        self._journal.write(data)
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        return offset
+
+    def _after_write(self, count: int = 1) -> None:
+        self._pending += count
+        if self._pending >= max(self.compact_threshold, len(self.index)):
+            self.compact()
+
+    def _read(self, location: tuple) -> bytes:
+        path, offset, length, crc = location
+        with self._lock:
+            reader = self._readers.get(path)
+            if reader is None:
+                metrics.count("storage.reader.miss")
+                reader = self._readers[path] = open(path, 'rb')
+            else:
+                metrics.count("storage.reader.hit")
+            reader.seek(offset)
+            payload = reader.read(length)
+        # Eski kayıtlarda crc yok
+        if crc is not None and zlib.crc32(payload) != crc:
+            raise StorageError(f"Kayıt bozuk: {os.path.basename(path)}@{offset}")
+        return payload
+
+    def _replay(self, path: str) -> int:
+        """Index journal records, seeking over entry bodies; drops a torn trailing record."""
+        count = 0
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            while True:
+                start = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    record = json.loads(line.decode('utf-8'))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    record = None
+                if record is None or not line.endswith(b"\n"):
+                    break
+                if record["op"] == "put":
+                    offset = f.tell()
+                    if offset + record["len"] + 1 > size:
+                        break
+                    f.seek(record["len"] + 1, os.SEEK_CUR)
+                    self.index[record["title"]] = (path, offset, record["len"], record.get("crc"))
+                elif record["op"] == "del":
+                    self.index.pop(record["title"], None)
+                elif record["op"] == "batch":
+                    # Yarım kalan toplu yazma tümüyle atılır
+                    if f.tell() + record["len"] > size:
+                        break
+                    continue
+                count += 1
+
+        if start < size:
+            with open(path, 'r+b') as f:
+                f.truncate(start)
+        return count
+
+    def _read_snapshot_index(self, path: str) -> None:
+        with open(path, 'rb') as f:
+            f.seek(-self.FOOTER.size, os.SEEK_END)
+            tail = f.read(self.FOOTER.size)
+            if tail[-self.OLD_FOOTER.size:].startswith(self.OLD_FOOTER_MAGIC):
+                _, _, index_offset = self.OLD_FOOTER.unpack(tail[-self.OLD_FOOTER.size:])
+                index_crc = None
+            else:
+                magic, _, index_offset, index_crc = self.FOOTER.unpack(tail)
+                if magic != self.FOOTER_MAGIC:
+                    raise StorageError(f"Snapshot bozuk: {path}")
+            f.seek(index_offset)
+            line = f.readline()
+        if index_crc is not None and zlib.crc32(line) != index_crc:
+            raise StorageError(f"Snapshot indeksi bozuk: {path}")
+        saved = json.loads(line.decode('utf-8'))
+        for title, location in saved.items():
+            offset, length = location[:2]
+            crc = location[2] if len(location) > 2 else None
+            self.index[title] = (path, offset, length, crc)
+
+    def _start_generation(self) -> int:
+        """Switch appends to a fresh journal; everything before it goes into the next snapshot."""
+        self.generation += 1
+        self._journal.close()
+        self.journal_path = self._path(self.generation, ".log")
+        self._journal = open(self.journal_path, 'ab')
+        fsync_dir(os.path.dirname(self.journal_path))
+        self._pending = 0
+        return self.generation
+
+    def _compact(self, generation: int, expected: dict) -> None:
+        rows = ((title, self._read(expected[title])) for title in sorted(expected))
+        try:
+            with metrics.span("storage.compact"):
+                path, new_index = self._write_snapshot(generation, rows)
+        except (IOError, ValueError) as e:
+            print(f"Snapshot yazılamadı: {str(e)}")
+            return
+        with self._lock:
+            self._install_snapshot(path, new_index, expected)
+
+    def _write_snapshot(self, generation: int, rows) -> tuple:
+        path = self._path(generation, ".dat")
+        tmp_path = path + ".tmp"
+        new_index = {}
+        with open(tmp_path, 'wb') as f:
+            offset = 0
+            for title, payload in rows:
+                f.write(payload + b"\n")
+                new_index[title] = (offset, len(payload), zlib.crc32(payload))
+                offset += len(payload) + 1
+            index_line = json.dumps(new_index, ensure_ascii=False).encode('utf-8') + b"\n"
+            f.write(index_line)
+            f.write(self.FOOTER.pack(self.FOOTER_MAGIC, generation, offset, zlib.crc32(index_line)))
+            f.flush()
+            os.fsync(f.fileno())
+        replace_file(tmp_path, path)
+        return path, new_index
+
+    def _install_snapshot(self, path: str, new_index: dict, expected) -> None:
+        """Point entries at the new snapshot and drop the files it supersedes (lock held)."""
+        for title, (offset, length, crc) in new_index.items():
+            # Sıkıştırma sırasında değişen kayıtlar yeni günlükte kalır
+            if expected is None or self.index.get(title) == expected[title]:
+                self.index[title] = (path, offset, length, crc)
+
+        # Bir önceki snapshot ve ondan sonraki günlükler son sağlam kuşak olarak kalır
+        generation = self._generation_of(path)
+        keep_from = generation
+        if self.snapshot_path is not None and self.snapshot_path != path:
+            keep_from = self._generation_of(self.snapshot_path)
+        old_files = [self._path(gen, ".log") for gen in self._generations(".log") if gen < keep_from]
+        old_files += [self._path(gen, ".dat") for gen in self._generations(".dat") if gen < keep_from]
+        self.snapshot_path = path
+
+        for old_path in old_files:
+            reader = self._readers.pop(old_path, None)
+            if reader is not None:
+                reader.close()
+            if os.path.exists(old_path):
+                os.remove(old_path)
+
+    def _generation_of(self, path: str) -> int:
+        return int(path[len(self.base_path) + 1:path.rindex(".")])
+
+    def _wait_for_compactor(self) -> None:
+        if self._compactor is not None and self._compactor.is_alive():
+            self._compactor.join()
+
+    def _import_legacy(self) -> None:
+        data = read_legacy_vault(self.legacy_path)
+        rows = ((title, json.dumps(entry, ensure_ascii=False).encode('utf-8')) for title, entry in sorted(data.items()))
+        self._write_snapshot(1, rows)
+        # Eski günlükler artık snapshot'ın içinde
+        for path in (self.base_path + ".journal", self.base_path + ".journal.old"):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class SqliteStore(VaultStore):
+    """SQLite storage with an index on title.
+
+    Entries are kept on disk instead of in a dict, and listings are served in
+    pages straight from the title index. One connection in WAL mode is reused
+    for the whole session.
+    """
+
+    def __init__(self, db_path: str, legacy_path: str = None):
+        self.db_path = db_path
+        self.legacy_path = legacy_path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Open the database, creating and migrating it on first use."""
+        is_new = not os.path.exists(self.db_path)
+        try:
+            self._conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (title TEXT NOT NULL, entry TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_title ON entries(title)")
+        except sqlite3.Error as e:
+            raise StorageError(f"Veritabanı açılamadı: {str(e)}") from e
+
+        if is_new and self.legacy_path and os.path.exists(self.legacy_path):
+            self.migrate_from_json(self.legacy_path)
+
+    def migrate_from_json(self, json_path: str) -> None:
+        """Import a vault_data.json (and its journal) in a single transaction."""
+        self._write_many(read_legacy_vault(json_path).items())
+
+    def get(self, title: str):
+        row = self._query("SELECT entry FROM entries WHERE title = ?", (title,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def titles(self, offset: int = 0, limit: int = None) -> list:
+        cursor = self._query(
+            "SELECT title FROM entries ORDER BY title LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset)
+        )
+        return [row[0] for row in cursor]
+
+    def rank(self, title: str) -> int:
+        return self._query("SELECT COUNT(*) FROM entries WHERE title < ?", (title,)).fetchone()[0]
+
+    def items(self):
+        # Tek seferde belleğe almak yerine sayfa sayfa okunur
+        last = None
+        while True:
+            if last is None:
+                rows = self._query("SELECT title, entry FROM entries ORDER BY title LIMIT 500").fetchall()
+            else:
+                rows = self._query(
+                    "SELECT title, entry FROM entries WHERE title > ? ORDER BY title LIMIT 500", (last,)
+                ).fetchall()
+            if not rows:
+                return
+            for title, entry in rows:
+                yield title, json.loads(entry)
+            last = rows[-1][0]
+
+    def __len__(self) -> int:
+        return self._query("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def __contains__(self, title: str) -> bool:
+        return self._query("SELECT 1 FROM entries WHERE title = ?", (title,)).fetchone() is not None
+
+    def put(self, title: str, entry: dict) -> None:
+        self._query(
+            "INSERT INTO entries (title, entry) VALUES (?, ?) "
+            "ON CONFLICT(title) DO UPDATE SET entry = excluded.entry",
+            (title, json.dumps(entry, ensure_ascii=False))
+        )
+
+    def delete(self, title: str) -> None:
+        self._query("DELETE FROM entries WHERE title = ?", (title,))
+
+    def put_many(self, items) -> None:
+        self._write_many(items)
+
+    def replace(self, data: dict) -> None:
+        self._write_many(data.items(), clear=True)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def files(self) -> list:
+        return [self.db_path, self.db_path + "-wal"]
+
+    def _query(self, sql: str, params: tuple = ()):
+        try:
+            with self._lock:
+                return self._conn.execute(sql, params)
+        except sqlite3.Error as e:
+            raise StorageError(str(e)) from e
+
+    def _write_many(self, items, clear: bool = False) -> None:
+        rows = ((title, json.dumps(entry, ensure_ascii=False)) for title, entry in items)
+        try:
+            with self._lock, metrics.span("storage.write"):
+                self._conn.execute("BEGIN")
+                try:
+                    if clear:
+                        self._conn.execute("DELETE FROM entries")
+                    self._conn.executemany(
+                        "INSERT INTO entries (title, entry) VALUES (?, ?) "
+                        "ON CONFLICT(title) DO UPDATE SET entry = excluded.entry",
+                        rows
+                    )
+                except sqlite3.Error:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            raise StorageError(str(e)) from e
+
+
+def open_store(backend: str, data_file: str) -> VaultStore:
+    """Create the storage backend named by backend ('journal' or 'sqlite')."""
+    if backend == "sqlite":
+        db_path = os.path.splitext(data_file)[0] + ".db"
+        return SqliteStore(db_path, legacy_path=data_file)
+    if backend == "journal":
+        return JournalStore(data_file)
+    raise ValueError(f"Bilinmeyen depolama türü: {backend}")
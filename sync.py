@@ -0,0 +1,453 @@
+import base64
+import json
+import os
+import sqlite3
+import threading
+import uuid
+import zlib
+from urllib.parse import urlsplit
+
+import metrics
+from crypto import VaultCrypto
+
+
+class SyncError(IOError):
+    """Raised when the sync server cannot be reached or refuses a request."""
+
+
+class SyncLog:
+    """Local sync state: which titles changed since the last sync, and what the server last had.
+
+    Kept in a small SQLite file next to the vault. Nothing is recorded until
+    a server is configured, so vaults that never sync pay nothing.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.enabled = False
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        self._conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS state (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS heads (title TEXT PRIMARY KEY, seq INTEGER NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pending (title TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)"
+        )
+        if "version" not in [row[1] for row in self._conn.execute("PRAGMA table_info(pending)")]:
+            self._conn.execute("ALTER TABLE pending ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        self.enabled = self.get("server") is not None
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def get(self, name: str, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM state WHERE name = ?", (name,)).fetchone()
+        return default if row is None else row[0]
+
+    def set(self, name: str, value) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO state VALUES (?, ?)", (name, str(value)))
+        if name == "server":
+            self.enabled = True
+
+    def mark(self, titles) -> None:
+        """Remember that titles changed locally (no-op until a server is configured).
+
+        A title marked again while already pending gets a new version, see synced().
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO pending VALUES (?, 0) ON CONFLICT(title) DO UPDATE SET version = version + 1",
+                ((title,) for title in titles)
+            )
+
+    def pending(self, limit: int = None) -> list:
+        """Return titles changed since they were last synced."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT title FROM pending ORDER BY title LIMIT ?", (-1 if limit is None else limit,)
+            )]
+
+    def versions(self, titles) -> dict:
+        """Return the pending version of each of titles that is pending."""
+        with self._lock:
+            rows = [
+                self._conn.execute("SELECT title, version FROM pending WHERE title = ?", (title,)).fetchone()
+                for title in titles
+            ]
+        return dict(row for row in rows if row is not None)
+
+    def is_pending(self, title: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM pending WHERE title = ?", (title,)).fetchone() is not None
+
+    def head(self, title: str) -> int:
+        """Return the server sequence number of the last synced version of title (0 if none)."""
+        with self._lock:
+            row = self._conn.execute("SELECT seq FROM heads WHERE title = ?", (title,)).fetchone()
+        return row[0] if row else 0
+
+    def synced(self, heads: dict, cursor: int = None, versions: dict = None) -> None:
+        """Record titles as synced at the given sequence numbers, and the pull position, in one transaction.
+
+        With versions (from versions(), read before the entries were), a
+        title stays pending if it was changed again since: that change has
+        not been sent yet.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT OR REPLACE INTO heads VALUES (?, ?)", heads.items())
+            if versions is None:
+                self._conn.executemany("DELETE FROM pending WHERE title = ?", ((title,) for title in heads))
+            else:
+                self._conn.executemany(
+                    "DELETE FROM pending WHERE title = ? AND version = ?",
+                    ((title, versions.get(title)) for title in heads)
+                )
+            if cursor is not None:
+                self._conn.execute("INSERT OR REPLACE INTO state VALUES ('cursor', ?)", (str(cursor),))
+            self._conn.execute("COMMIT")
+
+    def forget(self) -> None:
+        """Drop the server configuration and all sync state."""
+        with self._lock:
+            for table in ("state", "heads", "pending"):
+                self._conn.execute(f"DELETE FROM {table}")
+        self.enabled = False
+
+
+class SyncClient:
+    """Exchanges entry changes and attachments with a SyncServer.
+
+    A sync pulls every change made elsewhere since the last one, then
+    pushes the titles changed here (SyncLog.pending), so only deltas cross
+    the wire. Requests are batched (PULL_LIMIT changes or PUSH_BATCH titles
+    per round trip) over one kept-alive connection, and attachments are
+    only uploaded when the server does not have them yet.
+
+    Entries and attachments are encrypted with a key derived from the sync
+    passphrase before they leave the vault; titles are sent as MACs. When a
+    title changed on both sides the remote version wins and the local one
+    is kept as a copy "<title> (çakışma)", which is pushed in turn.
+    """
+
+    PULL_LIMIT = 500
+    PUSH_BATCH = 200
+    # Push sırasında başka bir istemci araya girerse çekip yeniden denenir
+    MAX_ROUNDS = 5
+    TIMEOUT = 30
+    VERIFIER = b'digital-vault-sync'
+
+    def __init__(self, core):
+        self.core = core
+        self.log = core.sync_log
+        self.crypto = None
+        self._conn = None
+        self._server = None
+        self.stats = None
+
+    def configure(self, server: str, passphrase: str) -> None:
+        """Connect this vault to a server; every vault syncing together must use the same passphrase."""
+        self.close()
+        self._server = server
+        info = self._call("GET", "/info")
+        crypto = VaultCrypto.from_passphrase(passphrase, base64.b64decode(info["salt"]))
+        verifier = base64.b64encode(crypto.encrypt_bytes(self.VERIFIER, b'verifier')).decode('ascii')
+        stored = self._batch([{"op": "init", "verifier": verifier}])[0]["verifier"]
+        try:
+            crypto.decrypt_bytes(base64.b64decode(stored), b'verifier')
+        except ValueError:
+            raise SyncError("Senkronizasyon parolası hatalı")
+
+        if self.log.enabled and self.log.get("server") != server:
+            # Başka bir sunucunun sıra numaraları burada geçersiz
+            self.log.forget()
+        first = not self.log.enabled
+        self.log.set("server", server)
+        self.log.set("key", base64.b64encode(self.core.crypto.wrap_key(crypto)).decode('ascii'))
+        if first:
+            self.log.set("client", uuid.uuid4().hex)
+            self.log.set("cursor", 0)
+            # İlk senkronizasyonda kasadaki her kayıt gönderilecek
+            self.log.mark(self.core.store.titles())
+        self.crypto = crypto
+
+    def run(self) -> dict:
+        """Pull remote changes, then push local ones; returns counts and bytes transferred."""
+        if not self.log.enabled:
+            raise SyncError("Senkronizasyon sunucusu ayarlanmamış")
+        if self.crypto is None:
+            self._server = self.log.get("server")
+            self.crypto = self.core.crypto.unwrap_key(base64.b64decode(self.log.get("key")))
+
+        self.stats = {"received": 0, "sent": 0, "conflicts": 0, "bytes_sent": 0, "bytes_received": 0}
+        with metrics.span("sync.run"):
+            for _ in range(self.MAX_ROUNDS):
+                self._pull()
+                if self._push():
+                    break
+            else:
+                raise SyncError("Sunucudaki değişiklikler sürekli çakışıyor, daha sonra tekrar deneyin")
+        metrics.count("sync.bytes_sent", self.stats["bytes_sent"])
+        metrics.count("sync.bytes_received", self.stats["bytes_received"])
+        return self.stats
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _pull(self) -> None:
+        client = self.log.get("client")
+        # Sunucu bu istemcinin kendi değişikliklerini geri göndermez
+        while True:
+            cursor = int(self.log.get("cursor", 0))
+            page = self._batch([{"op": "pull", "since": cursor, "origin": client, "limit": self.PULL_LIMIT}])[0]
+            if not page["changes"]:
+                if page["cursor"] != cursor:
+                    self.log.synced({}, page["cursor"])
+                return
+
+            heads = {}
+            remote = {}
+            try:
+                for change in page["changes"]:
+                    title, entry = self._open(change)
+                    heads[title] = change["seq"]
+                    # Aynı kaydın sayfadaki eski değişikliği uygulanmayacak, referansı bırakılır
+                    self._release(remote.pop(title, None))
+                    remote[title] = self._fetch_attachment(entry) if entry is not None else None
+            except Exception:
+                for entry in remote.values():
+                    self._release(entry)
+                raise
+
+            # Yerel değişiklik denetimi ile uygulama arasına bir kaydetme giremez
+            with self.core._write_lock:
+                copies = []
+                for title, entry in remote.items():
+                    if self.log.is_pending(title):
+                        local = self.core.get(title)
+                        if not self._same(local, entry) and local is not None:
+                            copies.append((title, local))
+                self._keep_conflicts(copies, remote)
+                self._apply(remote)
+                self.log.synced(heads, page["cursor"])
+            self.stats["received"] += len(remote)
+            if not page["more"]:
+                return
+
+    def _push(self) -> bool:
+        """Send pending titles; returns False if the server refused some because of newer changes."""
+        clean = True
+        skip = set()
+        while True:
+            titles = [title for title in self.log.pending(self.PUSH_BATCH + len(skip)) if title not in skip]
+            if not titles:
+                return clean
+
+            # Sürümler kayıtlardan önce okunur: arada kaydedilen değişiklik bekler durumda kalır
+            versions = self.log.versions(titles)
+            changes = []
+            blobs = {}
+            heads = {}
+            for title in titles:
+                entry = self.core.get(title)
+                base = self.log.head(title)
+                if entry is None and base == 0:
+                    # Sunucuya hiç gitmemiş bir kayıt silinmiş: gönderilecek bir şey yok
+                    heads[title] = 0
+                    continue
+                if entry is not None:
+                    entry = self._outgoing(entry)
+                blob = None
+                if entry is not None and entry.get('file_hash'):
+                    blob = self._blob_id(entry['file_hash'])
+                    blobs[blob] = entry['file_hash']
+                changes.append((title, {
+                    "key": self._key(title),
+                    "base": base,
+                    "blob": blob,
+                    "data": self._seal(title, entry)
+                }))
+
+            if blobs:
+                for blob in self._batch([{"op": "missing", "blobs": list(blobs)}])[0]["missing"]:
+                    self._upload(blob, blobs[blob])
+            if changes:
+                push = {"op": "push", "origin": self.log.get("client"), "changes": [change for _, change in changes]}
+                results = self._batch([push])[0]["results"]
+                for (title, _), result in zip(changes, results):
+                    if "seq" in result:
+                        heads[title] = result["seq"]
+                        self.stats["sent"] += 1
+                    elif "conflict" in result:
+                        clean = False
+                        skip.add(title)
+                    else:
+                        raise SyncError(result["error"])
+            self.log.synced(heads, versions=versions)
+
+    def _keep_conflicts(self, copies: list, remote: dict) -> None:
+        """Save local versions that remote changes would overwrite under new titles."""
+        rows = []
+        for title, local in copies:
+            copy = f"{title} (çakışma)"
+            if copy in remote or copy in self.core:
+                copy = self.core._free_title(copy, remote)
+            if local.get('file_hash'):
+                self.core.blob_store.retain(local['file_hash'])
+            rows.append((copy, local))
+            self.stats["conflicts"] += 1
+        if rows:
+            self.core.put_many(rows, touch=False)
+
+    def _apply(self, remote: dict) -> None:
+        puts = [(title, entry) for title, entry in remote.items() if entry is not None]
+        if puts:
+            self.core.put_many(puts, touch=False, track=False)
+        for title, entry in remote.items():
+            if entry is None:
+                self.core.delete(title, track=False)
+
+    def _release(self, entry) -> None:
+        if entry is not None and entry.get('file_hash'):
+            self.core.blob_store.release(entry['file_hash'])
+
+    def _fetch_attachment(self, entry: dict) -> dict:
+        """Make sure entry's attachment is stored locally and take a reference for it."""
+        digest = entry.get('file_hash')
+        if not digest:
+            return entry
+        if self.core.blob_store.exists(digest):
+            self.core.blob_store.retain(digest)
+            return entry
+
+        tmp_path = os.path.join(self.core.blob_store.tmp_dir, uuid.uuid4().hex)
+        try:
+            response = self._request("GET", f"/blobs/{self._blob_id(digest)}")
+            with open(tmp_path, 'wb') as f:
+                while True:
+                    chunk = response.read(VaultCrypto.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    self.stats["bytes_received"] += len(chunk)
+            if response.status != 200:
+                raise SyncError(f"Dosya indirilemedi: {entry.get('file_name')}")
+            with open(tmp_path, 'rb') as f:
+                stored = self.core.blob_store.add_chunks(self.crypto.decrypt_chunks(f))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        if stored != digest:
+            self.core.blob_store.release(stored)
+            raise SyncError(f"İndirilen dosya bozuk: {entry.get('file_name')}")
+        return entry
+
+    def _upload(self, blob: str, digest: str) -> None:
+        path = self.core.blob_store.path(digest)
+        tmp_path = os.path.join(self.core.blob_store.tmp_dir, uuid.uuid4().hex)
+        try:
+            with open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                if self.core.crypto.is_encrypted_file(path):
+                    chunks = self.core.crypto.decrypt_chunks(src)
+                else:
+                    chunks = iter(lambda: src.read(VaultCrypto.CHUNK_SIZE), b'')
+                writer = self.crypto.writer(dst)
+                for chunk in chunks:
+                    writer.write(chunk)
+                writer.finish()
+            size = os.path.getsize(tmp_path)
+            with open(tmp_path, 'rb') as body:
+                response = self._request("PUT", f"/blobs/{blob}", body, {"Content-Length": str(size)})
+                reply = response.read()
+            self.stats["bytes_sent"] += size
+            if response.status != 200:
+                raise SyncError(json.loads(reply.decode('utf-8')).get("error", "Dosya yüklenemedi"))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def _outgoing(entry: dict) -> dict:
+        # Eski tip (özetsiz) ekler sunucuya gönderilemez; kayıt eksiz gider
+        if entry.get('file_name') and not entry.get('file_hash'):
+            entry = dict(entry, file_name=None)
+        return entry
+
+    @staticmethod
+    def _same(local, remote) -> bool:
+        def strip(entry):
+            return None if entry is None else {
+                key: value for key, value in entry.items() if key not in ('created', 'modified')
+            }
+        return strip(local) == strip(remote)
+
+    def _key(self, title: str) -> str:
+        return self.crypto.mac(title.encode('utf-8'))
+
+    def _blob_id(self, digest: str) -> str:
+        return self.crypto.mac(f"blob:{digest}".encode('ascii'))
+
+    def _seal(self, title: str, entry) -> str:
+        raw = zlib.compress(json.dumps({"title": title, "entry": entry}, ensure_ascii=False).encode('utf-8'))
+        return base64.b64encode(self.crypto.encrypt_bytes(raw, self._key(title).encode('ascii'))).decode('ascii')
+
+    def _open(self, change: dict) -> tuple:
+        try:
+            raw = self.crypto.decrypt_bytes(base64.b64decode(change["data"]), change["key"].encode('ascii'))
+        except ValueError:
+            raise SyncError("Sunucudaki bir kayıt çözülemedi (farklı parola?)")
+        record = json.loads(zlib.decompress(raw).decode('utf-8'))
+        return record["title"], record["entry"]
+
+    def _batch(self, requests: list) -> list:
+        responses = self._call("POST", "/batch", {"requests": requests})["responses"]
+        for response in responses:
+            if "error" in response:
+                raise SyncError(response["error"])
+        return responses
+
+    def _call(self, method: str, path: str, data: dict = None) -> dict:
+        body = None if data is None else json.dumps(data, ensure_ascii=False).encode('utf-8')
+        headers = {} if body is None else {"Content-Type": "application/json", "Content-Length": str(len(body))}
+        response = self._request(method, path, body, headers)
+        reply = response.read()
+        if self.stats is not None:
+            self.stats["bytes_sent"] += len(body or b'')
+            self.stats["bytes_received"] += len(reply)
+        try:
+            result = json.loads(reply.decode('utf-8'))
+        except ValueError:
+            raise SyncError(f"Sunucu yanıtı anlaşılamadı ({response.status})")
+        if response.status != 200:
+            raise SyncError(result.get("error", f"Sunucu hatası ({response.status})"))
+        return result
+
+    def _request(self, method: str, path: str, body=None, headers: dict = None):
+        """Send a request on the kept-alive connection, reconnecting once if the server dropped it."""
+        # http.client (e-posta ayrıştırıcısıyla birlikte) ilk senkronizasyonda yüklenir, açılışı bekletmez
+        import http.client
+        for attempt in range(2):
+            if self._conn is None:
+                url = urlsplit(self._server)
+                connection = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+                self._conn = connection(url.hostname, url.port, timeout=self.TIMEOUT)
+            try:
+                self._conn.request(method, path, body=body, headers=headers or {})
+                return self._conn.getresponse()
+            except (http.client.HTTPException, OSError) as e:
+                self.close()
+                if attempt:
+                    raise SyncError(f"Sunucuya bağlanılamadı: {str(e)}")
+                if hasattr(body, 'seek'):
+                    body.seek(0)
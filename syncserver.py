@@ -0,0 +1,290 @@
+import argparse
+import base64
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from durable import replace_file
+
+BLOB_ID = re.compile(r'^[0-9a-f]{64}$')
+
+
+class SyncServer:
+    """A change log and attachment store that several vaults sync through.
+
+    The server never sees plaintext: clients send entries sealed with a key
+    derived from a shared sync passphrase, under an opaque key (a MAC of
+    the title), and attachments under a MAC of their digest. Every accepted
+    change gets the next sequence number; only the newest change per key is
+    kept, so the log stays as large as the vault and a client that is
+    behind pulls each changed entry once.
+
+    A push names the sequence number the client last saw for that key
+    (base); if another client changed the key since, the push is refused as
+    a conflict and the client has to pull first.
+    """
+
+    PULL_LIMIT = 500
+    COPY_CHUNK = 1024 * 1024
+
+    def __init__(self, root: str):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        os.makedirs(os.path.join(self.blob_dir, "tmp"), exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(self.root, "sync.db"), isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS changes ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL UNIQUE, origin TEXT NOT NULL, "
+            "blob TEXT, data BLOB NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            "INSERT OR IGNORE INTO meta VALUES ('salt', ?)", (base64.b64encode(os.urandom(16)).decode('ascii'),)
+        )
+        self.collect_garbage()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def info(self) -> dict:
+        """Return the key derivation salt, the passphrase verifier (if set) and the latest sequence number."""
+        with self._lock:
+            meta = dict(self._conn.execute("SELECT name, value FROM meta"))
+            seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+        return {"salt": meta["salt"], "verifier": meta.get("verifier"), "seq": seq}
+
+    def batch(self, requests: list) -> list:
+        """Answer several requests in one round trip."""
+        handlers = {"init": self.init, "pull": self.pull, "push": self.push, "missing": self.missing}
+        responses = []
+        for request in requests:
+            handler = handlers.get(request.get("op"))
+            if handler is None:
+                responses.append({"error": f"Bilinmeyen işlem: {request.get('op')}"})
+                continue
+            responses.append(handler(request))
+        return responses
+
+    def init(self, request: dict) -> dict:
+        """Store the passphrase verifier unless one exists; returns the stored one."""
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('verifier', ?)", (request["verifier"],))
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'verifier'").fetchone()
+        return {"verifier": row[0]}
+
+    def pull(self, request: dict) -> dict:
+        """Return changes after sequence number since, oldest first, except those made by origin.
+
+        "cursor" is where the next pull should continue from.
+        """
+        limit = min(int(request.get("limit") or self.PULL_LIMIT), self.PULL_LIMIT)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, key, origin, data FROM changes WHERE seq > ? AND origin != ? ORDER BY seq LIMIT ?",
+                (int(request["since"]), request.get("origin", ""), limit + 1)
+            ).fetchall()
+            head = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+        more = len(rows) > limit
+        changes = [
+            {"seq": seq, "key": key, "origin": origin, "data": base64.b64encode(data).decode('ascii')}
+            for seq, key, origin, data in rows[:limit]
+        ]
+        # İstemcinin kendi değişiklikleri gönderilmez, ama imleç onların da ötesine geçer
+        cursor = changes[-1]["seq"] if more else max(head, int(request["since"]))
+        return {"changes": changes, "more": more, "cursor": cursor}
+
+    def push(self, request: dict) -> dict:
+        """Append changes whose base is still the newest for their key, in one transaction.
+
+        Each result is {"seq": n} when accepted, {"conflict": n} when key
+        has moved on to n, or {"error": ...} when its attachment is missing.
+        """
+        results = []
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for change in request["changes"]:
+                    row = self._conn.execute("SELECT seq FROM changes WHERE key = ?", (change["key"],)).fetchone()
+                    head = row[0] if row else 0
+                    if head != change["base"]:
+                        results.append({"conflict": head})
+                        continue
+                    blob = change.get("blob")
+                    if blob is not None and not os.path.exists(self.blob_path(blob)):
+                        results.append({"error": f"Dosya yüklenmemiş: {blob}"})
+                        continue
+                    # Anahtar başına sadece en yeni değişiklik tutulur
+                    self._conn.execute("DELETE FROM changes WHERE key = ?", (change["key"],))
+                    cursor = self._conn.execute(
+                        "INSERT INTO changes (key, origin, blob, data) VALUES (?, ?, ?, ?)",
+                        (change["key"], request["origin"], blob, base64.b64decode(change["data"]))
+                    )
+                    results.append({"seq": cursor.lastrowid})
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return {"results": results}
+
+    def missing(self, request: dict) -> dict:
+        """Return which of the given attachment ids the server does not have."""
+        return {"missing": [blob for blob in request["blobs"] if not os.path.exists(self.blob_path(blob))]}
+
+    def blob_path(self, blob: str) -> str:
+        if not BLOB_ID.match(blob):
+            raise ValueError(f"Geçersiz dosya kimliği: {blob}")
+        return os.path.join(self.blob_dir, blob[:2], blob)
+
+    def receive_blob(self, blob: str, src, length: int) -> None:
+        """Store length bytes read from src as an attachment."""
+        path = self.blob_path(blob)
+        tmp_path = os.path.join(self.blob_dir, "tmp", uuid.uuid4().hex)
+        try:
+            with open(tmp_path, 'wb') as dst:
+                remaining = length
+                while remaining > 0:
+                    chunk = src.read(min(self.COPY_CHUNK, remaining))
+                    if not chunk:
+                        raise IOError("Dosya eksik geldi")
+                    dst.write(chunk)
+                    remaining -= len(chunk)
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            replace_file(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def collect_garbage(self) -> int:
+        """Remove attachments no change refers to (and unfinished uploads); returns how many."""
+        with self._lock:
+            used = {row[0] for row in self._conn.execute("SELECT blob FROM changes WHERE blob IS NOT NULL")}
+        removed = 0
+        for dirpath, _, filenames in os.walk(self.blob_dir):
+            for name in filenames:
+                if name not in used:
+                    os.remove(os.path.join(dirpath, name))
+                    removed += 1
+        return removed
+
+
+class SyncRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end of SyncServer; keeps connections open between requests."""
+
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def sync(self) -> SyncServer:
+        return self.server.sync
+
+    def do_GET(self) -> None:
+        try:
+            if self.path == "/info":
+                self._send_json(self.sync.info())
+            elif self.path.startswith("/blobs/"):
+                self._send_blob(self.sync.blob_path(self.path[len("/blobs/"):]))
+            else:
+                self._send_json({"error": "Bulunamadı"}, 404)
+        except (IOError, ValueError) as e:
+            self._send_json({"error": str(e)}, 400)
+
+    def do_POST(self) -> None:
+        try:
+            if self.path != "/batch":
+                self._send_json({"error": "Bulunamadı"}, 404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])).decode('utf-8'))
+            self._send_json({"responses": self.sync.batch(body["requests"])})
+        except (IOError, ValueError, KeyError) as e:
+            self._send_json({"error": str(e)}, 400)
+
+    def do_PUT(self) -> None:
+        try:
+            if not self.path.startswith("/blobs/"):
+                self._send_json({"error": "Bulunamadı"}, 404)
+                return
+            self.sync.receive_blob(self.path[len("/blobs/"):], self.rfile, int(self.headers["Content-Length"]))
+            self._send_json({})
+        except (IOError, ValueError, KeyError) as e:
+            # Gövde okunmadan kalmış olabilir; bağlantı yeniden kullanılamaz
+            self.close_connection = True
+            self._send_json({"error": str(e)}, 400)
+
+    def log_message(self, format, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, data: dict, status: int = 200) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_blob(self, path: str) -> None:
+        if not os.path.exists(path):
+            self._send_json({"error": "Dosya bulunamadı"}, 404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(os.path.getsize(path)))
+        self.end_headers()
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(SyncServer.COPY_CHUNK)
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+
+
+def serve(root: str, host: str = "127.0.0.1", port: int = 8765, verbose: bool = False) -> ThreadingHTTPServer:
+    """Open the server state under root and return an HTTP server for it (port 0 picks a free one).
+
+    Call serve_forever() on the result, or run it on a thread in tests.
+    """
+    os.makedirs(root, exist_ok=True)
+    sync = SyncServer(root)
+    sync.open()
+    httpd = ThreadingHTTPServer((host, port), SyncRequestHandler)
+    httpd.daemon_threads = True
+    httpd.sync = sync
+    httpd.verbose = verbose
+    return httpd
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="syncserver", description="Kasalar arası senkronizasyon sunucusu.")
+    parser.add_argument("--root", default="sync_server", help="sunucu verilerinin dizini")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--verbose", action="store_true", help="istekleri yaz")
+    args = parser.parse_args(argv)
+
+    httpd = serve(args.root, args.host, args.port, args.verbose)
+    print(f"Senkronizasyon sunucusu: http://{args.host}:{httpd.server_address[1]}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        httpd.sync.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
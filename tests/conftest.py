@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import VaultCore  # noqa: E402
+from crypto import VaultCrypto  # noqa: E402
+
+PIN = "1234"
+
+
+class SecretBackup:
+    """Stands in for SecurityManager, whose secret-location backup writes outside the test directory."""
+
+    def __init__(self):
+        self.calls = []
+
+    def backup_to_secret_location(self, *args, **kwargs):
+        self.calls.append(args)
+        return True
+
+
+@pytest.fixture
+def crypto():
+    return VaultCrypto.from_passphrase("test", b'0' * 16)
+
+
+@pytest.fixture
+def open_core(tmp_path):
+    """Return a function that opens (and at teardown closes) an unlocked vault under tmp_path."""
+    opened = []
+
+    def _open(backend: str = 'journal', name: str = "vault") -> VaultCore:
+        core = VaultCore(str(tmp_path / name), backend=backend)
+        core.open()
+        core.load_pin()
+        assert core.unlock(PIN)
+        opened.append(core)
+        return core
+
+    yield _open
+    for core in opened:
+        core.close()
+
+
+@pytest.fixture
+def core(open_core):
+    return open_core()
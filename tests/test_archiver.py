@@ -0,0 +1,36 @@
+import os
+
+import py7zr
+
+from archiver import ParallelArchiver, shard_files
+
+
+def make_files(tmp_path, sizes):
+    files = []
+    for i, size in enumerate(sizes):
+        path = tmp_path / f"dosya{i}.bin"
+        path.write_bytes(os.urandom(size))
+        files.append((str(path), f"kasa/dosya{i}.bin"))
+    return files
+
+
+def test_shards_are_balanced_by_size(tmp_path):
+    files = make_files(tmp_path, [900, 500, 400, 100])
+    shards = shard_files(files, 2)
+    totals = sorted(sum(os.path.getsize(path) for path, _ in shard) for shard in shards)
+    assert totals == [900, 1000]
+    assert shard_files(files[:1], 4) == [files[:1]]
+
+
+def test_volumes_hold_every_file_encrypted(tmp_path):
+    files = make_files(tmp_path, [3000, 2000, 1000])
+    stats = ParallelArchiver("parola", level=1, workers=2).archive(files, str(tmp_path / "yedek"), "test")
+    assert len(stats["volumes"]) == 2
+    assert stats["bytes"] == 6000
+
+    extracted = tmp_path / "açılan"
+    for volume in stats["volumes"]:
+        with py7zr.SevenZipFile(volume, 'r', password="parola") as archive:
+            archive.extractall(str(extracted))
+    for path, arcname in files:
+        assert (extracted / arcname).read_bytes() == open(path, 'rb').read()
@@ -0,0 +1,41 @@
+import json
+
+import bench
+
+
+def test_summarize_reports_percentiles_and_throughput():
+    result = bench.summarize([0.004, 0.001, 0.002, 0.003], work=8, unit="mb")
+    assert result["samples"] == 4
+    assert result["mean_ms"] == 2.5
+    assert result["max_ms"] == 4.0
+    assert result["p50_ms"] <= result["p90_ms"] <= result["p99_ms"] <= result["max_ms"]
+    assert abs(result["mb_per_s"] - 800) < 1e-6
+    assert bench.summarize([])["ops_per_s"] == 0.0
+
+
+def test_compare_flags_only_slower_results():
+    baseline = {"results": [
+        {"op": "get", "entries": 1000, "p50_ms": 1.0, "p99_ms": 2.0},
+        {"op": "save", "entries": 1000, "p50_ms": 1.0, "p99_ms": 2.0},
+        {"op": "list", "entries": 1000, "error": "çöktü"},
+    ]}
+    current = {"results": [
+        {"op": "get", "entries": 1000, "p50_ms": 1.1, "p99_ms": 3.0},
+        {"op": "save", "entries": 1000, "p50_ms": 0.5, "p99_ms": 2.2},
+        {"op": "list", "entries": 1000, "p50_ms": 9.0, "p99_ms": 9.0},
+        {"op": "get", "entries": 10000, "p50_ms": 9.0, "p99_ms": 9.0},
+    ]}
+    assert bench.compare(current, baseline, 0.2) == [("get", 1000, "p99_ms", 2.0, 3.0)]
+
+
+def test_main_writes_report_and_fails_on_regression(tmp_path, monkeypatch):
+    monkeypatch.setattr(bench, "run_child", lambda spec: {"p50_ms": 5.0, "p99_ms": 5.0})
+    out = tmp_path / "sonuç.json"
+    args = ["--sizes", "10", "--ops", "get", "--work-dir", str(tmp_path / "iş"), "--out", str(out)]
+    assert bench.main(args) == 0
+    report = json.loads(out.read_text(encoding='utf-8'))
+    assert [(r["op"], r["entries"]) for r in report["results"]] == [("get", 10)]
+
+    baseline = tmp_path / "önceki.json"
+    baseline.write_text(json.dumps({"results": [{"op": "get", "entries": 10, "p50_ms": 1.0, "p99_ms": 5.0}]}))
+    assert bench.main(args + ["--compare", str(baseline)]) == 1
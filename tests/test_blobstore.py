@@ -0,0 +1,46 @@
+import hashlib
+import os
+
+import pytest
+
+from blobstore import BlobStore, IngestCancelled
+
+
+@pytest.fixture
+def blobs(tmp_path, crypto):
+    store = BlobStore(str(tmp_path / "vault_files"))
+    store.crypto = crypto
+    store.open()
+    yield store
+    store.close()
+
+
+def test_identical_files_are_stored_once_and_counted(blobs, tmp_path):
+    first, second = tmp_path / "bir.txt", tmp_path / "iki.txt"
+    first.write_bytes(b"ayni icerik")
+    second.write_bytes(b"ayni icerik")
+
+    digest = blobs.add_file(str(first))
+    assert digest == hashlib.sha256(b"ayni icerik").hexdigest()
+    assert blobs.add_file(str(second)) == digest
+    # Dosya şifreli saklanır, özet düz metnin özetidir
+    assert b"ayni icerik" not in open(blobs.path(digest), 'rb').read()
+
+    blobs.release(digest)
+    assert blobs.exists(digest)
+    blobs.release(digest)
+    assert not blobs.exists(digest)
+
+
+def test_referenced_blob_is_not_an_orphan(blobs):
+    digest = blobs.add_chunks([b"parca 1", b"parca 2"])
+    assert not blobs.remove_orphan(digest)
+    blobs.reset_refs([])
+    assert blobs.remove_orphan(digest)
+    assert not blobs.exists(digest)
+
+
+def test_cancelled_copy_leaves_nothing_behind(blobs):
+    with pytest.raises(IngestCancelled):
+        blobs.add_chunks(iter([b"a", b"b"]), cancelled=lambda: True)
+    assert os.listdir(blobs.tmp_dir) == []
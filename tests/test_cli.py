@@ -0,0 +1,77 @@
+import pytest
+
+import cli
+import metrics
+from conftest import SecretBackup
+from core import VaultCore
+
+
+@pytest.mark.parametrize("backend", ['journal', 'sqlite'])
+def test_metrics_report_reads_gauges_before_close(tmp_path, backend, capsys):
+    args = ["--vault-dir", str(tmp_path), "--backend", backend, "--pin", "1234"]
+    assert cli.main(args + ["put", "a", "içerik"]) == 0
+    try:
+        assert cli.main(args + ["--metrics", "list"]) == 0
+    finally:
+        metrics.enable(False)
+    report = capsys.readouterr().err
+    assert "hata:" not in report
+    assert "entries" in report
+
+
+def test_exit_status_survives_metrics(tmp_path, capsys):
+    args = ["--vault-dir", str(tmp_path), "--backend", "sqlite", "--pin", "1234", "--metrics"]
+    try:
+        assert cli.main(args + ["get", "yok"]) == 1
+    finally:
+        metrics.enable(False)
+
+
+def test_tag_only_put_keeps_attachment(tmp_path, open_core):
+    args = ["--vault-dir", str(tmp_path / "vault"), "--pin", "1234"]
+    attachment = tmp_path / "ek.txt"
+    attachment.write_bytes(b"ek dosya")
+    assert cli.main(args + ["put", "a", "içerik", "--file", str(attachment)]) == 0
+    assert cli.main(args + ["put", "a", "içerik", "--tag", "iş"]) == 0
+
+    core = open_core()
+    entry = core.get("a")
+    assert entry['tags'] == ["iş"]
+    assert entry['file_name'] == "ek.txt"
+    assert core.read_attachment(entry, 100) == b"ek dosya"
+
+
+def test_cli_wipes_after_too_many_wrong_pins(tmp_path, monkeypatch, capsys):
+    secret = SecretBackup()
+    monkeypatch.setattr(VaultCore, "security_manager", property(lambda core: secret))
+    monkeypatch.setattr("pinstore.PinStore.BACKOFF_BASE", 0.0)
+    args = ["--vault-dir", str(tmp_path), "--pin"]
+    assert cli.main(args + ["1234", "put", "a", "gizli"]) == 0
+
+    for _ in range(VaultCore.MAX_ATTEMPTS):
+        assert cli.main(args + ["0000", "list"]) == 1
+    assert "kasa silindi" in capsys.readouterr().err
+    assert len(secret.calls) == 1
+
+    assert cli.main(args + ["1234", "list"]) == 0
+    assert capsys.readouterr().out == ""
+
+
+def test_put_get_search_list_delete(tmp_path, capsys):
+    args = ["--vault-dir", str(tmp_path), "--pin", "1234"]
+    assert cli.main(args + ["put", "banka", "hesap numarası", "--tag", "iş"]) == 0
+    assert cli.main(args + ["put", "adres", "İstanbul"]) == 0
+    capsys.readouterr()
+
+    assert cli.main(args + ["get", "banka"]) == 0
+    assert capsys.readouterr().out == "hesap numarası\n"
+    assert cli.main(args + ["search", "istanbul"]) == 0
+    assert capsys.readouterr().out == "adres\n"
+    assert cli.main(args + ["list"]) == 0
+    assert capsys.readouterr().out == "adres\nbanka\n"
+    assert cli.main(args + ["list", "--tag", "iş"]) == 0
+    assert capsys.readouterr().out == "banka\n"
+
+    assert cli.main(args + ["delete", "banka"]) == 0
+    assert cli.main(args + ["get", "banka"]) == 1
+    assert cli.main(args + ["delete", "banka"]) == 1
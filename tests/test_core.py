@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+import metrics
+from conftest import PIN, SecretBackup
+from core import VaultWipedError
+from metaindex import MetaIndex
+
+
+def test_index_updates_wait_for_index_lock(core):
+    # Senkronizasyon iş parçacığı indeksleri arayüz okurken değiştirmemeli
+    with core._index_lock:
+        worker = threading.Thread(target=core.put_many, args=([("uzak", {'content': "gelen", 'tags': ["a"]})],))
+        worker.start()
+        worker.join(0.3)
+        assert worker.is_alive()
+        assert core.search("gelen") == set()
+        assert core.tags() == {}
+    worker.join()
+    assert core.search("gelen") == {"uzak"}
+    assert core.tags() == {"a": 1}
+
+
+def test_put_and_delete_update_indexes(core):
+    core.put_many([("a", {'content': "elma", 'tags': ["meyve"]}), ("b", {'content': "armut", 'tags': ["meyve"]})])
+    assert core.search("elm") == {"a"}
+    assert sorted(core.list_titles("meyve", 'modified')) == ["a", "b"]
+    core.delete("a")
+    assert core.search("elma") == set()
+    assert core.tags() == {"meyve": 1}
+
+
+def test_meta_index_file_is_encrypted(core):
+    core.put("gizli başlık", {'content': "x", 'tags': ["özel-etiket"]})
+    core.lock()
+    data = open(core.meta_file, 'rb').read()
+    assert "gizli".encode('utf-8') not in data
+    assert "özel-etiket".encode('utf-8') not in data
+
+    metrics.enable()
+    try:
+        metrics.reset()
+        assert core.unlock(PIN)
+        assert metrics.report()["counters"].get("meta_index.hit") == 1
+    finally:
+        metrics.enable(False)
+    assert core.tags() == {"özel-etiket": 1}
+
+
+def test_plaintext_meta_index_is_rebuilt(core):
+    core.put("a", {'content': "x", 'tags': ["t"]})
+    core.lock()
+    MetaIndex().save(core.meta_file, core.store.fingerprint())
+    assert core.unlock(PIN)
+    assert core.tags() == {"t": 1}
+
+
+def test_too_many_wrong_pins_wipe_the_vault(core):
+    core._security_manager = SecretBackup()
+    core.pins.BACKOFF_BASE = 0.0
+    core.put("a", {'content': "gizli"})
+
+    for left in range(core.MAX_ATTEMPTS - 1, 0, -1):
+        assert not core.check_pin("0000")
+        assert core.attempts_left() == left
+    with pytest.raises(VaultWipedError) as raised:
+        core.check_pin("0000")
+    assert raised.value.backed_up
+    assert len(core._security_manager.calls) == 1
+    assert len(core) == 0
+    assert core.attempts_left() == core.MAX_ATTEMPTS
+
+
+def test_backup_diff_and_selective_merge(core, tmp_path):
+    attachment = tmp_path / "ek.txt"
+    attachment.write_bytes(b"ek dosya")
+    core.put("aynı", {'content': "1", 'file_name': None})
+    core.put("değişen", {'content': "eski", 'file_name': None})
+    core.put("silinen", {'content': "3", 'file_hash': core.add_file(str(attachment)), 'file_name': "ek.txt"})
+    snapshot = core.backup()["id"]
+
+    # Aynı içerik yeni nonce ile yeniden şifrelenir ama değişmiş sayılmaz
+    core.put("aynı", {'content': "1", 'file_name': None})
+    core.put("değişen", {'content': "yeni", 'file_name': None})
+    core.put("eklenen", {'content': "4", 'file_name': None})
+    core.delete("silinen")
+    assert core.diff_backup(snapshot) == {"added": ["silinen"], "changed": ["değişen"], "removed": ["eklenen"]}
+
+    assert core.merge_backup(snapshot, ["silinen", "eklenen"]) == 2
+    assert core.titles() == ["aynı", "değişen", "silinen"]
+    assert core.get("değişen")['content'] == "yeni"
+    assert core.read_attachment(core.get("silinen"), 100) == b"ek dosya"
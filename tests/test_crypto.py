@@ -0,0 +1,65 @@
+import pytest
+
+from crypto import VaultCrypto, VaultLockedError
+
+
+def test_wrong_pin_does_not_unlock_and_rewrap_changes_pin(tmp_path):
+    key_file = str(tmp_path / "anahtar.json")
+    crypto = VaultCrypto(key_file)
+    crypto.create("1234")
+    token = crypto.encrypt_text("gizli", "başlık")
+
+    reopened = VaultCrypto(key_file)
+    assert not reopened.unlock("0000")
+    assert not reopened.unlocked
+    assert reopened.unlock("1234")
+    assert reopened.decrypt_text(token, "başlık") == "gizli"
+
+    reopened.rewrap("5678")
+    changed = VaultCrypto(key_file)
+    assert not changed.unlock("1234")
+    assert changed.unlock("5678")
+    assert changed.decrypt_text(token, "başlık") == "gizli"
+
+
+def test_locked_crypto_refuses_to_encrypt(crypto):
+    crypto.lock()
+    with pytest.raises(VaultLockedError):
+        crypto.encrypt_text("gizli")
+
+
+def test_text_is_bound_to_its_title(crypto):
+    token = crypto.encrypt_text("gizli", "banka")
+    with pytest.raises(ValueError):
+        crypto.decrypt_text(token, "başka")
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(VaultCrypto, "CHUNK_SIZE", 1024)
+
+
+@pytest.mark.parametrize("size", [0, 1024, 3000])
+def test_file_round_trip_across_chunks(crypto, tmp_path, small_chunks, size):
+    data = bytes(range(256)) * (size // 256) + b'x' * (size % 256)
+    plain = tmp_path / "düz.bin"
+    plain.write_bytes(data)
+    sealed = str(tmp_path / "şifreli.bin")
+    crypto.encrypt_file(str(plain), sealed)
+
+    assert crypto.is_encrypted_file(sealed)
+    crypto.decrypt_file(sealed, str(tmp_path / "açık.bin"))
+    assert (tmp_path / "açık.bin").read_bytes() == data
+    assert crypto.decrypt_prefix(sealed, 1500) == data[:1500]
+
+
+def test_truncated_file_is_detected(crypto, tmp_path, small_chunks):
+    plain = tmp_path / "düz.bin"
+    plain.write_bytes(b'a' * 3000)
+    sealed = tmp_path / "şifreli.bin"
+    crypto.encrypt_file(str(plain), str(sealed))
+    # Son parçayı atmak, kalan parçaların hiçbirini "son" yapmaz
+    sealed.write_bytes(sealed.read_bytes()[:4 + 7 + 2 * (1024 + 16)])
+
+    with pytest.raises(ValueError):
+        crypto.decrypt_file(str(sealed), str(tmp_path / "açık.bin"))
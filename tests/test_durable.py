@@ -0,0 +1,44 @@
+import pytest
+
+from durable import CorruptFileError, read_file, read_json, write_file, write_json
+
+
+def test_write_and_read_json(tmp_path):
+    path = str(tmp_path / "a.json")
+    write_json(path, {"değer": 1})
+    assert read_json(path) == {"değer": 1}
+
+
+def test_corrupt_file_falls_back_to_previous(tmp_path):
+    path = str(tmp_path / "a.json")
+    write_json(path, {"n": 1}, keep_previous=True)
+    write_json(path, {"n": 2}, keep_previous=True)
+    with open(path, 'r+b') as f:
+        f.write(b'{"n": 9')
+
+    assert read_json(path) == {"n": 1}
+
+
+def test_missing_file_falls_back_to_previous(tmp_path):
+    path = tmp_path / "a.json"
+    write_json(str(path), {"n": 1}, keep_previous=True)
+    write_json(str(path), {"n": 2}, keep_previous=True)
+    path.unlink()
+    assert read_json(str(path)) == {"n": 1}
+
+
+def test_corrupt_file_without_previous_raises(tmp_path):
+    path = str(tmp_path / "a.json")
+    write_json(path, {"n": 1})
+    with open(path, 'r+b') as f:
+        f.write(b'{"n": 9')
+    with pytest.raises(CorruptFileError):
+        read_json(path)
+
+
+def test_file_without_trailer_is_read_as_is(tmp_path):
+    path = tmp_path / "eski.json"
+    path.write_bytes(b'{"n": 1}')
+    assert read_json(str(path)) == {"n": 1}
+    write_file(str(path), b'ham', checksum=False)
+    assert read_file(str(path)) == b'ham'
@@ -0,0 +1,75 @@
+import time
+
+from history import HistoryStore, apply_delta, make_delta
+
+
+def open_history(tmp_path, crypto, **kwargs):
+    history = HistoryStore(str(tmp_path / "history.db"), crypto, **kwargs)
+    history.open()
+    return history
+
+
+def test_delta_round_trip():
+    old = {'content': "a\nb\nc\n", 'file_name': None}
+    new = {'content': "a\nB\nc\nd", 'tags': ['x']}
+    assert apply_delta(old, make_delta(old, new)) == new
+
+
+def test_revisions_rebuild_through_deltas_and_keyframes(tmp_path, crypto):
+    history = open_history(tmp_path, crypto)
+    history.MAX_CHAIN = 3
+    versions = [{'content': "".join(f"satır {n}\n" for n in range(50)) + f"sürüm {i}\n"} for i in range(8)]
+    for previous, entry in zip(versions, versions[1:]):
+        history.record([("a", previous, entry)])
+
+    kinds = [kind for kind, in history._conn.execute("SELECT kind FROM revisions ORDER BY rev")]
+    assert 'delta' in kinds and kinds.count('full') > 1
+    for rev, version in enumerate(versions, start=1):
+        assert history.get("a", rev) == version
+    history.close()
+
+
+def test_delete_and_unknown_revisions(tmp_path, crypto):
+    history = open_history(tmp_path, crypto)
+    history.record([("a", {'content': "1"}, None)])
+    assert history.get("a", 1) == {'content': "1"}
+    assert history.get("a", 2) is None
+    assert history.revisions("a")[0]['deleted']
+    assert history.get("a", 3) is None
+    history.close()
+
+
+def test_prune_keeps_first_version_replaced_recently(tmp_path, crypto):
+    history = open_history(tmp_path, crypto, max_age=86400)
+    # İlk sürüm bir yıldan eski, ama yerine yenisi şimdi geçti
+    history.record([("a", {'content': "1", 'modified': time.time() - 400 * 86400}, {'content': "2"})])
+    assert history.prune() == 0
+    assert history.get("a", 1)['content'] == "1"
+    assert history.get("a", 2) == {'content': "2"}
+    history.close()
+
+
+def test_prune_keeps_keyframe_of_kept_chain(tmp_path, crypto):
+    history = open_history(tmp_path, crypto, keep_last=3)
+    base = "".join(f"satır {n} {crypto.mac(str(n).encode())}\n" for n in range(200))
+    versions = [{'content': base + f"sürüm {i}\n"} for i in range(6)]
+    for previous, entry in zip(versions, versions[1:]):
+        history.record([("a", previous, entry)])
+
+    revs = [r['rev'] for r in history.revisions("a")]
+    # Kalan revizyonlar tek anahtar kareden türediği için o da silinmez
+    assert revs == [6, 5, 4, 3, 2, 1]
+    history.keep_last = 2
+    history.prune()
+    assert [r['rev'] for r in history.revisions("a")] == [6, 5, 4, 3, 2, 1]
+    for rev in revs:
+        assert history.get("a", rev) == versions[rev - 1]
+    history.close()
+
+
+def test_backup_keeps_original_version(core):
+    core.put("a", {'content': "ilk"})
+    core.put("a", {'content': "ikinci"})
+    core.backup()
+    assert core.get_revision("a", 1)['content'] == "ilk"
+    assert core.get_revision("a", 2)['content'] == "ikinci"
@@ -0,0 +1,81 @@
+import os
+import time
+
+from blobstore import BlobStore
+from ingest import AttachmentIngester
+
+
+class FakeWindow:
+    """Records after() calls without running them, like a Tk loop that never gets to poll."""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+
+
+def refcount(blob_store, digest):
+    row = blob_store._conn.execute("SELECT count FROM refs WHERE digest = ?", (digest,)).fetchone()
+    return 0 if row is None else row[0]
+
+
+def open_ingester(tmp_path):
+    blob_store = BlobStore(str(tmp_path / "files"))
+    blob_store.open()
+    return blob_store, AttachmentIngester(FakeWindow(), blob_store)
+
+
+def wait_finished(jobs):
+    deadline = time.monotonic() + 5
+    while not all(job.finished for job in jobs):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_shutdown_hands_unpolled_jobs_to_on_done(tmp_path):
+    blob_store, ingester = open_ingester(tmp_path)
+    src = tmp_path / "a.bin"
+    src.write_bytes(os.urandom(5000))
+    done = []
+    job = ingester.submit(str(src), on_done=done.append)
+    wait_finished([job])
+
+    ingester.shutdown()
+    assert done == [job]
+    assert not job.cancelled
+    assert refcount(blob_store, job.digest) == 1
+    blob_store.close()
+
+
+def test_shutdown_releases_jobs_without_on_done(tmp_path):
+    blob_store, ingester = open_ingester(tmp_path)
+    src = tmp_path / "a.bin"
+    src.write_bytes(os.urandom(5000))
+    job = ingester.submit(str(src))
+    wait_finished([job])
+
+    ingester.shutdown()
+    assert refcount(blob_store, job.digest) == 0
+    assert not blob_store.exists(job.digest)
+    blob_store.close()
+
+
+def test_cancelled_job_is_released_by_on_done(tmp_path):
+    blob_store, ingester = open_ingester(tmp_path)
+    src = tmp_path / "a.bin"
+    src.write_bytes(os.urandom(3 * BlobStore.CHUNK_SIZE))
+
+    def on_done(job):
+        # Arayüzdeki gibi: iptal edilen işin kopyası bırakılır
+        if job.cancelled and job.digest is not None:
+            blob_store.release(job.digest)
+
+    jobs = [ingester.submit(str(src), on_done=on_done) for _ in range(3)]
+    ingester.shutdown()
+    assert all(job.finished for job in jobs)
+    assert not os.listdir(blob_store.tmp_dir)
+    digests = {job.digest for job in jobs if job.digest is not None}
+    for digest in digests:
+        assert refcount(blob_store, digest) == sum(1 for job in jobs if job.digest == digest and not job.cancelled)
+    blob_store.close()
@@ -0,0 +1,20 @@
+from types import SimpleNamespace
+
+import main
+
+
+class BrokenPool:
+    def open(self, name):
+        raise IOError("depolama açılamadı")
+
+
+def test_vault_that_fails_to_open_is_not_used(monkeypatch):
+    errors = []
+    monkeypatch.setattr(main.messagebox, "showerror", lambda title, message: errors.append(message))
+    app = SimpleNamespace(vaults=BrokenPool(), vault_name="kasa", core=None, startup_seconds=0.0, save_queue=None)
+    app.load_data = lambda: main.DigitalVault.load_data(app)
+
+    main.DigitalVault.load_vault(app)
+    assert app.core is None
+    assert app.save_queue is None
+    assert errors == ["Veriler yüklenemedi: depolama açılamadı"]
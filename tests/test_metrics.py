@@ -0,0 +1,42 @@
+import threading
+import time
+
+import metrics
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_sampled_gauge_does_not_block_reader():
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait()
+        return {"disk_bytes": len(calls)}
+
+    gauge = metrics.SampledGauge(slow, max_age=60)
+    started = time.monotonic()
+    assert gauge() == "ölçülüyor"
+    assert gauge() == "ölçülüyor"
+    assert time.monotonic() - started < 0.5
+    release.set()
+    wait_for(lambda: gauge.value is not None)
+    assert gauge() == {"disk_bytes": 1}
+    assert len(calls) == 1
+
+    gauge.invalidate()
+    assert gauge() == {"disk_bytes": 1}
+    wait_for(lambda: gauge.value == {"disk_bytes": 2})
+
+
+def test_sampled_gauge_reports_errors():
+    gauge = metrics.SampledGauge(lambda: 1 / 0, max_age=60)
+    gauge()
+    wait_for(lambda: gauge.value is not None)
+    assert gauge().startswith("hata:")
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from pinstore import PinLockedError, PinStore
+
+
+@pytest.fixture
+def pins(tmp_path):
+    store = PinStore(str(tmp_path / "pin.json"))
+    store.BACKOFF_BASE = 60.0
+    store.load("1234")
+    return store
+
+
+def test_wrong_pin_backs_off_across_restarts(pins):
+    assert not pins.verify("0000")
+    with pytest.raises(PinLockedError):
+        pins.verify("1234")
+
+    reopened = PinStore(pins.path)
+    reopened.load("1234")
+    assert reopened.failures == 1
+    assert reopened.wait() > 0
+
+
+def test_correct_pin_clears_failures(pins):
+    pins.BACKOFF_BASE = 0.0
+    assert not pins.verify("0000")
+    assert pins.verify("1234")
+    assert pins.failures == 0
+
+
+def test_unreadable_pin_file_is_not_reset(pins):
+    assert not pins.verify("0000")
+    for path in (pins.path, pins.path + ".prev"):
+        with open(path, 'w') as f:
+            f.write("bozuk")
+
+    reopened = PinStore(pins.path)
+    with pytest.raises(IOError):
+        reopened.load("1234")
+    # Varsayılan PIN yazılmadı, sayaç sıfırlanmadı
+    assert open(pins.path).read() == "bozuk"
+    with pytest.raises(IOError):
+        reopened.verify("1234")
+
+
+def test_corrupt_pin_file_falls_back_to_previous(pins):
+    pins.BACKOFF_BASE = 0.0
+    assert not pins.verify("0000")
+    assert not pins.verify("0000")
+    with open(pins.path, 'w') as f:
+        f.write("bozuk")
+
+    reopened = PinStore(pins.path)
+    reopened.load("1234")
+    # Yarım kalan yazım gibi: en fazla son deneme kaybolur, sayaç sıfırlanmaz
+    assert reopened.failures == 1
+
+
+def test_plaintext_pin_is_converted(tmp_path):
+    path = tmp_path / "pin.json"
+    path.write_text(json.dumps({"pin": "4321"}))
+    store = PinStore(str(path))
+    store.load("1234")
+    assert "pin" not in json.loads(open(path, 'rb').read().split(b"\n#sha256=")[0])
+    assert store.verify("4321")
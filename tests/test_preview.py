@@ -0,0 +1,60 @@
+import struct
+
+import pytest
+
+import preview
+
+
+def test_lru_cache_evicts_least_recently_used_by_size():
+    cache = preview.LRUCache(10)
+    cache.put("a", 1, 4)
+    cache.put("b", 2, 4)
+    assert cache.get("a") == 1
+    cache.put("c", 3, 4)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.size == 8
+
+    cache.put("a", 4, 2)
+    assert cache.size == 6 and cache.get("a") == 4
+    cache.put("büyük", 5, 11)
+    assert cache.get("büyük") is None and len(cache) == 2
+
+
+@pytest.mark.parametrize("encrypted", [True, False])
+def test_read_prefix_reads_plain_and_encrypted_files(crypto, tmp_path, monkeypatch, encrypted):
+    monkeypatch.setattr(type(crypto), "CHUNK_SIZE", 1024)
+    data = bytes(range(256)) * 20
+    path = tmp_path / "ek.bin"
+    path.write_bytes(data)
+    if encrypted:
+        crypto.encrypt_file(str(path), str(tmp_path / "şifreli.bin"))
+        path = tmp_path / "şifreli.bin"
+    assert preview.read_prefix(crypto, str(path), 1500) == data[:1500]
+    assert preview.read_prefix(crypto, str(path), 10 ** 6) == data
+
+    (tmp_path / "boş.bin").write_bytes(b'')
+    assert preview.read_prefix(crypto, str(tmp_path / "boş.bin"), 10) == b''
+
+
+def test_text_preview_marks_cut_text():
+    assert preview.text_preview(b"kisa", limit=4) == "kisa"
+    # "ğ" iki bayt; yarısı kesilince atılır
+    assert preview.text_preview("ağaç".encode('utf-8'), limit=2) == "a\n…"
+
+
+def test_image_size_reads_png_and_gif_headers():
+    png = b'\x89PNG\r\n\x1a\n' + b'\x00\x00\x00\rIHDR' + struct.pack('>II', 640, 480)
+    gif = b'GIF89a' + struct.pack('<HH', 32, 16)
+    assert preview.image_size(png) == (640, 480)
+    assert preview.image_size(gif) == (32, 16)
+    assert preview.image_size(b'\xff\xd8\xff') is None
+
+
+def test_preview_kind():
+    assert preview.preview_kind({'file_name': "not.txt"}) == 'text'
+    assert preview.preview_kind({'file_type': "application/json"}) == 'text'
+    assert preview.preview_kind({'file_name': "resim.png", 'file_size': 100}) == 'image'
+    assert preview.preview_kind({'file_name': "resim.png", 'file_size': preview.MAX_IMAGE_BYTES + 1}) is None
+    assert preview.preview_kind({'file_name': "arşiv.zip"}) is None
+    assert preview.preview_kind({'file_name': None}) is None
@@ -0,0 +1,113 @@
+import pytest
+
+from savequeue import SaveQueue
+
+
+def count_writes(core):
+    writes = []
+    write_changes = core.write_changes
+
+    def recording(changes, track=True):
+        writes.append(dict(changes))
+        write_changes(changes, track)
+
+    core.write_changes = recording
+    return writes
+
+
+def test_changes_are_coalesced_into_one_write(core):
+    writes = count_writes(core)
+    queue = SaveQueue(core, flush_interval=60)
+    core.put("silinecek", {'content': "x"})
+    writes.clear()
+
+    for n in range(5):
+        queue.put("a", {'content': f"sürüm {n}"})
+    queue.put("b", {'content': "b"})
+    queue.delete("silinecek")
+    # Yazılmamış değişiklikler okunabilir
+    assert queue.get("a")['content'] == "sürüm 4"
+    assert queue.get("silinecek") is None
+    assert core.get("a") is None
+
+    queue.flush()
+    assert len(writes) == 1
+    assert set(writes[0]) == {"a", "b", "silinecek"}
+    assert core.get("a")['content'] == "sürüm 4"
+    assert core.get("silinecek") is None
+    queue.close()
+
+
+def test_failed_write_is_retried(core):
+    queue = SaveQueue(core, flush_interval=0.01)
+    write_changes = core.write_changes
+    failures = []
+
+    def failing_once(changes, track=True):
+        if not failures:
+            failures.append(changes)
+            raise IOError("disk dolu")
+        write_changes(changes, track)
+
+    core.write_changes = failing_once
+    queue.put("a", {'content': "1"})
+    with pytest.raises(IOError):
+        queue.flush()
+    assert queue.get("a")['content'] == "1"
+
+    queue.flush()
+    assert core.get("a")['content'] == "1"
+    assert queue.idle
+    queue.close()
+
+
+def test_close_writes_pending_changes(core):
+    queue = SaveQueue(core, flush_interval=60)
+    queue.put("a", {'content': "1"})
+    queue.close()
+    assert core.get("a")['content'] == "1"
+
+
+def test_pages_include_unwritten_changes(core):
+    queue = SaveQueue(core, flush_interval=60)
+    core.put_many([(f"k{n:02d}", {'content': str(n)}) for n in range(0, 20, 2)])
+    queue.put("k05", {'content': "yeni"})
+    queue.put("k99", {'content': "yeni"})
+    queue.put("a", {'content': "yeni"})
+    queue.delete("k00")
+    queue.delete("k10")
+    queue.put("k04", {'content': "güncellendi"})
+
+    expected = sorted(set(core.titles()) - {"k00", "k10"} | {"a", "k05", "k99"})
+    assert queue.count() == len(expected)
+    for offset in range(len(expected) + 1):
+        for limit in (1, 3, 100):
+            assert queue.titles(offset, limit) == expected[offset:offset + limit]
+    assert queue.titles() == expected
+
+    queue.flush()
+    assert core.titles() == expected
+    queue.close()
+
+
+def test_edit_without_new_file_keeps_attachment(core, tmp_path):
+    path = tmp_path / "ek.txt"
+    path.write_bytes(b"ek dosya")
+    digest = core.add_file(str(path))
+    core.put("a", dict(core.file_meta("ek.txt", 8), content="1", file_name="ek.txt", file_hash=digest))
+    queue = SaveQueue(core, flush_interval=60)
+
+    # save_entry gibi: iki düzenleme aynı yazmada birleşir
+    for content in ("2", "3"):
+        entry = {'content': content, 'file_name': None, 'tags': []}
+        queue.put("a", core.keep_attachment(entry, queue.get("a")))
+    queue.flush()
+
+    entry = core.get("a")
+    assert entry['content'] == "3"
+    assert (entry['file_name'], entry['file_hash'], entry['file_size']) == ("ek.txt", digest, 8)
+    assert core.blob_store.exists(digest)
+    # Tek referans kalmış olmalı: kayıt silinince dosya da gider
+    queue.delete("a")
+    queue.close()
+    assert not core.blob_store.exists(digest)
@@ -0,0 +1,109 @@
+import os
+import time
+
+import pytest
+
+
+def add_attachment(core, tmp_path, title, data):
+    path = tmp_path / f"{title}.bin"
+    path.write_bytes(data)
+    core.put(title, {'content': title, 'file_name': path.name, 'file_hash': core.add_file(str(path))})
+    return core.get(title)['file_hash']
+
+
+def test_scrub_finds_corrupt_and_missing_attachments(core, tmp_path):
+    good = add_attachment(core, tmp_path, "iyi", os.urandom(3000))
+    corrupt = add_attachment(core, tmp_path, "bozuk", os.urandom(3000))
+    missing = add_attachment(core, tmp_path, "kayıp", os.urandom(3000))
+    path = core.blob_store.path(corrupt)
+    data = bytearray(open(path, 'rb').read())
+    data[100] ^= 1
+    open(path, 'wb').write(bytes(data))
+    os.remove(core.blob_store.path(missing))
+
+    scrubber = core.new_scrubber(bytes_per_second=100 * 1024 * 1024)
+    assert scrubber.run_pass()
+    kinds = {problem['title']: problem['kind'] for problem in scrubber.problems}
+    assert kinds == {"bozuk": 'corrupt', "kayıp": 'missing'}
+    assert os.path.exists(core.blob_store.path(good))
+    assert os.listdir(core.quarantine_dir) == [os.path.basename(path)]
+
+
+def test_scrub_resumes_after_stop(core):
+    core.import_records([(f"kayıt {n:03}", {'content': str(n)}) for n in range(40)])
+    scrubber = core.new_scrubber(bytes_per_second=core.new_scrubber().ENTRY_COST * 100)
+    scrubber._stop.set()
+    assert not scrubber.run_pass()
+
+    resumed = core.new_scrubber(bytes_per_second=100 * 1024 * 1024)
+    assert resumed.state['phase'] == 'entries'
+    assert resumed.run_pass()
+    assert resumed.state['last_pass']['checked'] == 40
+
+
+@pytest.mark.parametrize("backend", ['journal', 'sqlite'])
+def test_close_stops_scrubber_before_storage(open_core, backend):
+    core = open_core(backend)
+    core.import_records([(f"kayıt {n:03}", {'content': str(n)}) for n in range(200)])
+    # Yavaş tarama kapatma sırasında hâlâ çalışıyor olur
+    core.start_scrubber()
+    core.scrubber.bytes_per_second = 40960
+    thread = core.scrubber._thread
+    time.sleep(0.2)
+
+    alive_at_close = []
+    store_close = core.store.close
+
+    def close():
+        alive_at_close.append(thread.is_alive())
+        store_close()
+
+    core.store.close = close
+    core.close()
+    assert alive_at_close == [False]
+
+
+def test_unreadable_entry_is_reported_and_pass_goes_on(core, monkeypatch):
+    core.import_records([(title, {'content': title}) for title in ("a", "b", "c")])
+    get = core.store.get
+
+    def failing_get(title):
+        if title == "b":
+            raise RuntimeError("okunamadı")
+        return get(title)
+
+    monkeypatch.setattr(core.store, "get", failing_get)
+    scrubber = core.new_scrubber(bytes_per_second=100 * 1024 * 1024)
+    assert scrubber.run_pass()
+    assert [(problem['title'], problem['kind']) for problem in scrubber.problems] == [("b", 'error')]
+    assert scrubber.state['last_pass']['checked'] == 3
+
+
+def test_quarantine_skips_file_removed_meanwhile(core, tmp_path):
+    scrubber = core.new_scrubber()
+    assert scrubber._quarantine(str(tmp_path / "yok")) is None
+
+
+def test_orphan_collection_keeps_history_and_snapshot_attachments(core, tmp_path):
+    add_attachment(core, tmp_path, "a", b"a" * 100)
+    first = core.backup()["id"]
+    in_history = add_attachment(core, tmp_path, "b", b"b" * 100)
+    core.put("b", core.keep_attachment({'content': "b düzenlendi"}, core.get("b")))
+    in_snapshot = add_attachment(core, tmp_path, "c", b"c" * 100)
+    core.backup()
+    orphan = add_attachment(core, tmp_path, "d", b"d" * 100)
+    # Geri yükleme referansları yalnızca canlı kayıtlardan yeniden sayar
+    core.restore(first)
+    assert core.titles() == ["a"]
+
+    old = time.time() - 2 * core.new_scrubber().ORPHAN_GRACE
+    for dirpath, _, filenames in os.walk(core.files_dir):
+        for name in filenames:
+            os.utime(os.path.join(dirpath, name), (old, old))
+    assert core.new_scrubber(bytes_per_second=100 * 1024 * 1024).run_pass()
+
+    assert core.blob_store.exists(in_history)
+    assert core.blob_store.exists(in_snapshot)
+    assert not core.blob_store.exists(orphan)
+    assert core.restore_revision("b", core.history.revisions("b")[0]['rev'])
+    assert core.read_attachment(core.get("b"), 1000) == b"b" * 100
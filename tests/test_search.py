@@ -0,0 +1,39 @@
+from search import SearchIndex, tokenize
+
+
+def test_tokenize_folds_turkish_case():
+    assert tokenize("İSTANBUL Işık, ılık") == ["istanbul", "ışık", "ılık"]
+
+
+def test_every_word_must_match_as_a_prefix():
+    index = SearchIndex()
+    index.add("Banka", "hesap numarası ve kart şifresi")
+    index.add("Market", "kart ile ödeme")
+    assert index.search("kar") == {"Banka", "Market"}
+    assert index.search("kart hes") == {"Banka"}
+    assert index.search("banka ödeme") == set()
+    assert index.search("  ") is None
+
+
+def test_reindexing_and_removal_drop_old_words():
+    index = SearchIndex()
+    index.add("a", "elma armut")
+    index.add("a", "kiraz")
+    assert index.search("elma") == set()
+    assert index.search("kir") == {"a"}
+    index.remove("a")
+    assert index.search("kiraz") == set()
+    assert index.vocabulary == []
+
+
+def test_saved_index_loads_only_for_the_same_fingerprint(tmp_path, crypto):
+    path = str(tmp_path / "search_index")
+    index = SearchIndex()
+    index.build([("a", {'content': "gizli kelime"}), ("b", {'content': "başka"})])
+    index.save(path, "parmak izi 1", crypto)
+    assert b"gizli" not in (tmp_path / "search_index").read_bytes()
+
+    loaded = SearchIndex()
+    assert not loaded.load(path, "parmak izi 2", crypto)
+    assert loaded.load(path, "parmak izi 1", crypto)
+    assert loaded.search("giz") == {"a"}
@@ -0,0 +1,48 @@
+from snapshots import SnapshotStore
+
+
+def entries(n, changed=None):
+    return [(f"k{i}", {'content': changed if i == 0 and changed else f"içerik {i}"}) for i in range(n)]
+
+
+def test_unchanged_data_is_not_written_again(tmp_path):
+    snapshots = SnapshotStore(str(tmp_path / "snapshots"))
+    attachment = tmp_path / "ek.bin"
+    attachment.write_bytes(b"x" * 1000)
+
+    first = snapshots.create(entries(10), {"özet": str(attachment)})
+    assert first["new_chunks"] == 11
+    again = snapshots.create(entries(10), {"özet": str(attachment)})
+    assert again["new_chunks"] == 0
+    changed = snapshots.create(entries(10, changed="yeni"), {"özet": str(attachment)})
+    assert changed["new_chunks"] == 1
+    assert snapshots.list_snapshots() == [changed["id"], again["id"], first["id"]]
+
+
+def test_restore_rebuilds_entries_and_missing_attachments(tmp_path):
+    snapshots = SnapshotStore(str(tmp_path / "snapshots"))
+    attachment = tmp_path / "ek.bin"
+    attachment.write_bytes(b"ek" * 100)
+    snapshot_id = snapshots.create(entries(3), {"özet": str(attachment)})["id"]
+
+    restored = tmp_path / "geri" / "ek.bin"
+    assert snapshots.restore(snapshot_id, lambda key: str(restored)) == dict(entries(3))
+    assert restored.read_bytes() == b"ek" * 100
+    assert snapshots.restore(snapshot_id, lambda key: str(restored), titles=["k1"]) == {"k1": {'content': "içerik 1"}}
+
+
+def test_diff_compares_without_reading_chunks(tmp_path):
+    snapshots = SnapshotStore(str(tmp_path / "snapshots"))
+    snapshot_id = snapshots.create(entries(3), {})["id"]
+    live = [("k0", {'content': "değişti"}), ("k1", {'content': "içerik 1"}), ("yeni", {'content': ""})]
+    assert snapshots.diff(snapshot_id, live) == {"added": ["k2"], "changed": ["k0"], "removed": ["yeni"]}
+
+
+def test_prune_drops_chunks_only_old_snapshots_used(tmp_path):
+    snapshots = SnapshotStore(str(tmp_path / "snapshots"))
+    snapshots.create(entries(2, changed="eski"), {})
+    kept = snapshots.create(entries(2), {})["id"]
+    assert snapshots.prune(keep_last=1, keep_daily=0) == 1
+    assert snapshots.list_snapshots() == [kept]
+    assert snapshots.restore(kept, lambda key: None) == dict(entries(2))
+    assert len([path for path in (tmp_path / "snapshots" / "chunks").rglob("*") if path.is_file()]) == 2
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_modules(script: str, names) -> list:
+    # Temiz yorumlayıcıda, başka testlerin yüklediği modüller karışmasın diye
+    check = f"import sys; {script}; print(','.join(m for m in {list(names)!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", check], cwd=PACKAGE_DIR, capture_output=True, text=True, check=True)
+    return [name for name in proc.stdout.strip().split(",") if name]
+
+
+def test_login_screen_imports_skip_heavy_modules(tmp_path):
+    script = f"import main, core; core.VaultCore({str(tmp_path)!r}).load_pin()"
+    assert loaded_modules(script, ["Cryptodome", "py7zr", "http.client", "security"]) == []
+
+
+def test_archiver_loads_py7zr_only_in_workers():
+    assert loaded_modules("import archiver", ["py7zr"]) == []
@@ -0,0 +1,165 @@
+import os
+
+import pytest
+
+from storage import JournalStore, SqliteStore, StorageError
+
+
+def open_journal(tmp_path, **kwargs):
+    store = JournalStore(str(tmp_path / "vault_data.json"), **kwargs)
+    store.load()
+    return store
+
+
+def contents(store):
+    return dict(store.items())
+
+
+def test_journal_replays_puts_batches_and_deletes(tmp_path):
+    store = open_journal(tmp_path)
+    store.put("a", {'content': "1"})
+    store.put_many([("b", {'content': "2"}), ("c", {'content': "3"})])
+    store.put("a", {'content': "1b"})
+    store.delete("b")
+    store.close()
+
+    store = open_journal(tmp_path)
+    assert contents(store) == {"a": {'content': "1b"}, "c": {'content': "3"}}
+    assert store.titles() == ["a", "c"]
+    store.close()
+
+
+def test_torn_trailing_record_is_dropped(tmp_path):
+    store = open_journal(tmp_path)
+    store.put("a", {'content': "1"})
+    journal = store.journal_path
+    store.close()
+    size = os.path.getsize(journal)
+    with open(journal, 'ab') as f:
+        f.write(b'{"op": "put", "title": "b", "len": 50, "crc": 1}\n{"content": "ya')
+
+    store = open_journal(tmp_path)
+    assert contents(store) == {"a": {'content': "1"}}
+    assert os.path.getsize(journal) == size
+    store.put("c", {'content': "3"})
+    store.close()
+    store = open_journal(tmp_path)
+    assert sorted(contents(store)) == ["a", "c"]
+    store.close()
+
+
+def test_torn_batch_is_dropped_whole(tmp_path):
+    store = open_journal(tmp_path)
+    store.put("a", {'content': "1"})
+    store.put_many([("b", {'content': "2"}), ("c", {'content': "3"})])
+    journal = store.journal_path
+    store.close()
+    # Toplu yazmanın son kaydı diske yarım ulaşmış
+    with open(journal, 'r+b') as f:
+        f.truncate(os.path.getsize(journal) - 5)
+
+    store = open_journal(tmp_path)
+    assert contents(store) == {"a": {'content': "1"}}
+    store.close()
+
+
+def test_compaction_keeps_entries_and_bounds_files(tmp_path):
+    store = open_journal(tmp_path, compact_threshold=10, fsync=False)
+    for n in range(100):
+        store.put(f"k{n % 30:02}", {'content': str(n)})
+        if n % 20 == 0:
+            store.delete(f"k{n % 30:02}")
+    store.compact(wait=True)
+    expected = contents(store)
+    assert len(store.files()) <= 4
+    store.close()
+
+    store = open_journal(tmp_path)
+    assert contents(store) == expected
+    store.close()
+
+
+def test_crc_mismatch_is_reported(tmp_path):
+    store = open_journal(tmp_path)
+    store.put("a", {'content': "değer"})
+    path, offset, length, _ = store.index["a"]
+    store.close()
+    with open(path, 'r+b') as f:
+        f.seek(offset + length - 3)
+        f.write(b'X')
+
+    store = open_journal(tmp_path)
+    with pytest.raises(StorageError):
+        store.get("a")
+    store.close()
+
+
+def test_corrupt_snapshot_falls_back_to_previous_generation(tmp_path):
+    store = open_journal(tmp_path, compact_threshold=10 ** 6)
+    store.put_many([(f"k{n}", {'content': str(n)}) for n in range(10)])
+    store.compact(wait=True)
+    store.put("k0", {'content': "yeni"})
+    store.delete("k1")
+    store.compact(wait=True)
+    newest = store.snapshot_path
+    expected = contents(store)
+    store.close()
+    with open(newest, 'r+b') as f:
+        f.seek(-8, os.SEEK_END)
+        f.write(b'\0' * 8)
+
+    store = open_journal(tmp_path)
+    assert contents(store) == expected
+    assert os.path.exists(newest + ".corrupt")
+    store.close()
+
+
+def test_sqlite_store_round_trip(tmp_path):
+    store = SqliteStore(str(tmp_path / "vault_data.db"))
+    store.load()
+    store.put_many([("b", {'content': "2"}), ("a", {'content': "1"})])
+    store.delete("b")
+    store.close()
+
+    store = SqliteStore(str(tmp_path / "vault_data.db"))
+    store.load()
+    assert contents(store) == {"a": {'content': "1"}}
+    store.close()
+
+
+@pytest.mark.parametrize("backend", [JournalStore, SqliteStore])
+def test_rank_counts_titles_before(tmp_path, backend):
+    store = backend(str(tmp_path / "store"))
+    store.load()
+    store.put_many([("b", {}), ("d", {}), ("f", {})])
+    assert [store.rank(title) for title in ("a", "b", "c", "f", "g")] == [0, 0, 1, 2, 3]
+    store.close()
+
+
+def test_startup_reads_only_the_index(tmp_path, monkeypatch):
+    store = open_journal(tmp_path, compact_threshold=2)
+    store.put_many([(f"kayıt {i}", {'content': "x" * 1000}) for i in range(5)])
+    store.put("kayıt 9", {'content': "son"})
+    store.compact(wait=True)
+    store.close()
+
+    reads = []
+    original = JournalStore._read
+    monkeypatch.setattr(JournalStore, "_read", lambda self, location: reads.append(location) or original(self, location))
+    store = open_journal(tmp_path)
+    assert len(store) == 6 and reads == []
+    assert store.get("kayıt 9") == {'content': "son"}
+    assert len(reads) == 1
+    store.close()
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    (tmp_path / "vault_data.json").write_text('{"eski": {"content": "1"}}', encoding='utf-8')
+    store = open_journal(tmp_path)
+    assert contents(store) == {"eski": {'content': "1"}}
+    store.put("yeni", {'content': "2"})
+    store.close()
+
+    store = open_journal(tmp_path)
+    assert sorted(contents(store)) == ["eski", "yeni"]
+    store.close()
@@ -0,0 +1,177 @@
+import sqlite3
+import threading
+
+import pytest
+
+import syncserver
+from sync import SyncClient, SyncError, SyncLog
+
+
+@pytest.fixture
+def server(tmp_path):
+    httpd = syncserver.serve(str(tmp_path / "server"), port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+    httpd.sync.close()
+
+
+def test_entries_and_attachments_reach_the_other_vault(open_core, server, tmp_path):
+    a, b = open_core(name="a"), open_core(name="b")
+    src = tmp_path / "ek.txt"
+    src.write_bytes("ek içeriği".encode('utf-8'))
+    a.put("x", {'content': "a'dan", 'file_name': "ek.txt", 'file_hash': a.add_file(str(src))})
+    a.put("y", {'content': "y", 'tags': ["t"]})
+
+    assert a.sync(server, "parola")['sent'] == 2
+    assert b.sync(server, "parola")['received'] == 2
+    assert b.titles() == ["x", "y"]
+    assert b.get("y")['tags'] == ["t"]
+    assert b.read_attachment(b.get("x"), 1000) == "ek içeriği".encode('utf-8')
+    assert b.search("dan") == {"x"}
+
+    b.delete("y")
+    b.sync()
+    a.sync()
+    assert a.titles() == ["x"]
+
+
+def test_nothing_is_sent_again_when_unchanged(open_core, server):
+    a = open_core(name="a")
+    a.put("x", {'content': "1"})
+    a.sync(server, "parola")
+    stats = a.sync()
+    assert stats['sent'] == 0 and stats['received'] == 0
+
+
+def test_conflict_keeps_local_version_as_copy(open_core, server):
+    a, b = open_core(name="a"), open_core(name="b")
+    a.put("x", {'content': "ilk"})
+    a.sync(server, "parola")
+    b.sync(server, "parola")
+
+    a.put("x", {'content': "a'nın değişikliği"})
+    b.put("x", {'content': "b'nin değişikliği"})
+    a.sync()
+    stats = b.sync()
+    assert stats['conflicts'] == 1
+    # Sunucudaki sürüm kazanır, yerel sürüm "(çakışma)" ekiyle saklanır
+    assert b.get("x")['content'] == "a'nın değişikliği"
+    assert b.get("x (çakışma)")['content'] == "b'nin değişikliği"
+
+    a.sync()
+    assert a.get("x (çakışma)")['content'] == "b'nin değişikliği"
+
+
+def test_wrong_passphrase_is_refused(open_core, server):
+    a, b = open_core(name="a"), open_core(name="b")
+    a.put("x", {'content': "1"})
+    a.sync(server, "parola")
+    with pytest.raises(SyncError):
+        b.sync(server, "yanlış")
+    assert b.titles() == []
+
+
+def test_edit_made_during_push_stays_pending(open_core, server):
+    a, b = open_core(name="a"), open_core(name="b")
+    a.sync(server, "parola")
+    client = a._sync_client
+    batch = client._batch
+
+    def edit_during_push(requests):
+        # Kayıt okunduktan sonra, gönderim sürerken yerel bir kaydetme gelir
+        if requests[0]["op"] == "push" and a.get("x")['content'] == "ilk":
+            a.put("x", {'content': "ikinci"})
+        return batch(requests)
+
+    client._batch = edit_during_push
+    a.put("x", {'content': "ilk"})
+    a.sync()
+    assert a.get("x")['content'] == "ikinci"
+
+    b.sync(server, "parola")
+    assert b.get("x")['content'] == "ikinci"
+    assert not a.sync_log.pending()
+
+
+def test_old_pending_table_is_upgraded(tmp_path):
+    path = str(tmp_path / "vault_sync.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE pending (title TEXT PRIMARY KEY)")
+    conn.execute("INSERT INTO pending VALUES ('x')")
+    conn.commit()
+    conn.close()
+
+    log = SyncLog(path)
+    log.open()
+    log.set("server", "http://sunucu")
+    log.mark(["x"])
+    assert log.versions(["x", "y"]) == {"x": 1}
+    log.synced({"x": 3}, versions={"x": 0})
+    assert log.pending() == ["x"]
+    log.synced({"x": 3}, versions={"x": 1})
+    assert log.pending() == []
+    log.close()
+
+
+def test_save_during_pull_waits_for_apply(open_core, server):
+    a, b = open_core(name="a"), open_core(name="b")
+    a.put("x", {'content': "uzak"})
+    a.sync(server, "parola")
+    b.sync(server, "parola")
+    a.put("x", {'content': "uzak 2"})
+    a.sync()
+
+    is_pending = b.sync_log.is_pending
+    savers = []
+
+    def save_during_check(title):
+        # Denetim yapıldıktan sonra gelen yerel kaydetme uygulamadan sonraya kalmalı
+        if not savers:
+            savers.append(threading.Thread(target=b.put, args=("x", {'content': "yerel"})))
+            savers[0].start()
+            savers[0].join(0.3)
+            assert savers[0].is_alive()
+        return is_pending(title)
+
+    b.sync_log.is_pending = save_during_check
+    b.sync()
+    savers[0].join()
+    assert b.get("x")['content'] == "yerel"
+
+    b.sync()
+    a.sync()
+    assert a.get("x")['content'] == "yerel"
+
+
+def test_failed_pull_page_releases_fetched_attachments(open_core, server, tmp_path):
+    a, b = open_core(name="a"), open_core(name="b")
+    digests = []
+    for title in ("x", "y"):
+        src = tmp_path / f"{title}.txt"
+        src.write_bytes(title.encode('ascii') * 10)
+        digests.append(a.add_file(str(src)))
+        a.put(title, {'content': title, 'file_name': f"{title}.txt", 'file_hash': digests[-1]})
+    a.sync(server, "parola")
+
+    b._sync_client = SyncClient(b)
+    b._sync_client.configure(server, "parola")
+    fetch = b._sync_client._fetch_attachment
+
+    def failing_second(entry):
+        if entry['file_hash'] == digests[1]:
+            raise SyncError("bağlantı koptu")
+        return fetch(entry)
+
+    b._sync_client._fetch_attachment = failing_second
+    with pytest.raises(SyncError):
+        b.sync()
+    assert b.titles() == []
+    assert not b.blob_store.exists(digests[0])
+
+    b._sync_client._fetch_attachment = fetch
+    b.sync()
+    assert b.read_attachment(b.get("x"), 100) == b"x" * 10
+    assert b.blob_store.exists(digests[1])
@@ -0,0 +1,56 @@
+import pytest
+
+from transfer import read_records, write_records
+
+
+@pytest.mark.parametrize("ext", ["jsonl", "csv"])
+def test_records_round_trip(tmp_path, ext):
+    path = str(tmp_path / f"kayıtlar.{ext}")
+    items = [
+        ("banka", {'content': "satır 1\nsatır 2, virgül", 'tags': ["iş", "banka"], 'modified': 1.5}),
+        ("boş", {'content': "", 'file_size': 12}),
+    ]
+    assert write_records(path, items) == 2
+    assert list(read_records(path)) == [
+        ("banka", {'content': "satır 1\nsatır 2, virgül", 'tags': ["iş", "banka"], 'modified': 1.5}),
+        # Boş alanlar eksik sayılır
+        ("boş", {'file_size': 12}),
+    ]
+
+
+def test_missing_title_names_the_line(tmp_path):
+    path = tmp_path / "eksik.jsonl"
+    path.write_text('{"title": "a"}\n\n{"content": "b"}\n', encoding='utf-8')
+    with pytest.raises(ValueError, match="eksik.jsonl:3"):
+        list(read_records(str(path)))
+
+
+@pytest.mark.parametrize("mode, titles, stats", [
+    ('overwrite', {"a": "yeni", "b": "2"}, {"added": 1, "overwritten": 2, "skipped": 0, "renamed": 0}),
+    ('skip', {"a": "eski", "b": "2"}, {"added": 1, "overwritten": 0, "skipped": 2, "renamed": 0}),
+    ('rename', {"a": "eski", "a (2)": "yeni", "a (3)": "yeni 2", "b": "2"},
+     {"added": 1, "overwritten": 0, "skipped": 0, "renamed": 2}),
+])
+def test_import_conflict_modes(core, mode, titles, stats):
+    core.put("a", {'content': "eski", 'file_name': None})
+    records = [
+        ("a", {'content': "yeni"}),
+        ("b", {'content': "2"}),
+        ("a", {'content': "yeni 2"}) if mode == 'rename' else ("a", {'content': "yeni"}),
+    ]
+    assert core.import_records(records, mode, batch_size=2) == stats
+    assert {title: core.get(title)['content'] for title in core.titles()} == titles
+
+
+def test_export_then_import_into_another_vault(open_core, tmp_path):
+    source = open_core(name="kaynak")
+    source.put("a", {'content': "gizli", 'file_name': None, 'tags': ["iş"]})
+    path = str(tmp_path / "dışa.csv")
+    assert source.export_file(path) == 1
+    assert "gizli" in open(path, encoding='utf-8').read()
+
+    target = open_core(name="hedef")
+    assert target.import_file(path)["added"] == 1
+    entry = target.get("a")
+    assert entry['content'] == "gizli"
+    assert entry['tags'] == ["iş"]
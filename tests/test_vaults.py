@@ -0,0 +1,39 @@
+import pytest
+
+from durable import read_json, write_json
+from vaults import VaultPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = VaultPool(str(tmp_path / "vaults.json"), str(tmp_path / "varsayılan"), max_open=2)
+    yield pool
+    pool.close_all()
+
+
+def test_config_is_saved_and_relative_paths_resolved(tmp_path, pool):
+    pool.add("iş", str(tmp_path / "iş"))
+    assert pool.names() == ["default", "iş"]
+    assert read_json(str(tmp_path / "vaults.json")) == {"vaults": {"iş": str(tmp_path / "iş")}}
+
+    write_json(str(tmp_path / "vaults.json"), {"vaults": {"ev": "kasalar/ev"}})
+    reloaded = VaultPool(str(tmp_path / "vaults.json"), str(tmp_path / "varsayılan"))
+    assert reloaded.path("ev") == str(tmp_path / "kasalar" / "ev")
+    with pytest.raises(KeyError):
+        reloaded.path("iş")
+
+
+def test_open_reuses_vaults_and_evicts_least_recently_used(tmp_path, pool):
+    for name in ("a", "b"):
+        pool.add(name, str(tmp_path / name))
+    default = pool.open("default")
+    assert pool.open("default") is default
+    pool.open("a")
+    pool.open("default")
+    pool.open("b")
+    assert [name for name in pool.names() if pool.is_open(name)] == ["default", "b"]
+
+    assert pool.evict_idle(0, keep=("b",)) == ["default"]
+    assert not pool.is_open("default") and pool.is_open("b")
+    pool.remove("b")
+    assert not pool.is_open("b") and pool.names() == ["default", "a"]
@@ -0,0 +1,78 @@
+from widgets import PageCache, VirtualListbox
+
+
+def test_page_cache_fetches_only_the_pages_read():
+    rows = [f"k{n:03d}" for n in range(100)]
+    fetched = []
+
+    def fetch_page(offset, limit):
+        fetched.append(offset)
+        return rows[offset:offset + limit]
+
+    cache = PageCache(lambda: len(rows), fetch_page, page_size=10, max_pages=2)
+    assert len(cache) == 100
+    assert cache[55:62] == rows[55:62]
+    assert cache[-1] == "k099"
+    assert fetched == [50, 60, 90]
+
+    # En fazla iki sayfa tutulur; en eski düşer
+    assert cache[51] == "k051"
+    assert cache[65] == "k065"
+    assert fetched == [50, 60, 90, 50, 60]
+
+    rows.insert(0, "a")
+    cache.refresh()
+    assert len(cache) == 101
+    assert cache[0] == "a"
+
+
+def headless_listbox(rows, visible_rows=3):
+    """A VirtualListbox without a Tk window: only its row bookkeeping is exercised."""
+    listbox = VirtualListbox.__new__(VirtualListbox)
+    listbox.visible_rows = visible_rows
+    listbox._render = lambda: None
+    listbox._ordered = False
+    listbox.set_source(lambda: len(rows), lambda offset, limit: rows[offset:offset + limit], page_size=4)
+    return listbox
+
+
+def test_insert_and_delete_keep_the_selected_title():
+    rows = ["b", "d", "f", "h"]
+    listbox = headless_listbox(rows)
+    listbox.top, listbox.selected = 1, 2
+    assert listbox.get(2) == "f"
+
+    rows.insert(0, "a")
+    listbox.insert("a")
+    assert listbox.get(listbox.curselection()[0]) == "f"
+    assert listbox.top == 2
+
+    # Zaten listelenen başlık hiçbir şeyi kaydırmaz
+    listbox.insert("d")
+    assert listbox.curselection() == (3,)
+
+    rows.remove("b")
+    listbox.delete("b")
+    assert listbox.get(listbox.curselection()[0]) == "f"
+    rows.remove("f")
+    listbox.delete("f")
+    assert listbox.curselection() == ()
+    assert listbox.size() == 3
+
+
+def test_filter_shows_given_titles_until_cleared():
+    rows = ["a", "b", "c"]
+    listbox = headless_listbox(rows)
+    listbox.set_filter({"c", "a"})
+    assert listbox.filtered
+    assert [listbox.get(i) for i in range(listbox.size())] == ["a", "c"]
+
+    rows.remove("c")
+    listbox.delete("c")
+    assert listbox.size() == 1
+    listbox.set_filter(["b", "a"], ordered=True)
+    assert [listbox.get(i) for i in range(listbox.size())] == ["b", "a"]
+
+    listbox.set_filter(None)
+    assert not listbox.filtered
+    assert listbox.size() == 2
@@ -0,0 +1,72 @@
+import csv
+import json
+import os
+
+from durable import replace_file
+from metaindex import parse_tags
+
+CSV_FIELDS = ['title', 'content', 'file_name', 'file_hash', 'tags', 'created', 'modified', 'file_size', 'file_type']
+# CSV hücreleri metin olduğundan bu alanlar okurken sayıya çevrilir; etiketler virgülle birleştirilir
+CSV_NUMBER_FIELDS = {'created': float, 'modified': float, 'file_size': int}
+# Büyük içerikler csv modülünün varsayılan alan sınırını aşabilir
+CSV_FIELD_LIMIT = 2 ** 31 - 1
+
+
+def file_format(path: str) -> str:
+    """Return 'csv' or 'jsonl' depending on the file extension."""
+    return 'csv' if os.path.splitext(path)[1].lower() == '.csv' else 'jsonl'
+
+
+def read_records(path: str):
+    """Yield (title, entry) pairs from a JSONL or CSV file, one record at a time."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if file_format(path) == 'csv':
+            csv.field_size_limit(CSV_FIELD_LIMIT)
+            rows = enumerate(csv.DictReader(f), 2)
+        else:
+            rows = ((line_no, json.loads(line)) for line_no, line in enumerate(f, 1) if line.strip())
+
+        for line_no, record in rows:
+            title = record.pop('title', None)
+            if not title:
+                raise ValueError(f"{path}:{line_no}: başlık eksik")
+            # CSV'de boş hücreler eksik alan sayılır
+            entry = {key: value for key, value in record.items() if value not in (None, '')}
+            if file_format(path) == 'csv':
+                entry = csv_to_entry(entry)
+            yield title, entry
+
+
+def csv_to_entry(row: dict) -> dict:
+    """Convert the text cells of a CSV row back to entry field types."""
+    entry = dict(row)
+    for key, convert in CSV_NUMBER_FIELDS.items():
+        if key in entry:
+            entry[key] = convert(entry[key])
+    if 'tags' in entry:
+        entry['tags'] = parse_tags(entry['tags'])
+    return entry
+
+
+def write_records(path: str, items) -> int:
+    """Write (title, entry) pairs to a JSONL or CSV file; returns the number written."""
+    count = 0
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        if file_format(path) == 'csv':
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for title, entry in items:
+                row = dict(entry, title=title)
+                if row.get('tags'):
+                    row['tags'] = ", ".join(row['tags'])
+                writer.writerow(row)
+                count += 1
+        else:
+            for title, entry in items:
+                f.write(json.dumps(dict(entry, title=title), ensure_ascii=False) + "\n")
+                count += 1
+        f.flush()
+        os.fsync(f.fileno())
+    replace_file(tmp_path, path)
+    return count
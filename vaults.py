@@ -0,0 +1,113 @@
+import os
+import time
+from collections import OrderedDict
+
+import metrics
+from core import VaultCore
+from durable import read_json, write_json
+
+
+class VaultPool:
+    """Several named vaults in one process.
+
+    Vault directories come from a JSON config ({"vaults": {name: path}});
+    without one there is a single "default" vault in default_dir. Vaults
+    are opened on demand and stay open in LRU order, so switching back to
+    one reuses its loaded storage index, attachment store and handles.
+    Opening more than max_open vaults closes the least recently used one,
+    and evict_idle() closes vaults that have not been used for a while.
+    """
+
+    DEFAULT_NAME = "default"
+    MAX_OPEN = 4
+
+    def __init__(self, config_path: str, default_dir: str, max_open: int = None, backend: str = None):
+        self.config_path = config_path
+        self.default_dir = default_dir
+        self.max_open = max_open or self.MAX_OPEN
+        self.backend = backend
+        self.paths = self._load_config()
+        self._open = OrderedDict()
+        self._last_used = {}
+
+    def names(self) -> list:
+        """Return the configured vault names, the default one first."""
+        return sorted(self.paths, key=lambda name: (name != self.DEFAULT_NAME, name))
+
+    def path(self, name: str) -> str:
+        if name not in self.paths:
+            raise KeyError(f"Kasa bulunamadı: {name}")
+        return self.paths[name]
+
+    def add(self, name: str, path: str) -> None:
+        """Register a vault directory under name (creating it) and save the config."""
+        path = os.path.abspath(path)
+        os.makedirs(path, exist_ok=True)
+        self.paths[name] = path
+        self._save_config()
+
+    def remove(self, name: str) -> None:
+        """Forget a vault (its files are left alone)."""
+        self.close(name)
+        self.paths.pop(name, None)
+        self._save_config()
+
+    def open(self, name: str) -> VaultCore:
+        """Return the open vault called name, opening it (and evicting the LRU one) if needed."""
+        core = self._open.get(name)
+        if core is None:
+            metrics.count("vault_pool.miss")
+            core = VaultCore(self.path(name), backend=self.backend)
+            core.open()
+            self._open[name] = core
+        else:
+            metrics.count("vault_pool.hit")
+        self._open.move_to_end(name)
+        self._last_used[name] = time.monotonic()
+
+        while len(self._open) > self.max_open:
+            oldest = next(iter(self._open))
+            self.close(oldest)
+        return core
+
+    def is_open(self, name: str) -> bool:
+        return name in self._open
+
+    def evict_idle(self, max_idle: float, keep=()) -> list:
+        """Close vaults unused for max_idle seconds, except those in keep; returns their names."""
+        now = time.monotonic()
+        idle = [
+            name for name in self._open
+            if name not in keep and now - self._last_used.get(name, now) >= max_idle
+        ]
+        for name in idle:
+            self.close(name)
+        return idle
+
+    def close(self, name: str) -> None:
+        """Close (and lock) one vault if it is open."""
+        core = self._open.pop(name, None)
+        self._last_used.pop(name, None)
+        if core is not None:
+            core.close()
+
+    def close_all(self) -> None:
+        for name in list(self._open):
+            self.close(name)
+
+    def _load_config(self) -> dict:
+        paths = {}
+        if os.path.exists(self.config_path) or os.path.exists(self.config_path + ".prev"):
+            config_dir = os.path.dirname(os.path.abspath(self.config_path))
+            for name, path in read_json(self.config_path).get("vaults", {}).items():
+                # Göreli yollar yapılandırma dosyasına göre çözülür
+                paths[name] = os.path.normpath(os.path.join(config_dir, path))
+        paths.setdefault(self.DEFAULT_NAME, self.default_dir)
+        return paths
+
+    def _save_config(self) -> None:
+        paths = {
+            name: path for name, path in self.paths.items()
+            if not (name == self.DEFAULT_NAME and path == self.default_dir)
+        }
+        write_json(self.config_path, {"vaults": paths}, keep_previous=True)
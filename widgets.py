@@ -0,0 +1,270 @@
+import bisect
+import tkinter as tk
+import tkinter.font as tkfont
+from collections import OrderedDict
+
+
+class PageCache:
+    """Read-only sequence over a sorted list that is fetched a page at a time.
+
+    count() gives the length and fetch_page(offset, limit) one page of
+    rows; at most max_pages pages are kept. refresh() drops them after the
+    underlying list changed.
+    """
+
+    def __init__(self, count, fetch_page, page_size: int = 500, max_pages: int = 8):
+        self.count = count
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._pages = OrderedDict()
+        self._length = count()
+
+    def refresh(self) -> None:
+        self._pages.clear()
+        self._length = self.count()
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, _ = index.indices(self._length)
+            rows = []
+            for page in range(start // self.page_size, -(-stop // self.page_size)):
+                rows.extend(self._page(page))
+            first = start // self.page_size * self.page_size
+            return rows[start - first:stop - first]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        page = self._page(index // self.page_size)
+        if index % self.page_size >= len(page):
+            raise IndexError(index)
+        return page[index % self.page_size]
+
+    def _page(self, page: int) -> list:
+        rows = self._pages.get(page)
+        if rows is None:
+            rows = self.fetch_page(page * self.page_size, self.page_size)
+            self._pages[page] = rows
+            if len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page)
+        return rows
+
+
+class VirtualListbox(tk.Frame):
+    """Listbox that only materializes the rows currently in view.
+
+    The full title list is never held: set_source gives a count and a page
+    callback, and only the pages around the visible window are fetched
+    (through a PageCache). The inner tk.Listbox only ever holds that window
+    (or a window of the filtered view set with set_filter). Scrolling,
+    inserting or deleting re-renders it, so the cost stays the same whether
+    the vault has a hundred entries or a million.
+
+    Mirrors the parts of the tk.Listbox API the vault screen uses
+    (curselection, get, <<ListboxSelect>>).
+    """
+
+    SCROLL_UNITS = 3
+
+    def __init__(self, parent: tk.Widget, **listbox_options):
+        super().__init__(parent, bg=listbox_options.get('bg', '#2c3e50'))
+        self.items = PageCache(lambda: 0, lambda offset, limit: [])
+        self.view = self.items
+        self._ordered = False
+        self.top = 0
+        self.selected = None
+        self.visible_rows = int(listbox_options.pop('height', 10))
+        self._rendering = False
+
+        self.scrollbar = tk.Scrollbar(self, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill='y')
+
+        self.listbox = tk.Listbox(
+            self,
+            height=self.visible_rows,
+            selectmode=tk.SINGLE,
+            exportselection=False,
+            activestyle='none',
+            **listbox_options
+        )
+        self.listbox.pack(side=tk.LEFT, fill='both', expand=True)
+
+        self.listbox.bind('<Configure>', self._on_resize)
+        self.listbox.bind('<<ListboxSelect>>', self._on_select)
+        self.listbox.bind('<MouseWheel>', self._on_mousewheel)
+        self.listbox.bind('<Button-4>', lambda e: self._scroll_by(-self.SCROLL_UNITS))
+        self.listbox.bind('<Button-5>', lambda e: self._scroll_by(self.SCROLL_UNITS))
+        self.listbox.bind('<Up>', lambda e: self._move_selection(-1))
+        self.listbox.bind('<Down>', lambda e: self._move_selection(1))
+        self.listbox.bind('<Prior>', lambda e: self._move_selection(-self.visible_rows))
+        self.listbox.bind('<Next>', lambda e: self._move_selection(self.visible_rows))
+
+    def set_source(self, count, fetch_page, page_size: int = 500) -> None:
+        """List every title: count() gives how many, fetch_page(offset, limit) a sorted page of them."""
+        self.items = PageCache(count, fetch_page, page_size)
+        self.view = self.items
+        self._ordered = False
+        self.top = 0
+        self.selected = None
+        self._render()
+
+    def set_filter(self, titles=None, ordered: bool = False) -> None:
+        """Show only the given titles, or every title when titles is None.
+
+        The titles are sorted unless ordered is set, in which case they are
+        shown in the order given (e.g. most recently modified first).
+        """
+        self._ordered = titles is not None and ordered
+        self.view = self.items if titles is None else (list(titles) if ordered else sorted(titles))
+        self.top = 0
+        self.selected = None
+        self._render()
+
+    @property
+    def filtered(self) -> bool:
+        return self.view is not self.items
+
+    def insert(self, title: str) -> None:
+        """Show a title the source now has, if it is not already listed.
+
+        While a filter is active only the source is re-read; the caller
+        re-applies the filter.
+        """
+        self._source_changed(title, 1)
+
+    def delete(self, title: str) -> None:
+        """Remove a single title the source no longer has."""
+        if not self.filtered:
+            self._source_changed(title, -1)
+            return
+        self.items.refresh()
+
+        if self._ordered:
+            # Başlık sırasında olmayan görünümde ikili arama yapılamaz
+            index = self.view.index(title) if title in self.view else len(self.view)
+        else:
+            index = bisect.bisect_left(self.view, title)
+        if index >= len(self.view) or self.view[index] != title:
+            return
+        del self.view[index]
+        if self.selected is not None:
+            if index == self.selected:
+                self.selected = None
+            elif index < self.selected:
+                self.selected -= 1
+        if index < self.top:
+            self.top -= 1
+        self._render()
+
+    def curselection(self) -> tuple:
+        """Return the selected row index as a tuple, like tk.Listbox."""
+        return () if self.selected is None else (self.selected,)
+
+    def get(self, index: int) -> str:
+        """Return the title at the given row index."""
+        return self.view[index]
+
+    def size(self) -> int:
+        return len(self.view)
+
+    def see(self, index: int) -> None:
+        """Scroll so that the given row is visible."""
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + self.visible_rows:
+            self.top = index - self.visible_rows + 1
+        self._render()
+
+    def yview(self, *args) -> None:
+        """Scrollbar callback."""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * len(self.view))
+        elif args[0] == 'scroll':
+            step = self.visible_rows if args[2] == 'pages' else 1
+            self.top += int(args[1]) * step
+        self._render()
+
+    def _source_changed(self, title: str, step: int) -> None:
+        # Satırlar bellekte olmadığından seçim ve kaydırma başlıkla karşılaştırılarak kaydırılır
+        length = len(self.items)
+        selected = self.items[self.selected] if not self.filtered and self.selected is not None else None
+        top = self.items[self.top] if not self.filtered and self.top < length else None
+        self.items.refresh()
+        if self.filtered or len(self.items) == length:
+            return
+        if selected is not None:
+            if selected == title:
+                self.selected = None
+            elif title < selected:
+                self.selected += step
+        if top is not None and title < top:
+            self.top += step
+        self._render()
+
+    def _render(self) -> None:
+        max_top = max(0, len(self.view) - self.visible_rows)
+        self.top = min(max(0, self.top), max_top)
+
+        self._rendering = True
+        try:
+            self.listbox.delete(0, tk.END)
+            window = self.view[self.top:self.top + self.visible_rows]
+            if window:
+                self.listbox.insert(0, *window)
+            if self.selected is not None and self.top <= self.selected < self.top + len(window):
+                self.listbox.selection_set(self.selected - self.top)
+        finally:
+            self._rendering = False
+
+        total = len(self.view)
+        if total <= self.visible_rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.top / total, (self.top + self.visible_rows) / total)
+
+    def _row_height(self) -> int:
+        bbox = self.listbox.bbox(0)
+        if bbox:
+            return bbox[3] + 1
+        return tkfont.Font(font=self.listbox.cget('font')).metrics('linespace') + 1
+
+    def _on_resize(self, event) -> None:
+        rows = max(1, event.height // self._row_height())
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self._render()
+
+    def _on_select(self, event) -> None:
+        if self._rendering:
+            return
+        selection = self.listbox.curselection()
+        if not selection:
+            return
+        self.selected = self.top + selection[0]
+        self.event_generate('<<ListboxSelect>>')
+
+    def _on_mousewheel(self, event) -> str:
+        self._scroll_by(-self.SCROLL_UNITS if event.delta > 0 else self.SCROLL_UNITS)
+        return "break"
+
+    def _scroll_by(self, rows: int) -> str:
+        self.top += rows
+        self._render()
+        return "break"
+
+    def _move_selection(self, rows: int) -> str:
+        if not self.view:
+            return "break"
+        current = self.top if self.selected is None else self.selected
+        self.selected = min(max(0, current + rows), len(self.view) - 1)
+        self.see(self.selected)
+        self.event_generate('<<ListboxSelect>>')
+        return "break"